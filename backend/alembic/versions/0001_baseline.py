@@ -0,0 +1,78 @@
+"""baseline: the tables as create_table.py first created them
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "companies",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("symbol", sa.String()),
+        sa.Column("name", sa.String()),
+        sa.Column("market_cap", sa.BigInteger()),
+        sa.Column("sector", sa.String(), nullable=True),
+    )
+    op.create_index("ix_companies_id", "companies", ["id"])
+    op.create_index("ix_companies_symbol", "companies", ["symbol"], unique=True)
+
+    op.create_table(
+        "prices",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("company_id", sa.Integer(), sa.ForeignKey("companies.id")),
+        sa.Column("date", sa.Date()),
+        sa.Column("open", sa.Numeric()),
+        sa.Column("high", sa.Numeric()),
+        sa.Column("low", sa.Numeric()),
+        sa.Column("close", sa.Numeric()),
+        sa.Column("volume", sa.BigInteger()),
+    )
+    op.create_index("ix_prices_id", "prices", ["id"])
+
+    op.create_table(
+        "fundamentals",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("company_id", sa.Integer(), sa.ForeignKey("companies.id")),
+        sa.Column("date", sa.Date()),
+        sa.Column("metric", sa.String()),
+        sa.Column("value", sa.Numeric()),
+    )
+    op.create_index("ix_fundamentals_id", "fundamentals", ["id"])
+
+    op.create_table(
+        "strategies",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String()),
+        sa.Column("description", sa.String()),
+        sa.Column("created_at", sa.TIMESTAMP()),
+        sa.Column("parameters", sa.JSON()),
+    )
+    op.create_index("ix_strategies_id", "strategies", ["id"])
+
+    op.create_table(
+        "backtest_results",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("strategy_id", sa.Integer(), sa.ForeignKey("strategies.id")),
+        sa.Column("start_date", sa.Date()),
+        sa.Column("end_date", sa.Date()),
+        sa.Column("equity_curve", sa.JSON()),
+        sa.Column("performance_metrics", sa.JSON()),
+        sa.Column("logs", sa.JSON()),
+        sa.Column("created_at", sa.TIMESTAMP()),
+    )
+    op.create_index("ix_backtest_results_id", "backtest_results", ["id"])
+
+
+def downgrade():
+    for table in ("backtest_results", "strategies", "fundamentals", "prices", "companies"):
+        op.drop_table(table)
@@ -0,0 +1,45 @@
+"""indexes for the price and fundamentals read paths
+
+prices gets one unique index on (company_id, date) that carries close, so
+ingestion's ON CONFLICT and the existence checks hit it, and price-matrix
+reads (company_id IN ... AND date range) are answered from the index alone.
+fundamentals gets (company_id, metric, date) for the screening panel.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    # databases built by create_all after bulk ingestion have the plain constraint
+    if "uq_prices_company_date" in {u["name"] for u in inspector.get_unique_constraints("prices")}:
+        op.drop_constraint("uq_prices_company_date", "prices", type_="unique")
+    else:
+        # before the constraint, re-runs could store a day twice: keep the latest row
+        # (one sort; NOT IN over a subquery this size degrades to a rescan per row)
+        op.execute(
+            "DELETE FROM prices WHERE id IN (SELECT id FROM ("
+            "SELECT id, row_number() OVER (PARTITION BY company_id, date ORDER BY id DESC) AS n "
+            "FROM prices WHERE company_id IS NOT NULL AND date IS NOT NULL) ranked WHERE n > 1)"
+        )
+    op.create_index("uq_prices_company_date", "prices", ["company_id", "date"], unique=True,
+                    postgresql_include=["close"])
+
+    if "ix_fundamentals_company_metric_date" not in {i["name"] for i in inspector.get_indexes("fundamentals")}:
+        op.create_index("ix_fundamentals_company_metric_date", "fundamentals", ["company_id", "metric", "date"])
+
+
+def downgrade():
+    op.drop_index("ix_fundamentals_company_metric_date", table_name="fundamentals")
+    op.drop_index("uq_prices_company_date", table_name="prices")
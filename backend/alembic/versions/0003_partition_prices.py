@@ -0,0 +1,31 @@
+"""range-partition prices by year (Postgres, when PRICES_PARTITIONED is set)
+
+Without the setting this revision only records itself. To partition later:
+alembic downgrade 0002 && PRICES_PARTITIONED=1 alembic upgrade head.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+from app.core import config
+from app.core.partitions import is_partitioned, partition_prices, unpartition_prices
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and config.PRICES_PARTITIONED and not is_partitioned(bind):
+        partition_prices(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and is_partitioned(bind):
+        unpartition_prices(bind)
@@ -0,0 +1,34 @@
+"""indexed digest column on backtest_results
+
+The result cache looks stored runs up by their content digest on every
+miss. Kept inside the logs JSON, that filter parsed every row's logs
+(trades, checkpoints and all); a plain indexed column makes it one index
+probe. Existing rows are backfilled from logs.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("backtest_results", sa.Column("digest", sa.String(64), nullable=True))
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("UPDATE backtest_results SET digest = logs ->> 'digest' WHERE logs ->> 'digest' IS NOT NULL")
+    else:
+        op.execute("UPDATE backtest_results SET digest = json_extract(logs, '$.digest') "
+                   "WHERE json_extract(logs, '$.digest') IS NOT NULL")
+    op.create_index("ix_backtest_results_digest", "backtest_results", ["digest"])
+
+
+def downgrade():
+    op.drop_index("ix_backtest_results_digest", table_name="backtest_results")
+    op.drop_column("backtest_results", "digest")
@@ -0,0 +1,37 @@
+"""one fundamentals row per (company_id, metric, date)
+
+Ingestion inserted every statement cell again on each populate run, so
+the table grew with copies that the screening panel then read. Existing
+copies are dropped (keeping the latest row) and the (company_id, metric,
+date) index becomes unique, so write_fundamentals can skip cells already
+stored with ON CONFLICT DO NOTHING.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # keep the latest row per cell: load_panel let later rows win, so screening results do not change
+    op.execute(
+        "DELETE FROM fundamentals WHERE id IN (SELECT id FROM ("
+        "SELECT id, row_number() OVER (PARTITION BY company_id, metric, date ORDER BY id DESC) AS n "
+        "FROM fundamentals WHERE company_id IS NOT NULL AND metric IS NOT NULL AND date IS NOT NULL) ranked "
+        "WHERE n > 1)"
+    )
+    op.drop_index("ix_fundamentals_company_metric_date", table_name="fundamentals")
+    op.create_index("uq_fundamentals_company_metric_date", "fundamentals", ["company_id", "metric", "date"],
+                    unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_fundamentals_company_metric_date", table_name="fundamentals")
+    op.create_index("ix_fundamentals_company_metric_date", "fundamentals", ["company_id", "metric", "date"])
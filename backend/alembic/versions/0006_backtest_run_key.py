@@ -0,0 +1,47 @@
+"""indexed run key column on backtest_results
+
+/run and /backtest/{symbol} look up the latest stored run of the same
+key to resume from on every miss. Filtering on logs["key"] parsed every
+row's logs; run_key holds the key's sha256 (result_cache.key_digest) in
+an indexed column instead. Existing rows are backfilled from logs.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+BATCH = 500
+
+
+def upgrade():
+    op.add_column("backtest_results", sa.Column("run_key", sa.String(64), nullable=True))
+    conn = op.get_bind()
+    results = sa.table("backtest_results", sa.column("id", sa.Integer), sa.column("logs", sa.JSON),
+                       sa.column("run_key", sa.String))
+    if conn.dialect.name == "postgresql":
+        keyed = sa.text("SELECT id, logs ->> 'key' FROM backtest_results WHERE logs ->> 'key' IS NOT NULL")
+    else:
+        keyed = sa.text("SELECT id, json_extract(logs, '$.key') FROM backtest_results "
+                        "WHERE json_extract(logs, '$.key') IS NOT NULL")
+    # sha256 is not in SQL everywhere: hash in Python, a batch of rows at a time
+    rows = conn.execute(keyed).all()
+    update = results.update().where(results.c.id == sa.bindparam("row_id")).values(run_key=sa.bindparam("digest"))
+    for lo in range(0, len(rows), BATCH):
+        conn.execute(update, [{"row_id": i, "digest": hashlib.sha256(k.encode()).hexdigest()}
+                              for i, k in rows[lo:lo + BATCH]])
+    op.create_index("ix_backtest_results_run_key", "backtest_results", ["run_key"])
+
+
+def downgrade():
+    op.drop_index("ix_backtest_results_run_key", table_name="backtest_results")
+    op.drop_column("backtest_results", "run_key")
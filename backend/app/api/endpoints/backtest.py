@@ -1,230 +1,256 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app import schemas
-from app.schemas.schemas import BacktestRunRequest,BacktestRequest,BacktestResponse
+from app.schemas.schemas import BacktestRunRequest,BacktestRequest,BacktestResponse,SweepRequest,BatchBacktestRequest,WalkForwardRequest
 from app.models import models
-from datetime import datetime
-import pandas as pd
+from app.core import config
+from app.core.telemetry import span
 import numpy as np
 import yfinance as yf
 
 from app.service.backtest import rsi_strategy,sma_crossover,buy_hold,compute_drawdown
+from app.service import metrics
+from app.service.batch import run_batch
+from app.service.encoding import response_format, stream_series
+from app.service.indicators import Indicators, indicator_cache
+from app.service.jobs import QueueFull, backtest_jobs
+from app.service.market_data import aget_history
+from app.service.montecarlo import METHODS, run_montecarlo
+from app.service.portfolio import run_portfolio_backtest
+from app.service.price_matrix import load_universe
+from app.service.result_cache import result_cache
+from app.service.sweep import SORT_KEYS, param_values, rank, run_sweep
+from app.service.symbol_backtest import load_symbol_history, run_symbol_backtest
+from app.service.walkforward import run_walk_forward
+import json
+import time
 
 router = APIRouter()
 
 @router.post("/run")
-def run_backtest(req: BacktestRunRequest, db: Session = Depends(get_db)):
+def run_backtest(
+    req: BacktestRunRequest,
+    request: Request,
+    format: str | None = Query(None, description="json (default), columnar, ndjson or arrow"),
+    db: Session = Depends(get_db),
+):
+    fmt = response_format(request, format)
     strategy = db.query(models.Strategy).get(req.strategy_id)
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
 
-    # 🔷 Pick top 10 companies by market cap
-    companies = (
-        db.query(models.Company)
-        .order_by(models.Company.market_cap.desc())
-        .limit(10)
-        .all()
-    )
-    company_ids = [c.id for c in companies]
-
-    # 🔷 Fetch price data
-    prices = (
-        db.query(models.Price)
-        .filter(models.Price.company_id.in_(company_ids))
-        .filter(models.Price.date >= req.start_date)
-        .filter(models.Price.date <= req.end_date)
-        .all()
-    )
-
-    if not prices:
-        raise HTTPException(status_code=400, detail="No price data in selected period")
-
-    # 🔷 Prepare dataframe
-    df = pd.DataFrame([
-        {'date': p.date, 'company_id': p.company_id, 'close': float(p.close)}
-        for p in prices
-    ])
-    df_pivot = df.pivot(index='date', columns='company_id', values='close').sort_index()
-    df_pivot.index = pd.to_datetime(df_pivot.index)
-    df_pivot.ffill(inplace=True)
-
-    returns = df_pivot.pct_change().fillna(0)
-
-    # 🔷 Start with initial capital
-    capital = req.initial_capital or 100_000
-    rebalance_frequency = 'Q-DEC'  # quarterly
-
-    portfolio_weights = pd.Series(1 / len(company_ids), index=company_ids)
-
-    equity = capital
-    equity_curve = []
-    allocation_history = []  # 👈 new
-
-    for rebalance_date, period_data in returns.groupby(pd.Grouper(freq=rebalance_frequency)):
-        period_returns = (period_data + 1).prod() - 1
-        period_return = portfolio_weights.dot(period_returns.fillna(0))
-
-        equity *= (1 + period_return)
-
-    # save allocation for this date
-        allocations = {
-            str(company_id): round(equity * weight, 2)
-            for company_id, weight in portfolio_weights.items()
-        }
-
-        equity_curve.append({
-            "date": rebalance_date.strftime("%Y-%m-%d"),
-            "capital": round(equity, 2)
-        })
-
-        allocation_history.append({
-            "date": rebalance_date.strftime("%Y-%m-%d"),
-            "allocations": allocations
-        })
-
-
-    # 📊 Metrics
-    final_value = equity
-    total_return = (final_value / capital) - 1
-    n_years = (df_pivot.index[-1] - df_pivot.index[0]).days / 365
-    cagr = (final_value / capital) ** (1 / n_years) - 1 if n_years > 0 else 0
-    portfolio_returns = returns.mean(axis=1)
-    sharpe = (portfolio_returns.mean() / portfolio_returns.std()) * np.sqrt(252)
-
-    result = models.BacktestResult(
-        strategy_id=strategy.id,
-        start_date=req.start_date,
-        end_date=req.end_date,
-        equity_curve={
-            "dates": [e["date"] for e in equity_curve],
-            "values": [e["capital"] for e in equity_curve]
-        },
-        performance_metrics={
-            "CAGR": round(cagr * 100, 2),
-            "Sharpe": round(sharpe, 2),
-            "Total Return": round(total_return * 100, 2)
-        },
-        logs={"trades": []},
-        created_at=datetime.now()
-    )
-
-    db.add(result)
-    db.commit()
-    db.refresh(result)
+    result = run_portfolio_backtest(db, strategy, req)
+    if fmt == "json":
+        # encoded here rather than by FastAPI so the time shows up as its own stage
+        with span("run.serialize"):
+            return JSONResponse(jsonable_encoder(result))
+
+    # 🔷 One row per period: the capital and every company's drifted weight
+    # (weights are rounded to 6 places, so float32 loses nothing in binary form)
+    curve = result.pop("equity_curve")
+    allocations = result.pop("allocation_history")
+    company_ids = allocations["company_ids"]
+    dtype = np.float32 if fmt == "arrow" else np.float64
+    weights = np.asarray(allocations["weights"], dtype=dtype).reshape(len(curve), len(company_ids))
+    columns = {"date": allocations["dates"], "capital": [p["capital"] for p in curve]}
+    columns.update(zip((f"weight_{c}" for c in company_ids), np.ascontiguousarray(weights.T)))
+    return stream_series(fmt, result, "equity_curve", columns)
+
+
+@router.post("/backtest/jobs", status_code=202)
+def submit_backtest_job(req: BacktestRunRequest, db: Session = Depends(get_db)):
+    if not db.query(models.Strategy).get(req.strategy_id):
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    try:
+        job = backtest_jobs.submit(req)
+    except QueueFull:
+        raise HTTPException(status_code=429, detail="Too many queued backtests, retry shortly")
+    return job.to_dict()
 
-    return {
-    "message": "✅ Backtest completed",
-    "backtest_id": result.id,
-    "strategy_id": strategy.id,
-    "metrics": result.performance_metrics,
-    "equity_curve": equity_curve,
-    "allocation_history": allocation_history  # 👈 Add this
-    }
 
+@router.get("/backtest/jobs/{job_id}")
+def get_backtest_job(job_id: str):
+    job = backtest_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
 
-# @router.post("/backtest/{symbol}", response_model=BacktestResponse)
-@router.post("/backtest/{symbol}", response_model=BacktestResponse)
-def run_backtest(symbol: str, req: BacktestRequest):
-    import yfinance as yf
-    import pandas as pd
-    import numpy as np
+@router.get("/backtest/cache/stats")
+def backtest_cache_stats():
+    return result_cache.stats()
 
-    print(f"🔹 Running backtest for: {symbol}")
 
-    # --- Download data ---
+@router.get("/backtest/indicators/stats")
+def indicator_cache_stats():
+    return indicator_cache.stats()
+
+
+@router.post("/backtest/sweep")
+async def sweep_backtest(req: SweepRequest):
+    if req.sort_by not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of {', '.join(SORT_KEYS)}")
+
     try:
-        df = yf.download(symbol, start=req.start_date, end=req.end_date, progress=False, group_by='ticker')
+        with span("sweep.prices"):
+            history = await aget_history(req.symbol, req.start_date, req.end_date)
     except Exception as e:
-        print(f"⚠️ Failed to fetch {symbol}: {e}")
-        return {
-            "summary": {"total_return": 0.0, "win_rate": 0.0, "max_drawdown": 0.0},
-            "equity_curve": [],
-            "trades": [],
-        }
-
-    # --- Handle MultiIndex (Ticker/Date) ---
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = [col[-1] for col in df.columns.to_flat_index()]  # Flatten column names
-    if "Date" not in df.columns and not df.index.empty:
-        df = df.reset_index().rename(columns={"index": "Date"})
-
-    # --- Validate Data ---
-    if df.empty or "Close" not in df.columns:
-        print("⚠️ Empty or invalid data for", symbol)
-        return {
-            "summary": {"total_return": 0.0, "win_rate": 0.0, "max_drawdown": 0.0},
-            "equity_curve": [],
-            "trades": [],
-        }
-
-    df["Date"] = pd.to_datetime(df["Date"])
-
-    # --- STRATEGY LOGIC ---
-    if req.strategy == "sma_crossover":
-        short = int(req.params.get("short_window", 20))
-        long = int(req.params.get("long_window", 50))
-        df["SMA_short"] = df["Close"].rolling(short).mean()
-        df["SMA_long"] = df["Close"].rolling(long).mean()
-        df["signal"] = 0
-        df.loc[df["SMA_short"] > df["SMA_long"], "signal"] = 1
-        df.loc[df["SMA_short"] < df["SMA_long"], "signal"] = -1
-    elif req.strategy == "rsi":
-        period = int(req.params.get("period", 14))
-        delta = df["Close"].diff()
-        gain = delta.clip(lower=0).rolling(window=period).mean()
-        loss = (-delta.clip(upper=0)).rolling(window=period).mean()
-        rs = gain / loss
-        df["RSI"] = 100 - (100 / (1 + rs))
-        df["signal"] = 0
-        df.loc[df["RSI"] < 30, "signal"] = 1
-        df.loc[df["RSI"] > 70, "signal"] = -1
-    else:
-        df["signal"] = 1  # buy & hold
-
-    # --- RETURNS ---
-    df["daily_return"] = df["Close"].pct_change()
-    df["strategy_return"] = df["signal"].shift(1) * df["daily_return"]
-    df["equity"] = (1 + df["strategy_return"].fillna(0)).cumprod() * 100
-
-    # --- METRICS ---
-    total_return = float(df["equity"].iloc[-1] - 100)
-    win_rate = float((df["strategy_return"] > 0).sum() / df["strategy_return"].count() * 100)
-    max_drawdown = float(((df["equity"] / df["equity"].cummax() - 1).min()) * 100)
-
-    # --- EQUITY CURVE ---
-    equity_curve = [
-        {"date": str(pd.Timestamp(d).date()), "value": float(v)}
-        for d, v in zip(df["Date"], df["equity"])
-    ]
-
-    # --- TRADES ---
-    trades = []
-    signals = df[df["signal"].diff() != 0].reset_index(drop=True)
-    for i in range(1, len(signals)):
-        entry = signals.iloc[i - 1]
-        exit = signals.iloc[i]
-
-        entry_date = pd.Timestamp(entry["Date"]).to_pydatetime().date()
-        exit_date = pd.Timestamp(exit["Date"]).to_pydatetime().date()
-
-        trades.append({
-            "entry_date": str(entry_date),
-            "exit_date": str(exit_date),
-            "entry_price": round(float(entry["Close"]), 2),
-            "exit_price": round(float(exit["Close"]), 2),
-            "return_pct": round((float(exit["Close"]) / float(entry["Close"]) - 1) * 100, 2)
-        })
-
-    print(f"✅ Backtest complete for {symbol} — {len(trades)} trades executed")
+        raise HTTPException(status_code=502, detail=f"Failed to fetch {req.symbol}: {e}")
+    if len(history) == 0:
+        raise HTTPException(status_code=404, detail=f"No price data found for {req.symbol}")
+
+    # 🔷 Load once, evaluate the whole grid in batch
+    started = time.perf_counter()
+    try:
+        grid = {name: param_values(spec) for name, spec in req.params.items()}
+        indicators = Indicators(history.close, symbol=req.symbol.upper())
+        with span("sweep.grid"):
+            table = await run_in_threadpool(run_sweep, history.close, req.strategy, grid, indicators)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    elapsed = time.perf_counter() - started
 
     return {
-        "summary": {
-            "total_return": round(total_return, 2),
-            "win_rate": round(win_rate, 2),
-            "max_drawdown": round(max_drawdown, 2),
-        },
-        "equity_curve": equity_curve,
-        "trades": trades,
+        "symbol": req.symbol.upper(),
+        "strategy": req.strategy,
+        "combinations": len(table[req.sort_by]),
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "results": rank(table, req.sort_by, req.limit),
+    }
+
+
+@router.post("/backtest/walkforward")
+async def walk_forward_backtest(req: WalkForwardRequest, db: Session = Depends(get_db)):
+    try:
+        history = await aget_history(req.symbol, req.start_date, req.end_date)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Failed to fetch {req.symbol}: {e}")
+    if len(history) == 0:
+        raise HTTPException(status_code=404, detail=f"No price data found for {req.symbol}")
+
+    # 🔷 Folds run on a process pool over one shared copy of the closes
+    try:
+        return await run_in_threadpool(run_walk_forward, db, req.symbol, req, history)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/backtest/batch")
+def batch_backtest(req: BatchBacktestRequest, db: Session = Depends(get_read_db)):
+    symbols, matrix, missing = load_universe(db, req.symbols, req.start_date, req.end_date)
+    strategies = [(s.strategy, s.params) for s in req.strategies]
+
+    # 🔷 Stream one NDJSON line per (symbol, strategy) as workers finish
+    def lines():
+        for symbol in missing:
+            yield json.dumps({"symbol": symbol, "error": "No price data"}) + "\n"
+        if symbols:
+            for row in run_batch(matrix.close, symbols, strategies, req.workers):
+                yield json.dumps(row) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/backtest/{backtest_id}/rolling_metrics")
+async def rolling_backtest_metrics(
+    backtest_id: int,
+    request: Request,
+    windows: str = Query("63,252", description="comma-separated window lengths in trading days"),
+    benchmark: str | None = Query(None, description="symbol to measure rolling beta against, e.g. ^NSEI"),
+    format: str | None = Query(None, description="json (default), columnar, ndjson or arrow"),
+    db: Session = Depends(get_read_db),
+):
+    fmt = response_format(request, format)
+    try:
+        sizes = sorted({int(w) for w in windows.split(",") if w.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="windows must be comma-separated integers")
+    if not sizes or sizes[0] < 2:
+        raise HTTPException(status_code=400, detail="windows must be at least 2 days")
+
+    dates, values = await run_in_threadpool(_stored_curve, db, backtest_id)
+
+    bench = None
+    if benchmark:
+        try:
+            history = await aget_history(benchmark, str(dates[0]), str(dates[-1] + 1))
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Failed to fetch {benchmark}: {e}")
+        if len(history) == 0:
+            raise HTTPException(status_code=404, detail=f"No price data found for {benchmark}")
+        bench = metrics.align(dates, history.dates, history.close)
+
+    # 🔷 Every window from cumulative sums over the stored curve, O(n) each
+    columns = {"date": dates}
+    for size in sizes:
+        for name, series in metrics.rolling(values, size, benchmark=bench).items():
+            columns[f"{name}_{size}"] = series[:, 0]
+    fields = {
+        "backtest_id": backtest_id,
+        "windows": sizes,
+        "benchmark": benchmark,
+        "summary": metrics.scalar_metrics(metrics.compute(values, benchmark=bench)),
     }
+    if fmt == "json":
+        series = {k: metrics.clean(v) for k, v in columns.items() if k != "date"}
+        return {**fields, "rolling_metrics": {"date": dates.astype(str).tolist(), **series}}
+    return stream_series(fmt, fields, "rolling_metrics", columns)
+
+
+def _stored_curve(db: Session, backtest_id: int):
+    result = db.get(models.BacktestResult, backtest_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Backtest not found")
+    dates, values = metrics.stored_equity(result)
+    if len(values) < 2:
+        raise HTTPException(status_code=404, detail="Backtest has no equity curve")
+    return dates, values
+
+
+@router.get("/backtest/{backtest_id}/montecarlo")
+async def montecarlo_backtest(
+    backtest_id: int,
+    paths: int = Query(10_000, ge=1, le=config.MONTECARLO_MAX_PATHS),
+    method: str = Query("iid", description=f"{' or '.join(METHODS)} bootstrap of the daily returns"),
+    block: int = Query(20, ge=1, description="bars per block for the block bootstrap"),
+    horizon: int | None = Query(None, ge=2, le=config.MONTECARLO_MAX_HORIZON,
+                                 description="bars per path; defaults to the backtest's length, up to the maximum"),
+    seed: int | None = Query(None, ge=0, description="for a reproducible run; the response echoes the one used"),
+    workers: int = Query(0, ge=0, le=config.MONTECARLO_MAX_WORKERS, description="processes; 0 runs inline"),
+    db: Session = Depends(get_read_db),
+):
+    dates, values = await run_in_threadpool(_stored_curve, db, backtest_id)
+    returns = metrics.returns(values)[:, 0]
+    initial = float(values[~np.isnan(values)][0])
+    try:
+        result = await run_in_threadpool(run_montecarlo, returns, initial, paths, method, block, horizon, seed, workers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"backtest_id": backtest_id, "start_date": str(dates[0]), "end_date": str(dates[-1]), **result}
+
+
+# @router.post("/backtest/{symbol}", response_model=BacktestResponse)
+@router.post("/backtest/{symbol}", response_model=BacktestResponse)
+async def run_backtest(
+    symbol: str,
+    req: BacktestRequest,
+    request: Request,
+    format: str | None = Query(None, description="json (default), columnar, ndjson or arrow"),
+    db: Session = Depends(get_db),
+):
+    fmt = response_format(request, format)
+    with span("backtest.prices"):
+        history = await load_symbol_history(symbol, req)
+    # the simulation and the DB round trips stay off the event loop
+    with span("backtest.simulate"):
+        result = await run_in_threadpool(run_symbol_backtest, db, symbol, req, history, fmt != "json")
+    if fmt == "json":
+        return result
+
+    # 🔷 Stream the equity curve straight from its columns, skipping per-point models
+    curve = result.pop("equity_curve")
+    return stream_series(fmt, result, "equity_curve", curve)
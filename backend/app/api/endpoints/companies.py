@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
-from app.core.db import get_db
+from app.core.db import get_db, get_read_conn, get_read_db
+import numpy as np
 import pandas as pd
 from app.models import models
-import yfinance as yf
 from app.schemas.schemas import CompanyCreate, Company
+from app.service.encoding import response_format, stream_series
+from app.service.market_data import aget_info
+from app.service.price_matrix import load_price_matrix
 
 router = APIRouter(
     prefix="/companies",
@@ -25,10 +30,9 @@ def create_company(company: CompanyCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/search/{query}")
-def search_stock(query: str):
+async def search_stock(query: str):
     try:
-        ticker = yf.Ticker(query)
-        info = ticker.info
+        info = await aget_info(query)
         return {
             "symbol": info.get("symbol", query),
             "name": info.get("longName", query),
@@ -39,41 +43,45 @@ def search_stock(query: str):
 
 
 @router.get("/", response_model=list[Company])
-def list_companies(db: Session = Depends(get_db)):
-    return db.query(models.Company).all()
+def list_companies(conn: Connection = Depends(get_read_conn)):
+    # plain rows straight from the read engine; no ORM objects to build
+    rows = conn.execute(select(models.Company.__table__)).mappings()
+    return [dict(row) for row in rows]
 
 @router.get("/{company_id}/monthly_pnl")
-def company_monthly_pnl(company_id: int, db: Session = Depends(get_db)):
-    prices = (
-        db.query(models.Price)
-        .filter(models.Price.company_id == company_id)
-        .order_by(models.Price.date)
-        .all()
-    )
+def company_monthly_pnl(
+    company_id: int,
+    request: Request,
+    format: str | None = Query(None, description="json (default), columnar, ndjson or arrow"),
+    db: Session = Depends(get_read_db),
+):
+    fmt = response_format(request, format)
+    matrix = load_price_matrix(db, [company_id])
 
-    if not prices:
+    if matrix.empty:
         raise HTTPException(status_code=404, detail="No price data")
 
-    df = pd.DataFrame([{"date": p.date, "close": float(p.close)} for p in prices])
-    df.set_index("date", inplace=True)
-    df.index = pd.to_datetime(df.index)
+    df = pd.DataFrame({"close": matrix.column(company_id)}, index=pd.to_datetime(matrix.dates))
     df = df.resample("M").last()
     df["monthly_return"] = df["close"].pct_change().fillna(0)
 
+    if fmt != "json":
+        return stream_series(fmt, {"company_id": company_id}, "monthly_pnl", {
+            "date": df.index.to_numpy().astype("datetime64[D]"),
+            "return": np.round(df["monthly_return"].to_numpy() * 100, 2),
+        })
+
     return {
         "dates": [str(d.date()) for d in df.index],
         "returns": [round(v*100, 2) for v in df["monthly_return"]]
     }
 
 @router.get("/top10")
-def get_top_10_companies(db: Session = Depends(get_db)):
-    companies = (
-        db.query(models.Company)
-        .order_by(models.Company.market_cap.desc())
+def get_top_10_companies(conn: Connection = Depends(get_read_conn)):
+    company = models.Company.__table__.c
+    rows = conn.execute(
+        select(company.id, company.name, company.symbol, company.market_cap)
+        .order_by(company.market_cap.desc())
         .limit(10)
-        .all()
-    )
-    return [
-        {"id": c.id, "name": c.name, "symbol": c.symbol, "market_cap": c.market_cap}
-        for c in companies
-    ]
\ No newline at end of file
+    ).mappings()
+    return [dict(row) for row in rows]
\ No newline at end of file
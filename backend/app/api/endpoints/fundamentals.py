@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends , HTTPException
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
-from app.core.db import get_db
+from app.core.db import get_db, get_read_conn
 from app import models, schemas
 from app.models.models import Fundamental
 from typing import List
@@ -9,8 +11,9 @@ from app.schemas.schemas import FundamentalCreate ,FundamentalResponse
 router = APIRouter()
 
 @router.get("/fundamentals/{company_id}", response_model=List[FundamentalResponse])
-def get_fundamentals(company_id: int, db: Session = Depends(get_db)):
-    fundamentals = db.query(Fundamental).filter_by(company_id=company_id).all()
+def get_fundamentals(company_id: int, conn: Connection = Depends(get_read_conn)):
+    table = Fundamental.__table__
+    fundamentals = [dict(row) for row in conn.execute(select(table).where(table.c.company_id == company_id)).mappings()]
     if not fundamentals:
         raise HTTPException(status_code=404, detail="No fundamentals found")
     return fundamentals
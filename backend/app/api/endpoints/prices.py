@@ -1,27 +1,35 @@
-from fastapi import APIRouter, Depends,HTTPException,Query
+from fastapi import APIRouter, Depends,HTTPException,Query,Request
 from sqlalchemy.orm import Session
 from app.core.db import get_db
 from app import models, schemas
-import yfinance as yf
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
 
 from app.schemas.schemas import PriceCreate
 from app.models.models import Price
+from app.service.encoding import response_format, stream_series
+from app.service.market_data import aget_history
+from app.service.price_cache import price_cache
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
 
 @router.get("/prices/{symbol}")
-def get_prices(
+async def get_prices(
     symbol: str,
+    request: Request,
     start_date: str | None = Query(None, description="YYYY-MM-DD"),
     end_date: str | None = Query(None, description="YYYY-MM-DD"),
+    format: str | None = Query(None, description="json (default), columnar, ndjson or arrow"),
 ):
+    fmt = response_format(request, format)
     try:
         # If dates not provided → default to last 6 months
         if not start_date and not end_date:
-            data = yf.download(symbol, period="6mo", interval="1d")
+            window_start = (pd.Timestamp.now().normalize() - pd.DateOffset(months=6)).strftime("%Y-%m-%d")
+            data = await aget_history(symbol, window_start, None)
         else:
             # Parse dates
             if not start_date:
@@ -29,22 +37,44 @@ def get_prices(
             if not end_date:
                 end_date = datetime.now().strftime("%Y-%m-%d")
 
-            data = yf.download(symbol, start=start_date, end=end_date, interval="1d")
+            data = await aget_history(symbol, start_date, end_date)
 
-        if data.empty:
+        if len(data) == 0:
             raise HTTPException(status_code=404, detail=f"No price data found for {symbol}")
 
+        if fmt != "json":
+            # Stream the columns as they are, no dict per bar
+            return stream_series(fmt, {
+                "symbol": symbol.upper(),
+                "count": len(data),
+                "range": {"start": start_date, "end": end_date},
+            }, "data", {
+                "date": data.dates,
+                "open": np.round(data.open, 2),
+                "high": np.round(data.high, 2),
+                "low": np.round(data.low, 2),
+                "close": np.round(data.close, 2),
+                "volume": np.nan_to_num(data.volume).astype(np.int64),
+            })
+
         # Convert to JSON-friendly format
         prices = [
             {
-                "date": index.strftime("%Y-%m-%d"),
-                "open": round(float(row["Open"]), 2),
-                "high": round(float(row["High"]), 2),
-                "low": round(float(row["Low"]), 2),
-                "close": round(float(row["Close"]), 2),
-                "volume": int(row["Volume"]),
+                "date": d,
+                "open": o,
+                "high": h,
+                "low": l,
+                "close": c,
+                "volume": int(v),
             }
-            for index, row in data.iterrows()
+            for d, o, h, l, c, v in zip(
+                np.datetime_as_string(data.dates, unit="D").tolist(),
+                np.round(data.open, 2).tolist(),
+                np.round(data.high, 2).tolist(),
+                np.round(data.low, 2).tolist(),
+                np.round(data.close, 2).tolist(),
+                np.nan_to_num(data.volume).tolist(),
+            )
         ]
 
         return {
@@ -58,6 +88,11 @@ def get_prices(
         raise HTTPException(status_code=500, detail=f"Error fetching data for {symbol}: {str(e)}")
 
 
+@router.get("/prices/cache/stats")
+def get_price_cache_stats():
+    return price_cache.stats()
+
+
 @router.post("/prices/")
 def create_price():
     raise HTTPException(status_code=405, detail="Manual price creation disabled — data fetched live from yfinance")
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends , HTTPException
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
-from app.core.db import get_db
+from app.core.db import get_db, get_read_conn
 from app import models, schemas
 from datetime import datetime
 from app.schemas.schemas import StrategyCreate
@@ -56,5 +58,5 @@ def create_strategy(strategy: StrategyCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/strategies/")
-def list_strategies(db: Session = Depends(get_db)):
-    return db.query(Strategy).all()
+def list_strategies(conn: Connection = Depends(get_read_conn)):
+    return [dict(row) for row in conn.execute(select(Strategy.__table__)).mappings()]
@@ -0,0 +1,107 @@
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+
+from app.core import config
+
+COLUMNS = "id, company_id, date, open, high, low, close, volume"
+
+
+def is_partitioned(conn) -> bool:
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = 'prices' AND c.relnamespace = current_schema()::regnamespace"
+    )).scalar())
+
+
+def price_partition_years(conn) -> List[int]:
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'prices'::regclass"
+    ))
+    return sorted(int(name[len("prices_y"):]) for name, in rows if name.startswith("prices_y"))
+
+
+def _create_year(conn, year: int):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS prices_y{year} PARTITION OF prices "
+        f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+    ))
+
+
+def ensure_price_partitions(conn, through_year: Optional[int] = None) -> List[int]:
+    """Yearly partitions up to ``through_year`` (next year by default); returns the years created.
+
+    Run ahead of the data (create_table.py does it on every deploy) so new
+    days land in their year's partition rather than the default one.
+    """
+    if conn.dialect.name != "postgresql" or not is_partitioned(conn):
+        return []
+    existing = price_partition_years(conn)
+    first = existing[0] if existing else config.PRICES_PARTITION_FROM
+    through = through_year or date.today().year + 1
+    created = [year for year in range(first, through + 1) if year not in existing]
+    for year in created:
+        _create_year(conn, year)
+    return created
+
+
+def _swap_out(conn, name: str):
+    """Rename the current prices table, its pkey and unique index out of the way."""
+    conn.execute(text(f"ALTER TABLE prices RENAME TO {name}"))
+    conn.execute(text(f"ALTER TABLE {name} RENAME CONSTRAINT prices_pkey TO {name}_pkey"))
+    for index in ("uq_prices_company_date", "ix_prices_id"):
+        conn.execute(text(f"ALTER INDEX IF EXISTS {index} RENAME TO {index}_{name}"))
+    return conn.execute(text(f"SELECT pg_get_serial_sequence('{name}', 'id')")).scalar() or "prices_id_seq"
+
+
+def _move_rows(conn, source: str, sequence: str):
+    conn.execute(text(f"INSERT INTO prices ({COLUMNS}) SELECT {COLUMNS} FROM {source}"))
+    # the id sequence moves with the rows, then the old table can go
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY prices.id"))
+    conn.execute(text(f"DROP TABLE {source} CASCADE"))
+    conn.execute(text("ANALYZE prices"))
+
+
+def partition_prices(conn, first_year: Optional[int] = None):
+    """Rebuild prices as ``PARTITION BY RANGE (date)`` with one partition per year plus a default.
+
+    The primary key becomes (id, date), since a partitioned table's unique
+    keys must include the partition key; rows without a date cannot be
+    placed and are dropped.
+    """
+    sequence = _swap_out(conn, "prices_unpartitioned")
+    conn.execute(text(
+        f"CREATE TABLE prices ("
+        f"id integer NOT NULL DEFAULT nextval('{sequence}'), "
+        f"company_id integer REFERENCES companies (id), date date NOT NULL, "
+        f"open numeric, high numeric, low numeric, close numeric, volume bigint, "
+        f"CONSTRAINT prices_pkey PRIMARY KEY (id, date)"
+        f") PARTITION BY RANGE (date)"
+    ))
+    conn.execute(text("CREATE UNIQUE INDEX uq_prices_company_date ON prices (company_id, date) INCLUDE (close)"))
+
+    data_from = conn.execute(text("SELECT EXTRACT(YEAR FROM MIN(date))::int FROM prices_unpartitioned")).scalar()
+    first = first_year or min(y for y in (config.PRICES_PARTITION_FROM, data_from) if y is not None)
+    for year in range(first, date.today().year + 2):
+        _create_year(conn, year)
+    conn.execute(text("CREATE TABLE prices_default PARTITION OF prices DEFAULT"))
+
+    conn.execute(text("DELETE FROM prices_unpartitioned WHERE date IS NULL"))
+    _move_rows(conn, "prices_unpartitioned", sequence)
+
+
+def unpartition_prices(conn):
+    """Back to one plain prices table (the 0002 schema)."""
+    sequence = _swap_out(conn, "prices_partitioned")
+    conn.execute(text(
+        f"CREATE TABLE prices ("
+        f"id integer NOT NULL DEFAULT nextval('{sequence}'), "
+        f"company_id integer REFERENCES companies (id), date date, "
+        f"open numeric, high numeric, low numeric, close numeric, volume bigint, "
+        f"CONSTRAINT prices_pkey PRIMARY KEY (id))"
+    ))
+    conn.execute(text("CREATE INDEX ix_prices_id ON prices (id)"))
+    conn.execute(text("CREATE UNIQUE INDEX uq_prices_company_date ON prices (company_id, date) INCLUDE (close)"))
+    _move_rows(conn, "prices_partitioned", sequence)
@@ -0,0 +1,197 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# upper bounds in seconds: Prometheus' defaults, stretched for long backtests
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations per label set, exposed as Prometheus does."""
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float] = BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, list] = {}  # labels -> [count per bucket..., +Inf, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        i = bisect_left(self.buckets, seconds)  # buckets are "less than or equal"
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += seconds
+
+    def summary(self) -> Dict[Labels, dict]:
+        """count / total / mean seconds per label set."""
+        with self._lock:
+            items = [(k, sum(s[:-1]), s[-1]) for k, s in self._series.items()]
+        return {k: {"count": n, "seconds": total, "mean": total / n if n else 0.0} for k, n, total in sorted(items)}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(s)) for k, s in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in items:
+            running = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                running += count
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', _number(bound)),))} {running}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(key)} {running}")
+        return lines
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter",
+                *(f"{self.name}{_labels(k)} {_number(v)}" for k, v in items)]
+
+
+def samples(name: str, kind: str, help: str, values: Iterable[Tuple[dict, float]]) -> List[str]:
+    """Exposition lines for values read at scrape time (gauges, or counters kept elsewhere)."""
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}",
+            *(f"{name}{_labels(tuple(sorted((k, str(v)) for k, v in labels.items())))} {_number(value)}"
+              for labels, value in values)]
+
+
+REQUESTS = Histogram("http_request_duration_seconds", "Request latency by method, route template and status.")
+STAGES = Histogram("stage_duration_seconds", "Time spent in named stages of a request or job (spans).")
+UPSTREAM = Histogram("upstream_call_duration_seconds", "Outbound calls (Yahoo, yfinance, news) by target and call.")
+UPSTREAM_ERRORS = Counter("upstream_call_errors_total", "Outbound calls that raised, by target and call.")
+
+# scrape-time collectors: each returns exposition lines
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def collector(fn: Callable[[], List[str]]):
+    """Register ``fn`` to add lines to every /metrics scrape."""
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    lines = []
+    for metric in (REQUESTS, STAGES, UPSTREAM, UPSTREAM_ERRORS):
+        lines.extend(metric.render())
+    for fn in _collectors:
+        lines.extend(fn())
+    return "\n".join(lines) + "\n"
+
+
+# ====== SPANS ======
+
+# the stages of the request being profiled; None when it did not ask
+_profile: ContextVar[Optional[list]] = ContextVar("profile", default=None)
+
+
+def _finish(name: str, started: float):
+    elapsed = time.perf_counter() - started
+    profile = _profile.get()
+    if profile is not None:
+        profile.append((name, elapsed))
+    return elapsed
+
+
+@contextmanager
+def span(name: str):
+    """Time a block (or, as a decorator, a function) into ``stage_duration_seconds{stage=name}``.
+
+    Inside a profiled request the stage also shows up in its Server-Timing
+    header. Worker threads started through run_in_threadpool inherit the
+    request's context, so spans there count too.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGES.observe(_finish(name, started), stage=name)
+
+
+@contextmanager
+def upstream_call(target: str, call: str):
+    """Time one outbound call; failures are counted in ``upstream_call_errors_total``."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        UPSTREAM_ERRORS.inc(target=target, call=call)
+        raise
+    finally:
+        UPSTREAM.observe(_finish(f"upstream.{call}", started), target=target, call=call)
+
+
+@contextmanager
+def profiling():
+    """Collect (stage, seconds) for every span finished in this context into the yielded list."""
+    stages: list = []
+    token = _profile.set(stages)
+    try:
+        yield stages
+    finally:
+        _profile.reset(token)
+
+
+def server_timing(stages: List[Tuple[str, float]], total: float) -> str:
+    """A Server-Timing header value: each stage's summed duration, in order of first appearance, then the total."""
+    summed: Dict[str, list] = {}
+    for name, seconds in stages:
+        entry = summed.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    parts = [f'{name};dur={seconds * 1000:.2f}' + (f';desc="x{count}"' if count > 1 else "")
+             for name, (seconds, count) in summed.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def stage_report(histogram: Histogram = STAGES) -> List[str]:
+    """One line per label set — count, total and mean — for command-line jobs with no /metrics."""
+    lines = []
+    for key, row in histogram.summary().items():
+        label = " ".join(f"{k}={v}" for k, v in key) or "-"
+        lines.append(f"{label:<32} {row['count']:>7} × {row['mean'] * 1000:>9.2f} ms = {row['seconds']:>8.2f} s")
+    return lines
@@ -1,8 +1,41 @@
-# create_tables.py
+# create_tables.py — bring the database schema up to date (alembic upgrade head)
+#
+#   cd backend && python -m app.create_table
 
-from models.models import Base
-from core.db import engine
+import os
 
-print("📄 Creating all tables...")
-Base.metadata.create_all(bind=engine)
-print("✅ Done.")
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.core.db import engine
+from app.core.partitions import ensure_price_partitions
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the tables create_all used to make; databases built that way start here
+BASELINE = "0001"
+
+
+def alembic_config(connection=None) -> Config:
+    cfg = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    cfg.attributes["connection"] = connection
+    return cfg
+
+
+def migrate(bind=engine, revision: str = "head"):
+    with bind.begin() as conn:
+        cfg = alembic_config(conn)
+        tables = set(inspect(conn).get_table_names())
+        if "prices" in tables and "alembic_version" not in tables:
+            command.stamp(cfg, BASELINE)
+        command.upgrade(cfg, revision)
+        created = ensure_price_partitions(conn)
+    if created:
+        print(f"🗂️ Added price partitions for {created[0]}–{created[-1]}")
+
+
+if __name__ == "__main__":
+    print("📄 Migrating schema...")
+    migrate()
+    print("✅ Done.")
@@ -1,7 +1,14 @@
-from fastapi import FastAPI
+import time
+from contextlib import nullcontext
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
 from app.api.endpoints import companies, prices, fundamentals, strategies, backtest ,news
-import requests
+from app.core import config, telemetry
+from app.service.upstream import upstream
 
 
 app = FastAPI()
@@ -22,10 +29,73 @@ app.include_router(backtest.router)
 app.include_router(news.router)
 
 
+def route_template(request: Request) -> str:
+    """The matched route's path ("/backtest/{symbol}"), so latency is grouped per endpoint, not per URL."""
+    route = request.scope.get("route")
+    if route is None:
+        for candidate in request.app.router.routes:
+            if candidate.matches(request.scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", "unmatched")
+
+
+class InstrumentMiddleware:
+    """Latency per route for every request, and a stage breakdown in Server-Timing for
+    requests that send ``X-Profile: 1`` (or ``?profile=1``) when REQUEST_PROFILING is on.
+
+    Plain ASGI rather than ``@app.middleware``: the app runs in the same task,
+    so spans see the request's profile, and the latency covers streamed
+    bodies to their last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        asked = request.headers.get("x-profile") or request.query_params.get("profile") or ""
+        profile = config.REQUEST_PROFILING and asked.lower() in ("1", "true", "yes")
+        started = time.perf_counter()
+        status = 500
+        with telemetry.profiling() if profile else nullcontext() as stages:
+
+            async def timed_send(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if stages is not None:
+                        # the stages finished by the time headers go out
+                        MutableHeaders(scope=message).append(
+                            "Server-Timing", telemetry.server_timing(stages, time.perf_counter() - started))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, timed_send)
+            finally:
+                telemetry.REQUESTS.observe(time.perf_counter() - started, method=scope["method"],
+                                           route=route_template(request), status=status)
+
+
+app.add_middleware(InstrumentMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(telemetry.render(), media_type=telemetry.CONTENT_TYPE)
+
+
+@app.on_event("shutdown")
+async def close_upstream():
+    await upstream.aclose()
+
+
 @app.get("/test-yf")
-def test_yf():
+async def test_yf():
     try:
-        r = requests.get("https://query1.finance.yahoo.com/v8/finance/chart/AAPL")
+        r = await upstream.get(f"{config.YAHOO_CHART_URL}/AAPL")
         return {"status": r.status_code, "length": len(r.text)}
     except Exception as e:
         return {"error": str(e)}
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey, JSON, BigInteger, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey, JSON, BigInteger, TIMESTAMP, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -29,6 +29,11 @@ class Price(Base):
 
     company = relationship("Company", back_populates="prices")
 
+    __table_args__ = (
+        # one row per day; carries close so matrix reads never touch the heap
+        Index("uq_prices_company_date", "company_id", "date", unique=True, postgresql_include=["close"]),
+    )
+
 
 class Fundamental(Base):
     __tablename__ = "fundamentals"
@@ -40,6 +45,10 @@ class Fundamental(Base):
 
     company = relationship("Company", back_populates="fundamentals")
 
+    __table_args__ = (
+        Index("uq_fundamentals_company_metric_date", "company_id", "metric", "date", unique=True),
+    )
+
 
 class Strategy(Base):
     __tablename__ = "strategies"
@@ -60,3 +69,5 @@ class BacktestResult(Base):
     performance_metrics = Column(JSON)
     logs = Column(JSON)
     created_at = Column(TIMESTAMP)
+    digest = Column(String(64), index=True)   # result_cache.result_digest of the run
+    run_key = Column(String(64), index=True)  # result_cache.key_digest of logs["key"]
@@ -1,103 +1,99 @@
 from datetime import datetime
 from app.data.nifty100 import NIFTY_100_SYMBOLS
 from app.core.db import SessionLocal
+from app.core import telemetry
+from app.core.telemetry import span
 from app.models import models
+from app.service.fetcher import SOURCES, fetch_concurrently
+from app.service.ingest import history_start, last_price_dates, write_fundamentals, write_prices
+from app.service.price_cache import bump_data_version
 from sqlalchemy.orm import Session
-import yfinance as yf
+import argparse
 import sys
 import os
-import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-def save_fundamentals(ticker, company_id, db):
-    statements = {
-        "balance_sheet": ticker.balance_sheet,
-        "financials": ticker.financials,
-        "cashflow": ticker.cashflow,
-    }
-
-    for name, df in statements.items():
-        if df.empty:
-            print(f"⚠️ No {name} for company_id {company_id}")
-            continue
-
-        for metric in df.index:
-            for date, value in df.loc[metric].items():
-                db.add(models.Fundamental(
-                    company_id=company_id,
-                    date=date.date(),
-                    metric=f"{name}_{metric}",
-                    value=float(value) if value is not None else 0
-                ))
-    db.commit()
-    print(f"📊 Fundamentals saved for company_id {company_id}")
+def save_company(db, data):
+    info = data.info
+    company = db.query(models.Company).filter_by(symbol=data.symbol).first()
+    if not company:
+        company = models.Company(
+            symbol=data.symbol,
+            name=info.get("longName") or info.get("shortName") or data.symbol,
+            market_cap=info.get("marketCap") or 0,
+            sector=info.get("sector") or "Unknown"
+        )
+        db.add(company)
+        db.commit()
+        db.refresh(company)
+        print(f"✅ Added company: {data.symbol}")
+    return company
 
 
-def fetch_and_save_top_100():
+def fetch_and_save_top_100(incremental=False, source="yfinance", workers=None, rate=None):
     db: Session = SessionLocal()
     print("🚀 Starting data population...")
-    for symbol in NIFTY_100_SYMBOLS:
-        print(f"🔷 Processing {symbol}...")
+    updated = []
+    start_for = {}
+    if incremental:
+        # one grouped query instead of a lookup per (company, date)
+        last_dates = last_price_dates(db)
+        for company_id, symbol in db.query(models.Company.id, models.Company.symbol):
+            if company_id in last_dates:
+                start_for[symbol] = history_start(last_dates[company_id])
+
+    options = {}
+    if workers is not None:
+        options["workers"] = workers
+    if rate is not None:
+        options["rate"] = rate
+
+    # fetches run on a rate-limited thread pool; this loop is the only DB writer
+    for data in fetch_concurrently(NIFTY_100_SYMBOLS, SOURCES[source](), start_for, **options):
+        symbol = data.symbol
+        if data.error:
+            print(f"❌ Error fetching {symbol}: {data.error}")
+            continue
+        print(f"🔷 Processing {symbol} (fetched in {data.elapsed:.1f}s)...")
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            name = info.get("longName") or info.get("shortName") or symbol
-            market_cap = info.get("marketCap") or 0
-            sector = info.get("sector") or "Unknown"
-
-            # insert into companies
-            company = db.query(models.Company).filter_by(symbol=symbol).first()
-            if not company:
-                company = models.Company(
-                    symbol=symbol,
-                    name=name,
-                    market_cap=market_cap,
-                    sector=sector
-                )
-                db.add(company)
-                db.commit()
-                db.refresh(company)
-                print(f"✅ Added company: {symbol}")
+            with span("ingest.company"):
+                company = save_company(db, data)
             company_id = company.id
 
-            # fetch & save price history (last 1y)
-            hist = ticker.history(period="1y")
-            if hist.empty:
-                print(f"⚠️ No price data for {symbol}")
+            # save price history (last 1y, or only after the last stored date)
+            if data.history.empty:
+                print(f"⚠️ No {'new ' if symbol in start_for else ''}price data for {symbol}")
                 continue
 
-            count = 0
-            for date, row in hist.iterrows():
-                existing_price = db.query(models.Price).filter_by(
-                    company_id=company_id, date=date.date()).first()
-                if not existing_price:
-                    price = models.Price(
-                        company_id=company_id,
-                        date=date.date(),
-                        open=float(row["Open"]),
-                        high=float(row["High"]),
-                        low=float(row["Low"]),
-                        close=float(row["Close"]),
-                        volume=int(row["Volume"])
-                    )
-
-                    db.add(price)
-                    count += 1
-            db.commit()
+            with span("ingest.prices"):
+                count = write_prices(db, company_id, data.history)
+                db.commit()
             print(f"📈 {count} price rows saved for {symbol}")
+            if count:
+                updated.append(symbol)
 
             # save fundamentals
-            save_fundamentals(ticker, company_id, db)
-
-            time.sleep(1)  # to avoid rate limit
+            with span("ingest.fundamentals"):
+                count = write_fundamentals(db, company_id, data.statements)
+                db.commit()
+            print(f"📊 {count} fundamentals saved for company_id {company_id}")
 
         except Exception as e:
             db.rollback()
             print(f"❌ Error processing {symbol}: {e}")
 
     db.close()
+    if updated:
+        # let running API processes drop their cached prices
+        bump_data_version(updated)
     print("🎉 Companies, prices, fundamentals populated.")
+    print("⏱️ Upstream calls:")
+    for line in telemetry.stage_report(telemetry.UPSTREAM):
+        print(f"   {line}")
+    print("⏱️ Writer stages:")
+    for line in telemetry.stage_report():
+        print(f"   {line}")
 
 
 def insert_dummy_strategy_and_backtest():
@@ -140,6 +136,17 @@ def insert_dummy_strategy_and_backtest():
 
 
 if __name__ == "__main__":
-    fetch_and_save_top_100()
-    insert_dummy_strategy_and_backtest()
+    parser = argparse.ArgumentParser(description="Populate companies, prices and fundamentals")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fetch prices after each company's last stored date")
+    parser.add_argument("--source", choices=sorted(SOURCES), default="yfinance",
+                        help="where to fetch from ('fake' generates offline data)")
+    parser.add_argument("--workers", type=int, help="concurrent fetch threads")
+    parser.add_argument("--rate", type=float, help="upstream requests per second")
+    args = parser.parse_args()
+
+    fetch_and_save_top_100(incremental=args.incremental, source=args.source,
+                           workers=args.workers, rate=args.rate)
+    if not args.incremental:
+        insert_dummy_strategy_and_backtest()
     print("✅ All data populated.")
@@ -0,0 +1,53 @@
+# Backtest the NIFTY 100 (or given symbols) across a process pool.
+#
+#   python -m app.run_batch --strategy sma_crossover:short_window=20,long_window=50 --strategy buy_hold --workers 4
+import argparse
+import time
+
+from app.core.db import SessionLocal
+from app.service.batch import default_workers, run_batch
+from app.service.price_matrix import load_universe
+
+
+def parse_strategy(text):
+    name, _, raw = text.partition(":")
+    params = {}
+    for pair in filter(None, raw.split(",")):
+        key, _, value = pair.partition("=")
+        params[key.strip()] = float(value)
+    return name.strip(), params
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch backtest a universe of symbols")
+    parser.add_argument("--strategy", action="append", type=parse_strategy,
+                        help="name[:key=value,...]; repeatable (default buy_hold)")
+    parser.add_argument("--symbols", nargs="*", help="defaults to NIFTY 100")
+    parser.add_argument("--start", help="YYYY-MM-DD")
+    parser.add_argument("--end", help="YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=default_workers())
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        symbols, matrix, missing = load_universe(db, args.symbols, args.start, args.end)
+    finally:
+        db.close()
+    for symbol in missing:
+        print(f"⚠️ No price data for {symbol}")
+    if not symbols:
+        return
+
+    strategies = args.strategy or [("buy_hold", {})]
+    print(f"🚀 {len(symbols)} symbols × {len(strategies)} strategies on {args.workers} workers")
+    started = time.perf_counter()
+    count = 0
+    for row in run_batch(matrix.close, symbols, strategies, args.workers):
+        count += 1
+        print(f"📈 {row['symbol']:<16} {row['strategy']:<14} return {row['total_return']:>8}%  "
+              f"win {row['win_rate']:>6}%  maxDD {row['max_drawdown']:>7}%")
+    print(f"✅ {count} backtests in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
-from pydantic import BaseModel,field_validator
+from pydantic import BaseModel,Field,field_validator
 from datetime import date
 from typing import Optional, List, Dict
 import math
 
+from app.core import config
+
 
 class CompanyCreate(BaseModel):
     symbol: str
@@ -39,6 +41,7 @@ class BacktestRunRequest(BaseModel):
     start_date: date
     end_date: date
     initial_capital: Optional[float] = 100000
+    rebalance_frequency: str = "quarterly"  # daily | weekly | monthly | quarterly
 
 
 # New Backtest Strategy Request 
@@ -47,6 +50,8 @@ class BacktestRequest(BaseModel):
     params:Dict[str,float]
     start_date:Optional[str]=None
     end_date:Optional[str]=None
+    commission:float=0.0   # fraction of notional, charged on entry and exit
+    slippage:float=0.0     # fraction of price, against each fill
 
 class Summary(BaseModel):
     total_return :float
@@ -59,11 +64,16 @@ class EquityPoint(BaseModel):
 
 
 class Trade(BaseModel):
+    side: str       # long | short
     entry_date: str
     exit_date: str
-    entry_price: float
-    exit_price: float
-    return_pct: float
+    entry_price: Optional[float]
+    exit_price: Optional[float]
+    holding_bars: int
+    holding_days: int
+    return_pct: Optional[float]
+    cost_pct: Optional[float]
+    net_return_pct: Optional[float]
     
 # class Trade(BaseModel):
 class BacktestResponse(BaseModel):
@@ -72,6 +82,50 @@ class BacktestResponse(BaseModel):
     trades:List[Trade]
 
 
+# Parameter sweep
+class ParamRange(BaseModel):
+    start: float = 0
+    stop: float = 0
+    step: float = 1
+    values: Optional[List[float]] = None
+
+class SweepRequest(BaseModel):
+    symbol: str
+    strategy: str
+    params: Dict[str, ParamRange]
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    sort_by: str = "total_return"
+    limit: Optional[int] = Field(100, ge=1, le=config.SWEEP_MAX_COMBINATIONS)  # rows returned; None for all
+
+
+# Walk-forward optimization: tune on each train window, trade the winner on the next test window
+class WalkForwardRequest(BaseModel):
+    symbol: str
+    strategy: str
+    params: Dict[str, ParamRange]
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    train_days: int = Field(504, ge=20)     # bars
+    test_days: int = Field(126, ge=5)
+    mode: str = "rolling"     # or "anchored"
+    sort_by: str = "total_return"
+    workers: Optional[int] = Field(None, ge=0, le=config.WALKFORWARD_MAX_WORKERS)   # 0 runs the folds inline
+
+
+# Batch backtest over a universe
+class StrategySpec(BaseModel):
+    strategy: str
+    params: Dict[str, float] = {}
+
+class BatchBacktestRequest(BaseModel):
+    symbols: Optional[List[str]] = None   # defaults to NIFTY 100
+    strategies: List[StrategySpec]
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    workers: Optional[int] = Field(None, ge=0, le=config.BATCH_MAX_WORKERS)   # 0 runs inline
+
+
 
 
 class FundamentalResponse(BaseModel):
@@ -0,0 +1,121 @@
+import math
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.service import engine
+
+
+class SharedArray:
+    """Copies an array into a named shared-memory block that workers attach to.
+
+    Workers receive only ``spec`` (name, shape, dtype), never the data itself.
+    The creating process unlinks the block on ``close``.
+    """
+
+    def __init__(self, array: np.ndarray):
+        array = np.ascontiguousarray(array)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf)[...] = array
+        self.spec = (self._shm.name, array.shape, array.dtype.str)
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# worker side: arrays over the blocks attached so far, most recent last
+_attached = {}
+_MAX_ATTACHED = 4
+
+
+def attach(spec) -> np.ndarray:
+    name, shape, dtype = spec
+    array = _attached.get(name)
+    if array is None:
+        while len(_attached) >= _MAX_ATTACHED:
+            # only the reference is dropped: a block is closed once no view of it is left
+            _attached.pop(next(iter(_attached)))
+        shm = shared_memory.SharedMemory(name=name)
+        array = _attached[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        weakref.finalize(array, shm.close)
+    return array
+
+
+def _summaries(close, lo, strategy, params):
+    summary = engine.run_strategy(close, strategy, params).summary()
+    bars = (~np.isnan(close)).sum(axis=0)
+    return [
+        (lo + j, strategy, params, float(summary["total_return"][j]), float(summary["win_rate"][j]),
+         float(summary["max_drawdown"][j]), int(bars[j]))
+        for j in range(close.shape[1])
+    ]
+
+
+def _run_job(spec, lo, hi, strategy, params):
+    # contiguous column slice of the shared block — a view, no copy
+    return _summaries(attach(spec)[:, lo:hi], lo, strategy, params)
+
+
+def _row(symbols, result) -> dict:
+    col, strategy, params, total_return, win_rate, max_drawdown, bars = result
+    clean = lambda v: None if math.isnan(v) else round(v, 2)
+    return {
+        "symbol": symbols[col],
+        "strategy": strategy,
+        "params": params,
+        "bars": bars,
+        "total_return": clean(total_return),
+        "win_rate": clean(win_rate),
+        "max_drawdown": clean(max_drawdown),
+    }
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def run_batch(
+    close: np.ndarray,
+    symbols: Sequence[str],
+    strategies: List[tuple],
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[dict]:
+    """Backtest every (symbol, strategy) pair, yielding summaries as they finish.
+
+    ``close`` is dates × symbols; ``strategies`` is a list of (name, params).
+    ``workers=0`` runs inline in this process.
+    """
+    workers = default_workers() if workers is None else workers
+    n = close.shape[1]
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(n / (max(workers, 1) * 4)))
+    jobs = [(lo, min(lo + chunk_size, n), name, params)
+            for name, params in strategies for lo in range(0, n, chunk_size)]
+
+    if workers == 0:
+        for lo, hi, name, params in jobs:
+            for result in _summaries(close[:, lo:hi], lo, name, params):
+                yield _row(symbols, result)
+        return
+
+    with SharedArray(close) as shared, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_job, shared.spec, lo, hi, name, params) for lo, hi, name, params in jobs]
+        try:
+            for future in as_completed(futures):
+                for result in future.result():
+                    yield _row(symbols, result)
+        finally:
+            for future in futures:
+                future.cancel()
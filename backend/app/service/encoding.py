@@ -0,0 +1,102 @@
+import json
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pyarrow as pa
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+NDJSON = "application/x-ndjson"
+ARROW = "application/vnd.apache.arrow.stream"
+# json: the endpoint's usual body; columnar: the series as {column: [...]};
+# ndjson: a header line, then one object per row; arrow: one IPC record batch
+# with the other fields as JSON in the schema metadata under "fields"
+FORMATS = ("json", "columnar", "ndjson", "arrow")
+CHUNK_ROWS = 8192
+
+
+def response_format(request: Request, format: Optional[str] = None) -> str:
+    """``?format=`` when given, else arrow or ndjson if the Accept header asks for it, else json."""
+    if format:
+        if format not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+        return format
+    accept = request.headers.get("accept", "")
+    if ARROW in accept:
+        return "arrow"
+    return "ndjson" if NDJSON in accept else "json"
+
+
+def _literals(values) -> list:
+    """JSON literals for one column chunk, without building a Python object per row."""
+    x = np.asarray(values)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return ['"%s"' % d for d in np.datetime_as_string(x, unit="D").tolist()]
+    if x.dtype == np.bool_:
+        return ["true" if v else "false" for v in x.tolist()]
+    if np.issubdtype(x.dtype, np.integer):
+        return list(map(str, x.tolist()))
+    if np.issubdtype(x.dtype, np.floating):
+        # float repr is what json.dumps writes; NaN/inf have no JSON literal
+        out = list(map(float.__repr__, x.astype(np.float64).tolist()))
+        for i in np.flatnonzero(~np.isfinite(x)).tolist():
+            out[i] = "null"
+        return out
+    return [json.dumps(v) for v in x.tolist()]
+
+
+def _length(columns: Dict[str, object]) -> int:
+    return len(next(iter(columns.values()))) if columns else 0
+
+
+def ndjson_lines(header: dict, columns: Dict[str, object], chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """``header`` as the first line, then ``{"<column>": value, ...}`` per row, in chunks."""
+    yield json.dumps(header) + "\n"
+    names = list(columns)
+    row = "{" + ",".join(f"{json.dumps(name)}:%s" for name in names) + "}\n"
+    for lo in range(0, _length(columns), chunk_rows):
+        chunk = [_literals(columns[name][lo:lo + chunk_rows]) for name in names]
+        yield "".join(row % values for values in zip(*chunk))
+
+
+def columnar_json(fields: dict, key: str, columns: Dict[str, object],
+                  chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """``{**fields, key: {"<column>": [...], ...}}`` written column chunk by column chunk."""
+    head = json.dumps(fields)[:-1]
+    yield head + (", " if fields else "") + json.dumps(key) + ": {"
+    n = _length(columns)
+    for i, name in enumerate(columns):
+        yield (", " if i else "") + json.dumps(name) + ": ["
+        for lo in range(0, n, chunk_rows):
+            yield ("," if lo else "") + ",".join(_literals(columns[name][lo:lo + chunk_rows]))
+        yield "]"
+    yield "}}"
+
+
+def _arrow_array(values) -> pa.Array:
+    x = np.asarray(values)
+    if x.dtype.kind in "MUS":
+        # dates (datetime64 or ISO strings) → date32
+        return pa.array(x.astype("datetime64[D]").astype(np.int32), type=pa.date32())
+    if x.dtype.kind == "f":
+        return pa.array(x)  # zero-copy; NaN stays NaN
+    return pa.array(x, from_pandas=True)
+
+
+def arrow_ipc(fields: dict, columns: Dict[str, object]) -> pa.Buffer:
+    """``columns`` as one Arrow IPC stream record batch, ``fields`` in its schema metadata."""
+    batch = pa.record_batch([_arrow_array(v) for v in columns.values()], names=list(columns),
+                            metadata={"fields": json.dumps(fields)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue()
+
+
+def stream_series(fmt: str, fields: dict, key: str, columns: Dict[str, object]) -> Response:
+    """``fields`` plus one series in ``fmt``, encoded straight from its column arrays."""
+    if fmt == "arrow":
+        return Response(arrow_ipc(fields, columns).to_pybytes(), media_type=ARROW)
+    if fmt == "ndjson":
+        return StreamingResponse(ndjson_lines(fields, columns), media_type=NDJSON)
+    return StreamingResponse(columnar_json(fields, key, columns), media_type="application/json")
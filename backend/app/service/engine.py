@@ -0,0 +1,339 @@
+import numpy as np
+
+# |a - b| below this fraction of the larger value counts as a tie, so that
+# cumulative-sum rounding never turns an exact crossover tie into a signal
+TIE_RTOL = 1e-10
+
+
+def as_matrix(values) -> np.ndarray:
+    """Coerce a 1-D series or a dates × symbols array to float64 2-D."""
+    x = np.asarray(values, dtype=np.float64)
+    return x.reshape(-1, 1) if x.ndim == 1 else x
+
+
+def rolling_mean(values, window: int) -> np.ndarray:
+    """``rolling(window).mean()`` down axis 0 from a single cumulative sum.
+
+    Matches pandas with ``min_periods=window``: NaN until ``window`` valid
+    values are inside the window.
+    """
+    x = as_matrix(values)
+    n = x.shape[0]
+    out = np.full(x.shape, np.nan)
+    if window < 1 or window > n:
+        return out
+    valid = ~np.isnan(x)
+    csum = np.zeros((n + 1, x.shape[1]))
+    np.cumsum(np.where(valid, x, 0.0), axis=0, out=csum[1:])
+    ccount = np.zeros((n + 1, x.shape[1]), dtype=np.int64)
+    np.cumsum(valid, axis=0, out=ccount[1:])
+    total = csum[window:] - csum[:-window]
+    count = ccount[window:] - ccount[:-window]
+    out[window - 1:] = np.where(count == window, total / window, np.nan)
+    return out
+
+
+def rolling_means(series, windows) -> np.ndarray:
+    """Rolling means of one 1-D series for many window lengths (bars × windows), one cumsum."""
+    x = np.asarray(series, dtype=np.float64).ravel()
+    windows = np.asarray(windows, dtype=np.int64)
+    n = len(x)
+    valid = ~np.isnan(x)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+    end = np.arange(1, n + 1)[:, None]
+    start = end - windows[None, :]
+    ok = start >= 0
+    start = np.maximum(start, 0)
+    total = csum[end] - csum[start]
+    count = ccount[end] - ccount[start]
+    with np.errstate(invalid="ignore"):
+        return np.where(ok & (count == windows[None, :]), total / windows[None, :], np.nan)
+
+
+def crossover(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    """+1 where fast > slow, -1 where fast < slow, 0 on ties or NaN."""
+    diff = fast - slow
+    tol = TIE_RTOL * np.maximum(np.abs(fast), np.abs(slow))
+    with np.errstate(invalid="ignore"):
+        return np.where(diff > tol, 1, np.where(diff < -tol, -1, 0)).astype(np.int8)
+
+
+def ffill(values: np.ndarray) -> np.ndarray:
+    """Forward fill NaNs down axis 0 (1-D or 2-D) without a Python loop."""
+    mask = np.isnan(values)
+    if not mask.any():
+        return values
+    idx = np.where(~mask, np.arange(values.shape[0]).reshape(-1, *([1] * (values.ndim - 1))), 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    if values.ndim == 1:
+        return values[idx]
+    return np.take_along_axis(values, idx, axis=0)
+
+
+def pct_change(close) -> np.ndarray:
+    x = ffill(as_matrix(close))
+    out = np.full(x.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = x[1:] / x[:-1] - 1
+    return out
+
+
+# ====== SIGNALS ======
+
+def sma_crossover_signals(close, short_window: int, long_window: int) -> np.ndarray:
+    close = as_matrix(close)
+    return crossover(rolling_mean(close, short_window), rolling_mean(close, long_window))
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    close = as_matrix(close)
+    delta = np.full(close.shape, np.nan)
+    delta[1:] = close[1:] - close[:-1]
+    # same as Series.where(delta > 0, 0): the leading NaN diff counts as 0
+    with np.errstate(invalid="ignore"):
+        gain = rolling_mean(np.where(delta > 0, delta, 0.0), period)
+        loss = rolling_mean(np.where(delta < 0, -delta, 0.0), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + gain / loss))
+
+
+def rsi_levels(values, overbought: float = 70, oversold: float = 30) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        return np.where(values < oversold, 1, np.where(values > overbought, -1, 0)).astype(np.int8)
+
+
+def rsi_signals(close, period: int = 14, overbought: float = 70, oversold: float = 30) -> np.ndarray:
+    return rsi_levels(rsi(close, period), overbought, oversold)
+
+
+def buy_hold_signals(close) -> np.ndarray:
+    return np.ones(as_matrix(close).shape, dtype=np.int8)
+
+
+def strategy_signals(close, strategy: str, params: dict, indicators=None) -> np.ndarray:
+    """Signals for every column; ``indicators`` (an ``indicators.Indicators`` over
+    the same single series) supplies the SMAs / RSI from its cache instead."""
+    if strategy == "sma_crossover":
+        short_window = int(params.get("short_window", 20))
+        long_window = int(params.get("long_window", 50))
+        if indicators is not None:
+            return crossover(indicators.get("sma", short_window), indicators.get("sma", long_window)).reshape(-1, 1)
+        return sma_crossover_signals(close, short_window, long_window)
+    if strategy in ("rsi", "rsi_strategy"):
+        period = int(params.get("period", 14))
+        overbought, oversold = params.get("overbought", 70), params.get("oversold", 30)
+        if indicators is not None:
+            return rsi_levels(indicators.get("rsi", period), overbought, oversold).reshape(-1, 1)
+        return rsi_signals(close, period, overbought, oversold)
+    return buy_hold_signals(close)
+
+
+# ====== RETURNS ======
+
+class EngineResult:
+    """Per-bar arrays for every column, shaped like the close matrix."""
+
+    __slots__ = ("signal", "daily_return", "strategy_return", "equity", "drawdown")
+
+    def __init__(self, signal, daily_return, strategy_return, equity, drawdown):
+        self.signal = signal
+        self.daily_return = daily_return
+        self.strategy_return = strategy_return
+        self.equity = equity
+        self.drawdown = drawdown
+
+    def summary(self, base: float = 100.0) -> dict:
+        """total_return / win_rate / max_drawdown per column, in percent."""
+        sr = self.strategy_return
+        counted = (~np.isnan(sr)).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            wins = (sr > 0).sum(axis=0)
+            win_rate = np.where(counted > 0, wins / counted * 100, np.nan)
+        return {
+            "total_return": self.equity[-1] - base,
+            "win_rate": win_rate,
+            "max_drawdown": self.drawdown.min(axis=0) * 100,
+        }
+
+
+def simulate(close, signal, base: float = 100.0) -> EngineResult:
+    """Hold yesterday's signal through today's return, for all columns at once."""
+    daily_return = pct_change(close)
+    signal = np.asarray(signal)
+    if signal.ndim == 1:
+        signal = signal.reshape(-1, 1)
+    # signal columns may outnumber close columns (e.g. a parameter grid over one symbol)
+    held = np.empty(signal.shape)
+    held[0] = np.nan
+    held[1:] = signal[:-1]
+    strategy_return = held * daily_return
+    equity = np.cumprod(1 + np.where(np.isnan(strategy_return), 0.0, strategy_return), axis=0) * base
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+    return EngineResult(signal, daily_return, strategy_return, equity, drawdown)
+
+
+def run_strategy(close, strategy: str, params: dict, base: float = 100.0, indicators=None) -> EngineResult:
+    return simulate(close, strategy_signals(close, strategy, params, indicators), base)
+
+
+# ====== INCREMENTAL ======
+
+def _rolling_sources(strategy: str, params: dict) -> dict:
+    """Series whose rolling means a strategy needs, with their window lengths."""
+    if strategy == "sma_crossover":
+        return {"close": [int(params.get("short_window", 20)), int(params.get("long_window", 50))]}
+    if strategy in ("rsi", "rsi_strategy"):
+        period = int(params.get("period", 14))
+        return {"gain": [period], "loss": [period]}
+    return {}
+
+
+def _num(x):
+    x = float(x)
+    return x if np.isfinite(x) else None
+
+
+def _float(x, default=np.nan) -> float:
+    return default if x is None else float(x)
+
+
+class EngineState:
+    """One column's engine state after its last bar, so a run can be continued
+    with only the new bars and give exactly what a full recompute would.
+
+    Holds the tails of the cumulative sums behind every rolling mean, the last
+    raw and forward-filled close, the last signal, the equity growth factor,
+    the running peak and the counters behind ``summary``.
+    """
+
+    def __init__(self, strategy: str, params: dict, base: float = 100.0):
+        self.strategy = strategy
+        self.params = dict(params)
+        self.base = base
+        self.n = 0
+        self.last_close = np.nan
+        self.last_filled = np.nan
+        self.last_signal = None
+        self.growth = 1.0
+        self.peak = -np.inf
+        self.min_drawdown = np.inf
+        self.wins = 0
+        self.counted = 0
+        sources = _rolling_sources(strategy, self.params)
+        self.sums = {name: [0.0] for name in sources}
+        self.counts = {name: [0] for name in sources}
+
+    def _rolling(self, name: str, x: np.ndarray, windows) -> list:
+        # continue the cumulative sums from the stored tail: same additions, same order
+        valid = ~np.isnan(x)
+        tail_sum, tail_count = self.sums[name], self.counts[name]
+        csum = np.concatenate((tail_sum[:-1], np.cumsum(np.concatenate(([tail_sum[-1]], np.where(valid, x, 0.0))))))
+        ccount = np.concatenate((tail_count[:-1], np.cumsum(np.concatenate(([tail_count[-1]], valid)))))
+        offset = self.n + 1 - len(tail_sum)  # global index of csum[0]
+        end = np.arange(self.n + 1, self.n + len(x) + 1)
+        out = []
+        for window in windows:
+            begin = end - window
+            if window < 1:
+                out.append(np.full(len(x), np.nan))
+                continue
+            ok = begin >= 0
+            lo = np.maximum(begin, offset) - offset
+            total = csum[end - offset] - csum[lo]
+            count = ccount[end - offset] - ccount[lo]
+            with np.errstate(invalid="ignore"):
+                out.append(np.where(ok & (count == window), total / window, np.nan))
+        keep = max(max(windows), 1)
+        self.sums[name] = csum[-keep:].tolist()
+        self.counts[name] = ccount[-keep:].tolist()
+        return out
+
+    def _signals(self, close: np.ndarray) -> np.ndarray:
+        sources = _rolling_sources(self.strategy, self.params)
+        if self.strategy == "sma_crossover":
+            fast, slow = self._rolling("close", close, sources["close"])
+            return crossover(fast, slow)
+        if self.strategy in ("rsi", "rsi_strategy"):
+            delta = np.diff(np.concatenate(([self.last_close], close)))
+            with np.errstate(invalid="ignore"):
+                gain, = self._rolling("gain", np.where(delta > 0, delta, 0.0), sources["gain"])
+                loss, = self._rolling("loss", np.where(delta < 0, -delta, 0.0), sources["loss"])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = 100 - (100 / (1 + gain / loss))
+                return np.where(values < self.params.get("oversold", 30), 1,
+                                np.where(values > self.params.get("overbought", 70), -1, 0)).astype(np.int8)
+        return np.ones(len(close), dtype=np.int8)
+
+    def advance(self, close) -> EngineResult:
+        """Process the bars after the last one seen; returns their per-bar arrays."""
+        close = np.asarray(close, dtype=np.float64).ravel()
+        signal = self._signals(close)
+
+        filled = ffill(np.concatenate(([self.last_filled], close)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            daily_return = filled[1:] / filled[:-1] - 1
+        held = np.concatenate(([np.nan if self.last_signal is None else self.last_signal], signal[:-1]))
+        strategy_return = held * daily_return
+        growth = np.cumprod(np.concatenate(([self.growth], 1 + np.where(np.isnan(strategy_return), 0.0, strategy_return))))[1:]
+        equity = growth * self.base
+        peak = np.maximum.accumulate(np.concatenate(([self.peak], equity)))[1:]
+        drawdown = equity / peak - 1
+
+        if len(close):
+            self.n += len(close)
+            self.last_close = close[-1]
+            self.last_filled = filled[-1]
+            self.last_signal = int(signal[-1])
+            self.growth = growth[-1]
+            self.peak = peak[-1]
+            self.min_drawdown = min(self.min_drawdown, drawdown.min())
+            self.counted += int((~np.isnan(strategy_return)).sum())
+            with np.errstate(invalid="ignore"):
+                self.wins += int((strategy_return > 0).sum())
+        col = lambda a: a.reshape(-1, 1)
+        return EngineResult(col(signal), col(daily_return), col(strategy_return), col(equity), col(drawdown))
+
+    def summary(self) -> dict:
+        """Same numbers as ``EngineResult.summary`` over every bar seen so far."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            win_rate = np.float64(self.wins) / np.float64(self.counted) * 100 if self.counted else np.nan
+        return {
+            "total_return": self.growth * self.base - self.base,
+            "win_rate": win_rate,
+            "max_drawdown": self.min_drawdown * 100 if self.n else np.nan,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "params": self.params,
+            "base": self.base,
+            "n": self.n,
+            "last_close": _num(self.last_close),
+            "last_filled": _num(self.last_filled),
+            "last_signal": self.last_signal,
+            "growth": float(self.growth),
+            "peak": _num(self.peak),
+            "min_drawdown": _num(self.min_drawdown),
+            "wins": self.wins,
+            "counted": self.counted,
+            "sums": self.sums,
+            "counts": self.counts,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "EngineState":
+        state = cls(d["strategy"], d["params"], d["base"])
+        state.n = d["n"]
+        state.last_close = _float(d["last_close"])
+        state.last_filled = _float(d["last_filled"])
+        state.last_signal = d["last_signal"]
+        state.growth = d["growth"]
+        state.peak = _float(d["peak"], -np.inf)
+        state.min_drawdown = _float(d["min_drawdown"], np.inf)
+        state.wins = d["wins"]
+        state.counted = d["counted"]
+        state.sums = {k: [float(v) for v in vals] for k, vals in d["sums"].items()}
+        state.counts = {k: [int(v) for v in vals] for k, vals in d["counts"].items()}
+        return state
@@ -0,0 +1,198 @@
+import queue
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core import config, telemetry
+
+
+class SymbolData:
+    """Everything ingestion needs for one symbol, fetched before any DB write."""
+
+    __slots__ = ("symbol", "info", "history", "statements", "error", "elapsed")
+
+    def __init__(self, symbol, info=None, history=None, statements=None, error=None, elapsed=0.0):
+        self.symbol = symbol
+        self.info = info or {}
+        self.history = history if history is not None else pd.DataFrame()
+        self.statements = statements or {}
+        self.error = error
+        self.elapsed = elapsed
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` calls/second with bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def with_retries(fn: Callable, retries: int, backoff: float):
+    """Call ``fn``; on failure retry with exponential backoff plus jitter."""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+
+# ====== SOURCES ======
+
+class FetchSource(ABC):
+    """Where ingestion gets market data from. ``call`` wraps each upstream request
+    with rate limiting and retries; sources should route every request through it."""
+
+    name = "source"
+
+    @abstractmethod
+    def fetch(self, symbol: str, start: Optional[str], call: Callable) -> SymbolData:
+        """One symbol's prices (and whatever else the source has) since ``start``."""
+
+
+class YFinanceSource(FetchSource):
+    name = "yfinance"
+
+    def fetch(self, symbol, start, call):
+        import yfinance as yf
+
+        ticker = yf.Ticker(symbol)
+        info = call(lambda: ticker.info)
+        if start:
+            history = call(lambda: ticker.history(start=start))
+        else:
+            history = call(lambda: ticker.history(period="1y"))
+        statements = {
+            "balance_sheet": call(lambda: ticker.balance_sheet),
+            "financials": call(lambda: ticker.financials),
+            "cashflow": call(lambda: ticker.cashflow),
+        }
+        return SymbolData(symbol, info, history, statements)
+
+
+class FakeSource(FetchSource):
+    """Deterministic offline provider: random-walk prices and a small set of
+    statements per symbol, with optional latency and injected failures."""
+
+    name = "fake"
+
+    def __init__(self, days: int = 250, latency: float = 0.0, failure_rate: float = 0.0,
+                 end: Optional[str] = None):
+        self.days = days
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.end = pd.Timestamp(end or pd.Timestamp.today().normalize())
+
+    def _request(self, make):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise ConnectionError("fake upstream failure")
+        return make()
+
+    def fetch(self, symbol, start, call):
+        seed = sum(map(ord, symbol))
+        rng = np.random.default_rng(seed)
+        index = pd.bdate_range(end=self.end, periods=self.days, name="Date")
+        close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.015, self.days))
+        frame = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                              "Volume": rng.integers(10**4, 10**6, self.days)}, index=index)
+        if start:
+            frame = frame[frame.index >= pd.Timestamp(start)]
+        periods = pd.to_datetime([f"{self.end.year - k}-03-31" for k in range(1, 4)])
+        statement = lambda metrics: pd.DataFrame(rng.normal(1e9, 2e8, (len(metrics), len(periods))),
+                                                 index=metrics, columns=periods)
+
+        info = call(lambda: self._request(lambda: {
+            "longName": f"{symbol} Ltd", "marketCap": int(rng.integers(10**10, 10**13)), "sector": "Fake"}))
+        history = call(lambda: self._request(lambda: frame))
+        statements = {
+            "balance_sheet": call(lambda: self._request(lambda: statement(["Stockholders Equity", "Total Assets"]))),
+            "financials": call(lambda: self._request(lambda: statement(["Net Income", "Total Revenue"]))),
+            "cashflow": call(lambda: self._request(lambda: statement(["Free Cash Flow"]))),
+        }
+        return SymbolData(symbol, info, history, statements)
+
+
+SOURCES = {"yfinance": YFinanceSource, "fake": FakeSource}
+
+
+# ====== PIPELINE ======
+
+_DONE = object()
+
+
+def fetch_concurrently(
+    symbols: Iterable[str],
+    source: FetchSource,
+    start_for: Optional[Dict[str, str]] = None,
+    workers: int = config.FETCH_WORKERS,
+    rate: float = config.FETCH_RATE,
+    retries: int = config.FETCH_RETRIES,
+    backoff: float = config.FETCH_BACKOFF,
+    buffer: int = config.FETCH_BUFFER,
+):
+    """Fetch symbols on a bounded thread pool and yield each ``SymbolData`` as it
+    arrives, so the caller (the DB writer) consumes while fetches continue.
+
+    At most ``buffer`` fetched symbols wait for the writer; producers block
+    beyond that. Failures come back as ``SymbolData`` with ``error`` set.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    start_for = start_for or {}
+    limiter = TokenBucket(rate, capacity=max(rate, 1.0))
+    handoff: "queue.Queue" = queue.Queue(maxsize=max(buffer, 1))
+
+    def call(fn):
+        def limited():
+            limiter.acquire()
+            # each attempt, not counting the wait for a token
+            with telemetry.upstream_call(source.name, "fetch"):
+                return fn()
+        return with_retries(limited, retries, backoff)
+
+    def produce(symbol):
+        started = time.perf_counter()
+        try:
+            data = source.fetch(symbol, start_for.get(symbol), call)
+        except Exception as e:
+            data = SymbolData(symbol, error=str(e))
+        data.elapsed = time.perf_counter() - started
+        handoff.put(data)
+
+    def run_producers():
+        with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="fetch") as pool:
+            list(pool.map(produce, symbols))
+        handoff.put(_DONE)
+
+    threading.Thread(target=run_producers, name="fetch-pool", daemon=True).start()
+    while True:
+        item = handoff.get()
+        if item is _DONE:
+            return
+        yield item
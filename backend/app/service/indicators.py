@@ -0,0 +1,229 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core import config
+from app.service import engine
+
+# name -> (inputs, compute); compute(indicators, values) returns bars × len(values)
+NODES: Dict[str, Tuple[Tuple[str, ...], Callable]] = {}
+
+
+def node(name: str, *inputs: str):
+    """Register an indicator computed from the named ``inputs`` (other nodes, or the close)."""
+    def register(compute):
+        NODES[name] = (inputs, compute)
+        return compute
+    return register
+
+
+@node("returns")
+def _returns(ind, values):
+    return engine.pct_change(ind.close)
+
+
+@node("delta")
+def _delta(ind, values):
+    delta = np.full((len(ind.close), 1), np.nan)
+    delta[1:, 0] = np.diff(ind.close)
+    return delta
+
+
+@node("gain", "delta")
+def _gain(ind, values):
+    delta = ind.get("delta")
+    # the leading NaN diff counts as 0, as in engine.rsi
+    with np.errstate(invalid="ignore"):
+        return np.where(delta > 0, delta, 0.0).reshape(-1, 1)
+
+
+@node("loss", "delta")
+def _loss(ind, values):
+    delta = ind.get("delta")
+    with np.errstate(invalid="ignore"):
+        return np.where(delta < 0, -delta, 0.0).reshape(-1, 1)
+
+
+@node("sma")
+def _sma(ind, windows):
+    return engine.rolling_means(ind.close, windows)
+
+
+@node("avg_gain", "gain")
+def _avg_gain(ind, windows):
+    return engine.rolling_means(ind.get("gain"), windows)
+
+
+@node("avg_loss", "loss")
+def _avg_loss(ind, windows):
+    return engine.rolling_means(ind.get("loss"), windows)
+
+
+@node("rsi", "avg_gain", "avg_loss")
+def _rsi(ind, periods):
+    gain, loss = ind.many("avg_gain", periods), ind.many("avg_loss", periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + gain / loss))
+
+
+@node("ema")
+def _ema(ind, spans):
+    # recursive EMA (adjust=False), NaN until ``span`` bars, like the SMA warm-up
+    close = pd.Series(ind.close)
+    return np.column_stack([close.ewm(span=s, adjust=False, min_periods=s).mean().to_numpy() for s in spans])
+
+
+@node("volatility", "returns")
+def _volatility(ind, windows):
+    # rolling sample std of daily returns from cumulative sums of x and x²
+    x = ind.get("returns")
+    valid = ~np.isnan(x)
+    x = np.where(valid, x, 0.0)
+    csum = np.concatenate(([0.0], np.cumsum(x)))
+    csq = np.concatenate(([0.0], np.cumsum(x * x)))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+    windows = np.asarray(windows, dtype=np.int64)
+    end = np.arange(1, len(x) + 1)[:, None]
+    start = end - windows[None, :]
+    ok = (start >= 0) & (windows[None, :] > 1)
+    start = np.maximum(start, 0)
+    count = ccount[end] - ccount[start]
+    total = csum[end] - csum[start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = (csq[end] - csq[start] - total * total / windows) / (windows - 1)
+        return np.where(ok & (count == windows), np.sqrt(np.maximum(var, 0.0)), np.nan)
+
+
+def fingerprint(close: np.ndarray) -> str:
+    return hashlib.blake2b(np.ascontiguousarray(close).tobytes(), digest_size=16).hexdigest()
+
+
+class IndicatorCache:
+    """Process-wide LRU of indicator arrays keyed by (symbol, data version, indicator, parameter).
+
+    Bounded by ``max_bytes``; counts, per indicator, how often it was
+    computed, for how long, and how often a stored array was reused.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._usage: Dict[str, list] = {}  # name -> [computed, reused, seconds]
+        self.nbytes = 0
+        self.evictions = 0
+
+    def _count(self, name: str) -> list:
+        return self._usage.setdefault(name, [0, 0, 0.0])
+
+    def lookup(self, key: tuple) -> Optional[np.ndarray]:
+        with self._lock:
+            array = self._entries.get(key)
+            if array is not None:
+                self._entries.move_to_end(key)
+                self._count(key[2])[1] += 1
+            return array
+
+    def put(self, key: tuple, array: np.ndarray):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._entries[key] = array
+            self.nbytes += array.nbytes
+            while self.nbytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def record(self, name: str, computed: int, seconds: float):
+        with self._lock:
+            usage = self._count(name)
+            usage[0] += computed
+            usage[2] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "indicators": {
+                    name: {
+                        "inputs": list(NODES[name][0]),
+                        "computed": computed,
+                        "reused": reused,
+                        "compute_ms": round(seconds * 1000, 3),
+                        "avg_compute_ms": round(seconds / computed * 1000, 3) if computed else None,
+                    }
+                    for name, (computed, reused, seconds) in sorted(self._usage.items())
+                },
+            }
+
+
+indicator_cache = IndicatorCache(max_bytes=int(config.INDICATOR_CACHE_MAX_MB * 1024 * 1024))
+
+
+class Indicators:
+    """The indicator graph over one symbol's closes, memoized in an IndicatorCache.
+
+    ``get("sma", 20)`` or ``many("sma", [10, 20, 50])`` return bars-long
+    arrays; an indicator's inputs (``rsi`` reads ``avg_gain``/``avg_loss``,
+    which read ``gain``/``loss``, which read ``delta``) come through the same
+    cache, so every strategy asking for them shares one computation.
+    ``version`` defaults to a hash of the closes, so a revised or extended
+    series never sees another's arrays. Returned arrays are read-only.
+    """
+
+    def __init__(self, close, symbol: str = "", version: Optional[str] = None,
+                 cache: Optional[IndicatorCache] = None):
+        self.close = np.ascontiguousarray(close, dtype=np.float64).ravel()
+        self.symbol = symbol
+        self.version = version or fingerprint(self.close)
+        self.cache = indicator_cache if cache is None else cache
+        self._nested = 0.0
+
+    def get(self, name: str, value: Optional[int] = None) -> np.ndarray:
+        return self._arrays(name, [value])[0]
+
+    def many(self, name: str, values: Iterable[int]) -> np.ndarray:
+        arrays = self._arrays(name, list(values))
+        if not arrays:
+            return np.empty((len(self.close), 0))
+        return np.column_stack(arrays)
+
+    def _arrays(self, name: str, values: list) -> list:
+        if name not in NODES:
+            raise ValueError(f"Unknown indicator '{name}'; expected one of {', '.join(sorted(NODES))}")
+        values = [None if v is None else int(v) for v in values]
+        found = {}
+        for value in dict.fromkeys(values):
+            array = self.cache.lookup((self.symbol, self.version, name, value))
+            if array is not None:
+                found[value] = array
+        missing = [v for v in dict.fromkeys(values) if v not in found]
+        if missing:
+            # time spent on inputs is charged to the inputs, not to this node
+            outer, self._nested = self._nested, 0.0
+            started = time.perf_counter()
+            out = NODES[name][1](self, missing)
+            elapsed = time.perf_counter() - started
+            self.cache.record(name, len(missing), elapsed - self._nested)
+            self._nested = outer + elapsed
+            for j, value in enumerate(missing):
+                array = np.ascontiguousarray(out[:, j])
+                array.flags.writeable = False
+                self.cache.put((self.symbol, self.version, name, value), array)
+                found[value] = array
+        return [found[v] for v in values]
@@ -0,0 +1,121 @@
+import io
+from datetime import date, timedelta
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import models
+
+PRICE_COLUMNS = ("company_id", "date", "open", "high", "low", "close", "volume")
+# rows per multi-row VALUES statement (keeps bind parameters under driver limits)
+INSERT_BATCH = 1000
+
+
+def price_frame(company_id: int, hist: pd.DataFrame) -> pd.DataFrame:
+    """yfinance history → one row per date with the prices table's columns."""
+    index = pd.DatetimeIndex(hist.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame = pd.DataFrame({
+        "company_id": np.full(len(hist), company_id, dtype=np.int64),
+        "date": index.date,
+        "open": hist["Open"].to_numpy(dtype=np.float64),
+        "high": hist["High"].to_numpy(dtype=np.float64),
+        "low": hist["Low"].to_numpy(dtype=np.float64),
+        "close": hist["Close"].to_numpy(dtype=np.float64),
+        "volume": np.nan_to_num(hist["Volume"].to_numpy(dtype=np.float64)).astype(np.int64),
+    })
+    frame = frame[~np.isnan(frame["close"].to_numpy())]
+    return frame.drop_duplicates(subset="date", keep="last")
+
+
+def _copy_prices(db: Session, frame: pd.DataFrame) -> int:
+    # COPY into a session-local staging table, then one set-based insert that
+    # skips dates already stored (needs the (company_id, date) unique constraint)
+    buf = io.StringIO()
+    frame.to_csv(buf, header=False, index=False, columns=list(PRICE_COLUMNS))
+    buf.seek(0)
+    cols = ", ".join(PRICE_COLUMNS)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS prices_staging ("
+            "company_id integer, date date, open numeric, high numeric, low numeric, "
+            "close numeric, volume bigint) ON COMMIT DELETE ROWS"
+        )
+        cursor.copy_expert(f"COPY prices_staging ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+        cursor.execute(
+            f"INSERT INTO prices ({cols}) SELECT {cols} FROM prices_staging "
+            "ON CONFLICT (company_id, date) DO NOTHING"
+        )
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def _insert_new(db: Session, model, rows: list, keys: list) -> int:
+    # multi-row inserts that skip rows whose ``keys`` are already stored (needs a unique index on them)
+    dialect = db.get_bind().dialect.name
+    make_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(dialect, insert)
+    conn = db.connection()
+    count = 0
+    for lo in range(0, len(rows), INSERT_BATCH):
+        stmt = make_insert(model).values(rows[lo:lo + INSERT_BATCH])
+        if make_insert is not insert:
+            stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+        count += conn.execute(stmt).rowcount
+    return count
+
+
+def _insert_prices(db: Session, frame: pd.DataFrame) -> int:
+    return _insert_new(db, models.Price, frame.to_dict("records"), ["company_id", "date"])
+
+
+def write_prices(db: Session, company_id: int, hist: pd.DataFrame) -> int:
+    """Bulk-write a symbol's history; dates already stored are skipped. Returns rows inserted."""
+    frame = price_frame(company_id, hist)
+    if frame.empty:
+        return 0
+    if db.get_bind().dialect.driver == "psycopg2":
+        return _copy_prices(db, frame)
+    return _insert_prices(db, frame)
+
+
+def write_fundamentals(db: Session, company_id: int, statements: Dict[str, pd.DataFrame]) -> int:
+    """All metric cells of the given statements in multi-row inserts; cells already stored are skipped.
+
+    Returns rows inserted. Skipping rather than updating keeps the screening
+    panel's signature (the highest fundamentals id) moving only when rows are added.
+    """
+    cells = {}
+    for name, df in statements.items():
+        if df is None or df.empty:
+            print(f"⚠️ No {name} for company_id {company_id}")
+            continue
+        dates = [d.date() for d in pd.DatetimeIndex(df.columns)]
+        values = df.to_numpy(dtype=np.float64, na_value=np.nan)
+        for metric, row in zip(df.index, values.tolist()):
+            label = f"{name}_{metric}"
+            # a statement can repeat a line item; one row per (metric, date), the last one wins
+            cells.update(((label, d), v) for d, v in zip(dates, row))
+    rows = [{"company_id": company_id, "date": d, "metric": label, "value": v} for (label, d), v in cells.items()]
+    return _insert_new(db, models.Fundamental, rows, ["company_id", "metric", "date"])
+
+
+def last_price_dates(db: Session) -> Dict[int, date]:
+    """Latest stored price date per company, in one query.
+
+    A max per company rather than a GROUP BY over prices: each is one
+    backward probe of the (company_id, date) index, not a scan of the table.
+    """
+    latest = select(func.max(models.Price.date)).where(models.Price.company_id == models.Company.id)
+    stmt = select(models.Company.id, latest.scalar_subquery())
+    return {company_id: last for company_id, last in db.execute(stmt) if last is not None}
+
+
+def history_start(last: date) -> str:
+    return (last + timedelta(days=1)).isoformat()
@@ -0,0 +1,148 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.core import config
+from app.core.db import SessionLocal
+from app.models import models
+from app.service.portfolio import run_portfolio_backtest
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    __slots__ = ("id", "key", "request", "status", "progress", "backtest_id", "error",
+                 "submitted_at", "started_at", "finished_at")
+
+    def __init__(self, key, request):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.request = request
+        self.status = QUEUED
+        self.progress = 0.0
+        self.backtest_id = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "backtest_id": self.backtest_id,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def request_key(req) -> tuple:
+    return (
+        req.strategy_id,
+        req.start_date.isoformat(),
+        req.end_date.isoformat(),
+        float(req.initial_capital or 100_000),
+        req.rebalance_frequency,
+    )
+
+
+class JobQueue:
+    """Bounded pool of /run backtests with status polling.
+
+    At most ``max_workers`` run at once and ``max_queue`` may wait; identical
+    requests submitted while one is queued or running share that job.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, history: int, session_factory=SessionLocal):
+        self.max_queue = max_queue
+        self.history = history
+        self.session_factory = session_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backtest-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active = {}  # request key -> job
+        self._lock = threading.Lock()
+
+    def submit(self, req) -> Job:
+        key = request_key(req)
+        with self._lock:
+            existing = self._active.get(key)
+            if existing is not None:
+                return existing
+            if sum(1 for j in self._active.values() if j.status == QUEUED) >= self.max_queue:
+                raise QueueFull()
+            job = Job(key, req)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self._trim()
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [j.status for j in self._jobs.values()]
+        return {s: statuses.count(s) for s in (QUEUED, RUNNING, DONE, FAILED)}
+
+    def _run(self, job: Job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        db = self.session_factory()
+        try:
+            strategy = db.query(models.Strategy).get(job.request.strategy_id)
+            if not strategy:
+                raise HTTPException(status_code=404, detail="Strategy not found")
+            result = run_portfolio_backtest(db, strategy, job.request, progress=self._progress(job))
+            job.backtest_id = result["backtest_id"]
+            job.progress = 1.0
+            job.status = DONE
+        except HTTPException as e:
+            job.error = e.detail
+            job.status = FAILED
+        except Exception as e:
+            db.rollback()
+            job.error = str(e)
+            job.status = FAILED
+            print(f"❌ Backtest job {job.id} failed: {e}")
+        finally:
+            db.close()
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+
+    @staticmethod
+    def _progress(job: Job):
+        def update(fraction: float):
+            job.progress = fraction
+        return update
+
+    def _trim(self):
+        # forget the oldest finished jobs beyond the history limit
+        excess = len(self._jobs) - self.history
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if not self._jobs[job_id].active:
+                del self._jobs[job_id]
+                excess -= 1
+
+
+backtest_jobs = JobQueue(config.JOB_MAX_WORKERS, config.JOB_MAX_QUEUE, config.JOB_HISTORY)
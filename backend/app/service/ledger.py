@@ -0,0 +1,129 @@
+from typing import Optional
+
+import numpy as np
+
+from app.service.engine import ffill
+
+# ledger columns in the order they are stored and returned
+COLUMNS = (
+    "side", "entry_date", "exit_date", "entry_price", "exit_price", "holding_bars",
+    "holding_days", "return_pct", "cost_pct", "net_return_pct",
+)
+SIDES = {1: "long", -1: "short"}
+
+
+def empty_ledger() -> dict:
+    return {name: [] for name in COLUMNS}
+
+
+def _position_changes(signal, prev_signal: Optional[int]) -> np.ndarray:
+    """Bars whose signal differs from the bar before (the first bar against ``prev_signal``)."""
+    signal = np.asarray(signal, dtype=np.int64)
+    before = np.empty_like(signal)
+    before[:1] = prev_signal or 0
+    before[1:] = signal[:-1]
+    return np.flatnonzero(signal != before)
+
+
+def trade_ledger(dates, close, signal, prev_signal: Optional[int] = None, open_trade: Optional[dict] = None,
+                 first_bar: int = 0, commission: float = 0.0, slippage: float = 0.0):
+    """Closed trades and the still-open position for one batch of bars.
+
+    A trade is a run of bars with the same non-zero signal: it opens at the
+    close of the bar the signal switches to long (+1) or short (-1) and closes
+    at the close of the bar it switches away, which is how the engine holds
+    yesterday's signal through today's return. Flat stretches are not trades.
+
+    ``open_trade`` is the position carried in from the previous batch and
+    ``first_bar`` the run-wide index of ``dates[0]``. Slippage moves each fill
+    against the trade by that fraction of the price; commission is charged
+    as a fraction of notional on entry and on exit. Returns the ledger as
+    columns of arrays (see ``COLUMNS``) and the open position, if any.
+    """
+    dates = np.asarray(dates)
+    if not np.issubdtype(dates.dtype, np.datetime64):
+        dates = dates.astype("datetime64[D]")
+    price = ffill(np.asarray(close, dtype=np.float64))
+    signal = np.asarray(signal, dtype=np.int64)
+    changes = _position_changes(signal, prev_signal)
+
+    # 🔷 every position change closes the previous trade and opens the next one
+    side = signal[changes]
+    entry = changes[side != 0]
+    exit_at = np.searchsorted(changes, entry, side="right")
+    closed = exit_at < len(changes)
+    exit_bar = changes[exit_at[closed]]
+
+    entry_side = side[side != 0]
+    entry_date = dates[entry]
+    entry_price = price[entry]
+    entry_bar = entry + first_bar
+    if open_trade is not None:
+        # the carried position closes at this batch's first change
+        carried = len(changes) > 0
+        entry_side = np.concatenate(([open_trade["side"]], entry_side))
+        entry_date = np.concatenate(([np.datetime64(open_trade["date"])], entry_date))
+        entry_price = np.concatenate(([open_trade["close"]], entry_price))
+        entry_bar = np.concatenate(([open_trade["bar"]], entry_bar))
+        closed = np.concatenate(([carried], closed))
+        exit_bar = np.concatenate((changes[:1], exit_bar))
+
+    # 🔷 the last entry without a later change stays open
+    new_open = None
+    if len(closed) and not closed[-1]:
+        new_open = {
+            "side": int(entry_side[-1]),
+            "date": str(entry_date[-1]),
+            "close": float(entry_price[-1]),
+            "bar": int(entry_bar[-1]),
+        }
+
+    s = entry_side[closed]
+    e_price = entry_price[closed]
+    x_price = price[exit_bar]
+    e_fill = e_price * (1 + s * slippage)
+    x_fill = x_price * (1 - s * slippage)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gross = s * (x_price / e_price - 1)
+        net = s * (x_fill / e_fill - 1) - 2 * commission
+
+    ledger = {
+        "side": s,
+        "entry_date": entry_date[closed],
+        "exit_date": dates[exit_bar],
+        "entry_price": np.round(e_price, 2),
+        "exit_price": np.round(x_price, 2),
+        "holding_bars": exit_bar + first_bar - entry_bar[closed],
+        "holding_days": (dates[exit_bar] - entry_date[closed]) // np.timedelta64(1, "D"),
+        "return_pct": np.round(gross * 100, 2),
+        "cost_pct": np.round((gross - net) * 100, 2),
+        "net_return_pct": np.round(net * 100, 2),
+    }
+    return ledger, new_open
+
+
+def ledger_columns(ledger: dict) -> dict:
+    """Array ledger → JSON-ready columns (ISO dates at the bars' resolution, sides as names)."""
+    out = {}
+    for name in COLUMNS:
+        values = np.asarray(ledger[name])
+        if name == "side":
+            out[name] = np.where(values > 0, SIDES[1], SIDES[-1]).tolist()
+        elif np.issubdtype(values.dtype, np.datetime64):
+            out[name] = np.datetime_as_string(values).tolist()
+        else:
+            out[name] = values.tolist()
+            if values.dtype.kind == "f":
+                for i in np.flatnonzero(np.isnan(values)).tolist():
+                    out[name][i] = None
+    return out
+
+
+def extend_ledger(stored: dict, columns: dict) -> dict:
+    return {name: list(stored.get(name, [])) + columns[name] for name in COLUMNS}
+
+
+def ledger_records(columns: dict) -> list:
+    """Columns → one dict per trade, for the JSON response."""
+    return [dict(zip(COLUMNS, row)) for row in zip(*(columns[name] for name in COLUMNS))]
+
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import httpx
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from app.core import config, telemetry
+from app.service.market_store import market_store
+from app.service.price_cache import FIELDS, PriceSeries, price_cache, to_day
+from app.service.upstream import upstream
+
+# the chart API and yfinance's own calls share one per-host limit
+YAHOO_HOST = httpx.URL(config.YAHOO_CHART_URL).host
+# what yfinance asks for as period="max"
+EPOCH_START = -2208994789
+
+
+def series_from_frame(df: pd.DataFrame) -> PriceSeries:
+    """yfinance download/history frame → PriceSeries."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = [col[-1] if col[-1] in ("Open", "High", "Low", "Close", "Volume") else col[0]
+                      for col in df.columns.to_flat_index()]
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    if df.empty or "Close" not in df.columns:
+        return PriceSeries(np.empty(0, dtype="datetime64[D]"))
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    col = lambda name: df[name].to_numpy(dtype=np.float64) if name in df.columns else None
+    return PriceSeries(
+        index.to_numpy().astype("datetime64[D]"),
+        open=col("Open"),
+        high=col("High"),
+        low=col("Low"),
+        close=col("Close"),
+        volume=col("Volume"),
+    )
+
+
+def fetch_range(symbol: str, start=None, end=None) -> PriceSeries:
+    """One Yahoo request for ``[start, end)``; no ``start`` means the full history."""
+    with telemetry.upstream_call(YAHOO_HOST, "download"):
+        if start is None:
+            df = yf.download(symbol, period="max", interval="1d", progress=False)
+        else:
+            df = yf.download(symbol, start=str(start), end=str(end) if end else None, interval="1d", progress=False)
+    return series_from_frame(df)
+
+
+def download_history(symbols) -> dict:
+    # read-through: only dates missing from the on-disk store go to Yahoo
+    out = {}
+    for symbol in symbols:
+        market_store.ensure(symbol, None, None, fetch_range)
+        out[symbol] = market_store.read(symbol)
+    return out
+
+
+def get_history(symbol: str, start=None, end=None) -> PriceSeries:
+    """Daily history for ``[start, end)`` — same bounds as ``yf.download`` — via the price cache."""
+    return price_cache.get(
+        symbol,
+        download_history,
+        start,
+        end,
+        source="yf",
+        ttl=config.PRICE_CACHE_UPSTREAM_TTL,
+        end_inclusive=False,
+    )
+
+
+def get_info(symbol: str) -> dict:
+    """``yf.Ticker(symbol).info``, kept on disk next to the symbol's prices."""
+    info = market_store.info(symbol)
+    if info is None:
+        if market_store.offline:
+            raise LookupError(f"{symbol} not in the local market data store")
+        with telemetry.upstream_call(YAHOO_HOST, "info"):
+            info = yf.Ticker(symbol).info
+        market_store.save_info(symbol, info)
+    return info
+
+
+# ====== ASYNC (API handlers) ======
+
+def series_from_chart(payload: dict) -> PriceSeries:
+    """Yahoo chart API JSON → PriceSeries, dated in the exchange's calendar as yfinance does."""
+    chart = payload.get("chart") or {}
+    if chart.get("error"):
+        raise LookupError(chart["error"].get("description") or str(chart["error"]))
+    result = (chart.get("result") or [None])[0] or {}
+    stamps = result.get("timestamp")
+    if not stamps:
+        return PriceSeries(np.empty(0, dtype="datetime64[D]"))
+    offset = (result.get("meta") or {}).get("gmtoffset") or 0
+    dates = ((np.asarray(stamps, dtype=np.int64) + offset) // 86400).astype("datetime64[D]")
+    quote = ((result.get("indicators") or {}).get("quote") or [{}])[0]
+    # a day reported twice (e.g. the live bar): the later row wins
+    order = np.argsort(dates, kind="stable")
+    last = np.append(dates[order][1:] != dates[order][:-1], True)
+    rows = order[last]
+    return PriceSeries(
+        dates[rows],
+        **{f: np.array(quote[f], dtype=np.float64)[rows] if quote.get(f) else None for f in FIELDS},
+    )
+
+
+async def fetch_range_async(symbol: str, start=None, end=None) -> PriceSeries:
+    """``fetch_range`` over the shared async client, from the chart API (unadjusted, like ``yf.download``)."""
+    period1 = EPOCH_START if start is None else int(to_day(start).astype("datetime64[s]").astype(np.int64))
+    period2 = int(time.time()) if end is None else int(to_day(end).astype("datetime64[s]").astype(np.int64))
+    response = await upstream.get(
+        f"{config.YAHOO_CHART_URL}/{symbol}",
+        params={"period1": period1, "period2": period2, "interval": "1d", "events": "div,splits"},
+    )
+    response.raise_for_status()
+    return series_from_chart(response.json()).slice(start, end, end_inclusive=False)
+
+
+async def _load_history(symbol: str) -> PriceSeries:
+    # read-through as in download_history; the missing ranges are fetched concurrently
+    gaps = [] if market_store.offline else await asyncio.to_thread(market_store.missing, symbol, None, None)
+    if gaps:
+        parts = await asyncio.gather(*(fetch_range_async(symbol, lo, hi) for lo, hi in gaps))
+        await asyncio.to_thread(market_store.commit, symbol, gaps, parts)
+    series = await asyncio.to_thread(market_store.read, symbol)
+    if len(series):  # nothing stored yet, e.g. after a failed fetch: not cached, so the next request retries
+        price_cache.put(symbol, series, source="yf")
+    return series
+
+
+async def aget_history(symbol: str, start=None, end=None) -> PriceSeries:
+    """``get_history`` for async handlers: concurrent requests for a symbol share one load."""
+    series = price_cache.lookup(symbol, source="yf", ttl=config.PRICE_CACHE_UPSTREAM_TTL)
+    if series is None:
+        series = await upstream.coalesce(("history", symbol), lambda: _load_history(symbol))
+    return series.slice(start, end, end_inclusive=False)
+
+
+async def aget_info(symbol: str) -> dict:
+    """``get_info`` for async handlers; yfinance's blocking call and the disk I/O run in worker threads."""
+    info = await asyncio.to_thread(market_store.info, symbol)
+    if info is None:
+        if market_store.offline:
+            raise LookupError(f"{symbol} not in the local market data store")
+        info = await upstream.run(YAHOO_HOST, ("info", symbol), lambda: yf.Ticker(symbol).info)
+        await asyncio.to_thread(market_store.save_info, symbol, info)
+    return info
@@ -0,0 +1,232 @@
+import json
+import os
+import threading
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+import numpy as np
+import pyarrow as pa
+
+from app.core import config
+from app.service.price_cache import FIELDS, PriceSeries, to_day
+
+SCHEMA = pa.schema([("date", pa.date32())] + [(f, pa.float64()) for f in FIELDS])
+
+# fetch(symbol, start, end) → PriceSeries for [start, end); start None means full history
+Fetch = Callable[[str, Optional[date], Optional[date]], PriceSeries]
+
+
+def _empty() -> PriceSeries:
+    return PriceSeries(np.empty(0, dtype="datetime64[D]"))
+
+
+def _concat(parts) -> PriceSeries:
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return _empty()
+    if len(parts) == 1:
+        return parts[0]
+    return PriceSeries(
+        np.concatenate([p.dates for p in parts]),
+        **{f: np.concatenate([getattr(p, f) for p in parts]) for f in FIELDS},
+    )
+
+
+def _write_atomic(path: str, write):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+class MarketStore:
+    """Per-symbol price history on disk as Arrow IPC files, one per calendar year.
+
+    Layout: ``{root}/{symbol}/{year}.arrow`` plus ``meta.json`` recording which
+    dates have already been fetched, and ``info.json`` with the ticker info.
+    Files are uncompressed and opened with ``pa.memory_map`` so the price
+    columns of a partition come back as zero-copy NumPy views.
+    """
+
+    def __init__(self, root: str, offline: bool = False):
+        self.root = root
+        self.offline = offline
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, symbol: str) -> threading.RLock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.RLock())
+
+    def _dir(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol.replace(os.sep, "_"))
+
+    def _partition(self, symbol: str, year: int) -> str:
+        return os.path.join(self._dir(symbol), f"{year}.arrow")
+
+    def years(self, symbol: str):
+        try:
+            names = os.listdir(self._dir(symbol))
+        except FileNotFoundError:
+            return []
+        return sorted(int(n[:-6]) for n in names if n.endswith(".arrow") and n[:-6].isdigit())
+
+    # ====== READ ======
+
+    def _read_partition(self, symbol: str, year: int) -> PriceSeries:
+        with pa.memory_map(self._partition(symbol, year)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if table.num_rows == 0:
+            return _empty()
+        columns = {}
+        for name in SCHEMA.names:
+            column = table.column(name)
+            columns[name] = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+        out = PriceSeries.__new__(PriceSeries)
+        out.dates = columns["date"].to_numpy(zero_copy_only=False).astype("datetime64[D]")
+        for f in FIELDS:
+            # float64 without nulls: a view straight into the mapped file
+            setattr(out, f, columns[f].to_numpy(zero_copy_only=True))
+        return out
+
+    def read(self, symbol: str, start=None, end=None, end_inclusive: bool = False) -> PriceSeries:
+        """Stored rows for ``[start, end)`` (``[start, end]`` with ``end_inclusive``)."""
+        lo, hi = to_day(start), to_day(end)
+        years = [
+            y for y in self.years(symbol)
+            if (lo is None or y >= lo.astype(object).year) and (hi is None or y <= hi.astype(object).year)
+        ]
+        series = _concat([self._read_partition(symbol, y) for y in years])
+        return series.slice(start, end, end_inclusive=end_inclusive)
+
+    # ====== WRITE ======
+
+    def append(self, symbol: str, series: PriceSeries):
+        """Merge rows into their year partitions; on duplicate dates the new row wins."""
+        if not len(series):
+            return
+        os.makedirs(self._dir(symbol), exist_ok=True)
+        years = series.dates.astype("datetime64[Y]").astype(int) + 1970
+        for year in np.unique(years):
+            new = series.slice(f"{year}-01-01", f"{year + 1}-01-01", end_inclusive=False)
+            path = self._partition(symbol, int(year))
+            if os.path.exists(path):
+                old = self._read_partition(symbol, int(year))
+                keep = ~np.isin(old.dates, new.dates)
+                merged = _concat([
+                    PriceSeries(old.dates[keep], **{f: getattr(old, f)[keep] for f in FIELDS}), new,
+                ])
+                order = np.argsort(merged.dates, kind="stable")
+            else:
+                merged, order = new, np.arange(len(new))
+            table = pa.table(
+                [pa.array(merged.dates[order], pa.date32())]
+                + [pa.array(np.asarray(getattr(merged, f)[order])) for f in FIELDS],
+                schema=SCHEMA,
+            )
+
+            def write(tmp, table=table):
+                with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, SCHEMA) as writer:
+                    writer.write_table(table)
+
+            _write_atomic(path, write)
+
+    # ====== COVERAGE ======
+
+    def _meta_path(self, symbol: str) -> str:
+        return os.path.join(self._dir(symbol), "meta.json")
+
+    def coverage(self, symbol: str):
+        """``(first, through)`` of the fetched range; ``first`` None means since listing."""
+        try:
+            with open(self._meta_path(symbol)) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        first = date.fromisoformat(meta["from"]) if meta.get("from") else None
+        return first, date.fromisoformat(meta["through"])
+
+    def _set_coverage(self, symbol: str, first: Optional[date], through: date):
+        os.makedirs(self._dir(symbol), exist_ok=True)
+        meta = {"from": first.isoformat() if first else None, "through": through.isoformat()}
+
+        def write(tmp):
+            with open(tmp, "w") as f:
+                json.dump(meta, f)
+
+        _write_atomic(self._meta_path(symbol), write)
+
+    def missing(self, symbol: str, start: Optional[date], end: Optional[date]):
+        """Date ranges ``[lo, hi)`` within ``[start, end)`` not fetched yet."""
+        covered = self.coverage(symbol)
+        if covered is None:
+            return [(start, end)]
+        first, through = covered
+        gaps = []
+        if first is not None and (start is None or start < first):
+            gaps.append((start, first))
+        if end is None or end > through + timedelta(days=1):
+            gaps.append((through + timedelta(days=1), end))
+        return gaps
+
+    def ensure(self, symbol: str, start, end, fetch: Fetch):
+        """Fetch and append whatever part of ``[start, end)`` is not on disk yet."""
+        if self.offline:
+            return
+        start = to_day(start).astype(object) if start else None
+        end = to_day(end).astype(object) if end else None
+        with self._lock(symbol):
+            gaps = self.missing(symbol, start, end)
+            if not gaps:
+                return
+            self.commit(symbol, gaps, [fetch(symbol, lo, hi) for lo, hi in gaps])
+
+    def commit(self, symbol: str, gaps, parts):
+        """Store the rows fetched for ``gaps`` (as from ``missing``) and extend the covered range.
+
+        Coverage only grows by what came back: a gap whose fetch returned no
+        rows (yfinance answers a failed call with an empty frame) stays
+        missing, and the end of the range moves to the last date received,
+        never to a date Yahoo has not reported yet. Callers that fetch without
+        holding the symbol's lock (the async path) may commit the same rows
+        twice; the later write wins, which is harmless.
+        """
+        with self._lock(symbol):
+            covered = self.coverage(symbol)
+            for (lo, hi), part in zip(gaps, parts):
+                if not len(part):
+                    continue
+                self.append(symbol, part)
+                # today's bar is still moving, so it is never marked as fetched
+                through = min(part.dates[-1].astype(object), date.today() - timedelta(days=1))
+                if hi is not None:
+                    through = min(through, hi - timedelta(days=1))
+                if lo is not None and through < lo:
+                    continue
+                if covered is None:
+                    covered = (lo, through)
+                else:
+                    first = None if lo is None or covered[0] is None else min(lo, covered[0])
+                    covered = (first, max(through, covered[1]))
+            if covered is not None:
+                self._set_coverage(symbol, *covered)
+
+    # ====== TICKER INFO ======
+
+    def info(self, symbol: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self._dir(symbol), "info.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save_info(self, symbol: str, info: dict):
+        os.makedirs(self._dir(symbol), exist_ok=True)
+
+        def write(tmp):
+            with open(tmp, "w") as f:
+                json.dump(info, f, default=str)
+
+        _write_atomic(os.path.join(self._dir(symbol), "info.json"), write)
+
+
+market_store = MarketStore(config.MARKET_STORE_DIR, offline=config.MARKET_DATA_OFFLINE)
@@ -0,0 +1,212 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.service.engine import as_matrix, ffill
+
+PERIODS_PER_YEAR = 252
+ROLLING_WINDOWS = (63, 252)
+
+
+def returns(equity) -> np.ndarray:
+    """Per-bar simple returns of every column (bars × curves); NaN on the first bar and around gaps."""
+    e = as_matrix(equity)
+    out = np.full(e.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = e[1:] / e[:-1] - 1
+    return out
+
+
+def drawdown(equity) -> np.ndarray:
+    """Fraction below the running peak (0 at a new high, negative under water)."""
+    e = as_matrix(equity)
+    with np.errstate(invalid="ignore"):
+        return e / np.fmax.accumulate(e, axis=0) - 1
+
+
+def drawdown_duration(equity) -> np.ndarray:
+    """Longest run of bars spent below a previous peak, per column."""
+    e = as_matrix(equity)
+    rows = np.arange(e.shape[0]).reshape(-1, 1)
+    with np.errstate(invalid="ignore"):
+        at_peak = ~(e < np.fmax.accumulate(e, axis=0))
+    last_peak = np.maximum.accumulate(np.where(at_peak, rows, 0), axis=0)
+    return (rows - last_peak).max(axis=0) if e.shape[0] else np.zeros(e.shape[1], dtype=np.int64)
+
+
+def _first_last(e: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    cols = np.arange(e.shape[1])
+    valid = ~np.isnan(e)
+    first = e[valid.argmax(axis=0), cols]
+    last = e[e.shape[0] - 1 - valid[::-1].argmax(axis=0), cols]
+    return first, last
+
+
+def turnover(weights, periods_per_year: int = PERIODS_PER_YEAR) -> np.ndarray:
+    """Annualized one-way turnover: mean per-bar ``sum |Δweight|`` over assets, times periods per year.
+
+    ``weights`` is bars × curves (one position per curve, e.g. a signal) or
+    bars × curves × assets.
+    """
+    w = np.asarray(weights, dtype=np.float64)
+    if w.ndim == 1:
+        w = w.reshape(-1, 1)
+    change = np.abs(np.diff(np.nan_to_num(w), axis=0))
+    if change.ndim == 3:
+        change = change.sum(axis=2)
+    if change.shape[0] == 0:
+        return np.zeros(w.shape[1])
+    return change.mean(axis=0) * periods_per_year
+
+
+def compute(
+    equity,
+    benchmark=None,
+    weights=None,
+    base=None,
+    years=None,
+    periods_per_year: int = PERIODS_PER_YEAR,
+    risk_free: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """Summary metrics for every column of ``equity`` (bars × curves) in one pass.
+
+    Returns arrays with one value per curve: ``total_return``, ``cagr``,
+    ``volatility`` (annualized), ``sharpe`` and ``sortino`` (annualized,
+    over ``risk_free`` a year), ``max_drawdown``, ``max_drawdown_duration``
+    (bars), ``calmar`` and ``hit_rate`` (share of bars with a positive
+    return), plus ``beta`` against ``benchmark`` (a price or equity series,
+    one column or one per curve) and ``turnover`` of ``weights`` when given.
+    Fractions, not percent. ``base`` is the starting capital (else each
+    curve's first value); ``years`` overrides bars / ``periods_per_year``.
+    """
+    e = as_matrix(equity)
+    r = returns(e)
+    valid = ~np.isnan(r)
+    n = valid.sum(axis=0)
+    x = np.where(valid, r, 0.0)
+    excess = np.where(valid, r - risk_free / periods_per_year, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = excess.sum(axis=0) / n
+        std = np.sqrt((np.where(valid, r - x.sum(axis=0) / n, 0.0) ** 2).sum(axis=0) / (n - 1))
+        downside = np.sqrt((np.minimum(excess, 0.0) ** 2).sum(axis=0) / n)
+
+        first, last = _first_last(e)
+        start = first if base is None else np.broadcast_to(np.asarray(base, dtype=np.float64), first.shape)
+        total = last / start - 1
+        span = n / periods_per_year if years is None else np.broadcast_to(np.asarray(years, dtype=np.float64), n.shape)
+        cagr = np.where(span > 0, (last / start) ** (1 / span) - 1, 0.0)
+        max_dd = np.fmin.reduce(drawdown(e), axis=0)
+
+        root = np.sqrt(periods_per_year)
+        out = {
+            "total_return": total,
+            "cagr": cagr,
+            "volatility": std * root,
+            "sharpe": np.where(std > 0, mean / std * root, 0.0),
+            "sortino": np.where(downside > 0, mean / downside * root, 0.0),
+            "max_drawdown": max_dd,
+            "max_drawdown_duration": drawdown_duration(e),
+            "calmar": np.where(max_dd < 0, cagr / -max_dd, np.nan),
+            "hit_rate": np.where(n > 0, (r > 0).sum(axis=0) / n, np.nan),
+        }
+
+        if benchmark is not None:
+            b = returns(ffill(as_matrix(benchmark)))
+            both = valid & ~np.isnan(b)
+            k = both.sum(axis=0)
+            rx, bx = np.where(both, r, 0.0), np.where(both, b, 0.0)
+            cov = (rx * bx).sum(axis=0) - rx.sum(axis=0) * bx.sum(axis=0) / k
+            var_b = (bx * bx).sum(axis=0) - bx.sum(axis=0) ** 2 / k
+            out["beta"] = np.where(var_b > 0, cov / var_b, np.nan)
+    if weights is not None:
+        out["turnover"] = turnover(weights, periods_per_year)
+    return out
+
+
+def _window_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Sum of the last ``window`` rows at every row from one cumulative sum (NaN before a full window)."""
+    csum = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=csum[1:])
+    out = np.full(x.shape, np.nan)
+    if 0 < window <= x.shape[0]:
+        out[window - 1:] = csum[window:] - csum[:-window]
+    return out
+
+
+def rolling(equity, window: int, benchmark=None, periods_per_year: int = PERIODS_PER_YEAR,
+            risk_free: float = 0.0) -> Dict[str, np.ndarray]:
+    """Trailing ``window``-bar metrics at every bar, O(n) per column from cumulative sums.
+
+    ``return`` over the window, annualized ``volatility``, ``sharpe`` and
+    ``sortino``, and ``beta`` against ``benchmark`` when given; NaN until a
+    window holds ``window`` returns.
+    """
+    e = as_matrix(equity)
+    r = returns(e)
+    valid = ~np.isnan(r)
+    x = np.where(valid, r - risk_free / periods_per_year, 0.0)
+    full = _window_sum(valid.astype(np.float64), window) == window
+    total = _window_sum(x, window)
+    squares = _window_sum(x * x, window)
+    down = _window_sum(np.minimum(x, 0.0) ** 2, window)
+
+    root = np.sqrt(periods_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / window
+        std = np.sqrt(np.maximum(squares - total * total / window, 0.0) / (window - 1))
+        downside = np.sqrt(down / window)
+        past = np.full(e.shape, np.nan)
+        if 0 < window < e.shape[0]:
+            past[window:] = e[:-window]
+        out = {
+            "return": np.where(full, e / past - 1, np.nan),
+            "volatility": np.where(full, std * root, np.nan),
+            "sharpe": np.where(full & (std > 0), mean / std * root, np.nan),
+            "sortino": np.where(full & (downside > 0), mean / downside * root, np.nan),
+        }
+        if benchmark is not None:
+            b = returns(ffill(as_matrix(benchmark)))
+            both = valid & ~np.isnan(b)
+            rx, bx = np.where(both, r, 0.0), np.where(both, b, 0.0)
+            k = _window_sum(both.astype(np.float64), window)
+            sx, sb = _window_sum(rx, window), _window_sum(bx, window)
+            cov = _window_sum(rx * bx, window) - sx * sb / k
+            var_b = _window_sum(bx * bx, window) - sb * sb / k
+            out["beta"] = np.where(full & (k == window) & (var_b > 0), cov / var_b, np.nan)
+    return out
+
+
+def stored_equity(result) -> Tuple[np.ndarray, np.ndarray]:
+    """Dates and values of a BacktestResult's daily equity curve."""
+    curve = result.equity_curve or {}
+    if isinstance(curve, list):
+        # rows stored before the columnar layout
+        dates = [p["date"] for p in curve]
+        values = [p.get("value", p.get("capital")) for p in curve]
+    else:
+        dates, values = curve.get("dates", []), curve.get("values", [])
+    return (np.array(dates, dtype="datetime64[D]"),
+            np.array([np.nan if v is None else v for v in values], dtype=np.float64))
+
+
+def align(dates, series_dates, series_values) -> np.ndarray:
+    """``series_values`` as of each of ``dates``: the last value on or before it, NaN before the first."""
+    idx = np.searchsorted(np.asarray(series_dates, dtype="datetime64[D]"), np.asarray(dates, dtype="datetime64[D]"),
+                          side="right") - 1
+    values = np.asarray(series_values, dtype=np.float64)
+    return np.where(idx >= 0, values[np.maximum(idx, 0)] if len(values) else np.nan, np.nan)
+
+
+def clean(values, digits: int = 4) -> list:
+    """Rounded floats with NaN/inf as None, for JSON."""
+    x = np.asarray(values)
+    if np.issubdtype(x.dtype, np.integer):
+        return x.tolist()
+    x = np.round(x.astype(np.float64), digits)
+    return [None if not np.isfinite(v) else v for v in x.tolist()]
+
+
+def scalar_metrics(metrics: Dict[str, np.ndarray], column: int = 0) -> Dict[str, Optional[float]]:
+    """One curve's values from ``compute`` as plain floats."""
+    return {k: clean(v[column:column + 1])[0] for k, v in metrics.items()}
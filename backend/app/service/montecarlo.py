@@ -0,0 +1,126 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core import config
+from app.service import metrics
+
+METHODS = ("iid", "block")
+PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+STATS = ("cagr", "max_drawdown", "terminal_value")
+
+
+def resample(rng: np.random.Generator, n: int, paths: int, horizon: int, method: str = "iid",
+             block: int = 20) -> np.ndarray:
+    """Indices into ``n`` returns for ``paths`` synthetic paths of ``horizon`` bars (paths × horizon).
+
+    ``iid`` draws every bar independently; ``block`` is the circular block
+    bootstrap: runs of ``block`` consecutive bars from random starts, which
+    keeps volatility clustering and short-term autocorrelation intact.
+    """
+    if method == "iid":
+        return rng.integers(0, n, (paths, horizon))
+    if method == "block":
+        block = max(1, min(block, n))
+        starts = rng.integers(0, n, (paths, math.ceil(horizon / block), 1))
+        return ((starts + np.arange(block)) % n).reshape(paths, -1)[:, :horizon]
+    raise ValueError(f"Unknown method '{method}'; expected one of {', '.join(METHODS)}")
+
+
+def simulate(returns: np.ndarray, paths: int, horizon: int, method: str, block: int, seed,
+             periods_per_year: int = metrics.PERIODS_PER_YEAR) -> Dict[str, np.ndarray]:
+    """Growth of 1 over ``paths`` resampled paths: CAGR, max drawdown and terminal multiple per path."""
+    rng = np.random.default_rng(seed)
+    # bars × paths, the layout the metrics module works in; updated in place to bound the chunk's memory
+    growth = np.empty((horizon + 1, paths))
+    growth[0] = 1.0
+    growth[1:] = returns[resample(rng, len(returns), paths, horizon, method, block).T]
+    growth[1:] += 1
+    np.cumprod(growth, axis=0, out=growth)
+    terminal = growth[-1].copy()
+    with np.errstate(invalid="ignore"):
+        cagr = terminal ** (periods_per_year / horizon) - 1
+    # max drawdown, as metrics.drawdown, without a second bars × paths array
+    peak = np.fmax.accumulate(growth, axis=0)
+    np.divide(growth, peak, out=peak)
+    return {"cagr": cagr, "max_drawdown": np.fmin.reduce(peak, axis=0) - 1, "terminal": terminal}
+
+
+def _chunks(paths: int, chunk_paths: int, seed: Optional[int]):
+    """(paths, seed) per chunk. Both depend only on the request, so the paths are the same
+    inline or spread over any number of workers."""
+    sizes = [min(chunk_paths, paths - lo) for lo in range(0, paths, chunk_paths)]
+    return list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+
+def run_montecarlo(
+    returns,
+    initial_value: float = 1.0,
+    paths: int = 10_000,
+    method: str = "iid",
+    block: int = 20,
+    horizon: Optional[int] = None,
+    seed: Optional[int] = None,
+    workers: int = 0,
+    chunk_paths: Optional[int] = None,
+    periods_per_year: int = metrics.PERIODS_PER_YEAR,
+) -> dict:
+    """Bootstrap ``returns`` (one per bar; NaN bars dropped) into ``paths`` synthetic equity paths.
+
+    Paths are simulated ``chunk_paths`` at a time (bounding memory at about
+    chunk × horizon floats), inline or on ``workers`` processes. ``seed``
+    makes a run reproducible; without one, fresh entropy is drawn and
+    returned under ``seed``. The result holds the distribution of each
+    path's CAGR, max drawdown and terminal value (percentiles, mean, std),
+    and the share of paths that lose money.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'; expected one of {', '.join(METHODS)}")
+    r = np.asarray(returns, dtype=np.float64).ravel()
+    r = r[~np.isnan(r)]
+    if len(r) < 2:
+        raise ValueError("Need at least two returns to resample")
+    if paths < 1:
+        raise ValueError("paths must be positive")
+    horizon = horizon or min(len(r), config.MONTECARLO_MAX_HORIZON)
+    if not 2 <= horizon <= config.MONTECARLO_MAX_HORIZON:
+        raise ValueError(f"horizon must be between 2 and {config.MONTECARLO_MAX_HORIZON} bars")
+    chunk_paths = chunk_paths or config.MONTECARLO_CHUNK_PATHS
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**63)
+    chunks = _chunks(paths, chunk_paths, seed)
+
+    args = [(r, size, horizon, method, block, chunk_seed, periods_per_year) for size, chunk_seed in chunks]
+    if workers and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            parts = list(pool.map(simulate, *zip(*args)))
+    else:
+        parts = [simulate(*a) for a in args]
+    out = {k: np.concatenate([p[k] for p in parts]) for k in ("cagr", "max_drawdown", "terminal")}
+    out["terminal_value"] = out.pop("terminal") * initial_value
+
+    return {
+        "paths": paths,
+        "method": method,
+        "block": block if method == "block" else None,
+        "horizon": horizon,
+        "seed": seed,
+        "initial_value": initial_value,
+        "probability_of_loss": round(float((out["terminal_value"] < initial_value).mean()), 4),
+        "distributions": {k: distribution(out[k]) for k in STATS},
+    }
+
+
+def distribution(values: np.ndarray) -> dict:
+    """Mean, std and percentiles of the finite values."""
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        return {"mean": None, "std": None, "percentiles": {}}
+    pct = np.percentile(finite, PERCENTILES)
+    return {
+        "mean": round(float(finite.mean()), 4),
+        "std": round(float(finite.std()), 4),
+        "percentiles": {f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, pct)},
+    }
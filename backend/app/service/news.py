@@ -0,0 +1,198 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from app.core import config
+from app.service.upstream import upstream
+
+NEWS_URL = "https://www.google.com/search"
+MAX_ARTICLES = 10
+
+# start of a result card, and every div open/close after it
+_CARD = re.compile(r'<div\b[^>]*\bclass="(?:[^"]*\s)?dbsr(?:\s[^"]*)?"', re.I)
+_DIV = re.compile(r"<(/?)div\b", re.I)
+
+Fetch = Callable[[str], Awaitable[str]]
+
+
+def news_blocks(html: str, limit: int = MAX_ARTICLES) -> List[str]:
+    """The first ``limit`` ``div.dbsr`` cards, cut out of the page by matching div depth.
+
+    A results page is mostly scripts and styles; only these slices go
+    through the HTML parser.
+    """
+    blocks, pos = [], 0
+    while len(blocks) < limit:
+        card = _CARD.search(html, pos)
+        if card is None:
+            break
+        depth, end = 0, len(html)
+        for tag in _DIV.finditer(html, card.start()):
+            depth += -1 if tag.group(1) else 1
+            if depth == 0:
+                end = html.find(">", tag.end()) + 1 or len(html)
+                break
+        blocks.append(html[card.start():end])
+        pos = end
+    return blocks
+
+
+def parse_news(html: str, limit: int = MAX_ARTICLES) -> List[dict]:
+    """Title, link, source and age of each news card on a Google News results page."""
+    soup = BeautifulSoup("".join(news_blocks(html, limit)), "html.parser")
+    articles = []
+    for item in soup.select("div.dbsr")[:limit]:
+        title = item.select_one("div.JheGif.nDgy9d")
+        source = item.select_one("div.CEMjEf.NUnG9d")
+        if title is None or item.a is None:
+            continue
+        time_el = item.select_one("span.WG9SHc span")
+        articles.append({
+            "title": title.get_text(strip=True),
+            "link": item.a["href"],
+            "source": source.get_text(strip=True) if source else "Unknown",
+            "time": time_el.get_text(strip=True) if time_el else "Unknown",
+        })
+    return articles
+
+
+async def fetch_news_page(symbol: str) -> str:
+    response = await upstream.get(NEWS_URL, params={"q": f"{symbol} stock news", "tbm": "nws"})
+    if response.status_code != 200:
+        raise LookupError(f"news search returned {response.status_code}")
+    return response.text
+
+
+class NewsCache:
+    """Per-symbol news with a TTL, stale-while-revalidate and single-flight fetches.
+
+    Within ``ttl`` seconds of a fetch the stored articles are served as is.
+    Up to ``stale_ttl`` they are still served, and one background refresh
+    replaces them; past that the caller waits for a fetch. Concurrent misses
+    for a symbol share one scrape. A page without articles is more often a
+    consent or captcha page than a quiet day: it never replaces articles
+    still being served, and is otherwise kept for ``empty_ttl`` seconds, with
+    no stale period. ``fetch`` returns a results page's HTML, so a saved page
+    can stand in for Google.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int, empty_ttl: Optional[float] = None,
+                 fetch: Fetch = fetch_news_page, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.empty_ttl = min(ttl, config.NEWS_EMPTY_TTL if empty_ttl is None else empty_ttl)
+        self.max_entries = max_entries
+        self.fetch = fetch
+        self.clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.fetch_seconds = 0.0
+        self.fetches = 0
+        self.last_fetch_ms: Optional[float] = None
+
+    async def get(self, symbol: str) -> List[dict]:
+        symbol = symbol.upper()
+        entry = self._entries.get(symbol)
+        if entry is not None:
+            now = self.clock()
+            if now < entry[1]:
+                self._entries.move_to_end(symbol)
+                self.hits += 1
+                return entry[0]
+            if now < entry[2]:
+                self._entries.move_to_end(symbol)
+                self.stale_hits += 1
+                self._revalidate(symbol)
+                return entry[0]
+        self.misses += 1
+        return await self._load(symbol)
+
+    async def _load(self, symbol: str) -> List[dict]:
+        async def scrape():
+            started = time.perf_counter()
+            html = await self.fetch(symbol)
+            # parsing is CPU work; keep it off the event loop
+            articles = await asyncio.to_thread(parse_news, html)
+            elapsed = time.perf_counter() - started
+            self.fetches += 1
+            self.fetch_seconds += elapsed
+            self.last_fetch_ms = round(elapsed * 1000, 1)
+            if articles:
+                self._put(symbol, articles, self.ttl, self.stale_ttl)
+            elif self._servable(symbol):
+                raise LookupError("the results page had no articles")
+            else:
+                self._put(symbol, articles, self.empty_ttl, self.empty_ttl)
+            return articles
+
+        return await upstream.coalesce(("news", symbol), scrape)
+
+    def _revalidate(self, symbol: str):
+        if symbol in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._load(symbol)
+                self.refreshes += 1
+            except Exception as e:
+                # keep serving what we have until it is past stale_ttl
+                self.refresh_failures += 1
+                print(f"⚠️ News refresh failed for {symbol}: {e}")
+            finally:
+                self._refreshing.pop(symbol, None)
+
+        self._refreshing[symbol] = asyncio.ensure_future(refresh())
+
+    def _servable(self, symbol: str) -> bool:
+        entry = self._entries.get(symbol)
+        return entry is not None and bool(entry[0]) and self.clock() < entry[2]
+
+    def _put(self, symbol: str, articles: List[dict], ttl: float, stale_ttl: float):
+        # (articles, fresh until, servable until)
+        now = self.clock()
+        self._entries.pop(symbol, None)
+        self._entries[symbol] = (articles, now + ttl, now + stale_ttl)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, symbol: Optional[str] = None):
+        if symbol is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(symbol.upper(), None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "refreshing": len(self._refreshing),
+            "fetches": self.fetches,
+            "avg_fetch_ms": round(self.fetch_seconds / self.fetches * 1000, 1) if self.fetches else None,
+            "last_fetch_ms": self.last_fetch_ms,
+        }
+
+
+news_cache = NewsCache(
+    ttl=config.NEWS_TTL,
+    stale_ttl=config.NEWS_STALE_TTL,
+    max_entries=config.NEWS_CACHE_SIZE,
+    empty_ttl=config.NEWS_EMPTY_TTL,
+)
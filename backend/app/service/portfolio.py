@@ -0,0 +1,283 @@
+import copy
+import json
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.telemetry import span
+from app.models import models
+from app.service import metrics
+from app.service.price_cache import data_version
+from app.service.price_matrix import load_cached_matrix
+from app.service.rebalance import FREQUENCIES, PortfolioState, equal_weights, period_ids, period_label
+from app.service.result_cache import key_digest, prune_runs, result_cache, result_digest
+from app.service.screening import Screen, panel_cache
+
+
+def _noop(fraction: float):
+    pass
+
+
+def run_key(strategy: models.Strategy, req, company_ids, fundamentals=None) -> str:
+    return json.dumps({
+        "strategy_id": strategy.id,
+        "parameters": strategy.parameters,
+        "fundamentals": fundamentals,
+        "start_date": str(req.start_date),
+        "initial_capital": req.initial_capital,
+        "rebalance_frequency": req.rebalance_frequency,
+        "company_ids": [int(c) for c in company_ids],
+    }, sort_keys=True)
+
+
+def _stored_run(db: Session, strategy: models.Strategy, key: str, through):
+    """The latest stored run of ``key`` ending no later than ``through``: the one to resume from."""
+    return (
+        db.query(models.BacktestResult)
+        .filter(models.BacktestResult.strategy_id == strategy.id)
+        .filter(models.BacktestResult.run_key == key_digest(key))
+        .filter(models.BacktestResult.end_date <= through)
+        .order_by(models.BacktestResult.end_date.desc(), models.BacktestResult.id.desc())
+        .first()
+    )
+
+
+def _stored_digest(db: Session, digest: str):
+    return (
+        db.query(models.BacktestResult)
+        .filter(models.BacktestResult.digest == digest)
+        .order_by(models.BacktestResult.id.desc())
+        .first()
+    )
+
+
+def _response(result: models.BacktestResult, strategy_id: int) -> dict:
+    checkpoint = result.logs["checkpoint"]
+    return {
+        "message": "✅ Backtest completed",
+        "backtest_id": result.id,
+        "strategy_id": strategy_id,
+        "metrics": result.performance_metrics,
+        "equity_curve": checkpoint["equity_curve"],
+        "allocation_history": checkpoint["allocation_history"],
+    }
+
+
+def _percent(x):
+    return None if x is None else round(x * 100, 2)
+
+
+def _ratio(x):
+    return None if x is None else round(x, 2)
+
+
+def _new_checkpoint(capital, company_ids) -> dict:
+    return {
+        "first_date": None,
+        "last_date": None,
+        "portfolio": PortfolioState(len(company_ids), capital).to_dict(),
+        "equity_curve": [],
+        "allocation_history": {"dates": [], "company_ids": [int(c) for c in company_ids], "weights": []},
+    }
+
+
+def _load_new_bars(db: Session, companies, req, checkpoint):
+    """Prices after the checkpoint, or None when the stored bars no longer match."""
+    if checkpoint["last_date"] is None:
+        return load_cached_matrix(db, companies, req.start_date, req.end_date)
+    matrix = load_cached_matrix(db, companies, checkpoint["last_date"], req.end_date)
+    if matrix.empty or str(matrix.dates[0]) != checkpoint["last_date"]:
+        return None
+    first = matrix.close[0]
+    seen = ~np.isnan(first)
+    stored = np.array([np.nan if v is None else v for v in checkpoint["portfolio"]["last_close"]])
+    if not np.array_equal(first[seen], stored[seen]):
+        return None
+    matrix.dates = matrix.dates[1:]
+    matrix.close = matrix.close[1:]
+    return matrix
+
+
+def _screen_targets(screen: Screen, panel, state: PortfolioState, matrix, starts, last_date) -> np.ndarray:
+    """Target weights for each new period, screened as of the close before it opens."""
+    before = np.maximum(starts - 1, 0)
+    when = matrix.dates[before]
+    priced = matrix.close[before]
+    if len(starts) and starts[0] == 0 and last_date is not None:
+        when[0] = np.datetime64(last_date, "D")
+        priced[0] = state.last_close
+    return screen.weights(panel, when, matrix.company_ids, ~np.isnan(priced))
+
+
+def run_portfolio_backtest(db: Session, strategy: models.Strategy, req,
+                           progress: Optional[Callable[[float], None]] = None) -> dict:
+    """Periodically rebalanced portfolio backtest behind POST /run; persists a BacktestResult.
+
+    Strategies with ``filter``/``ranking`` parameters pick their holdings at
+    each rebalance through the screening engine; others hold the top 10 by
+    market cap. Weights drift with prices between rebalances. Every run is
+    stored as a new BacktestResult with its daily equity and a checkpoint of
+    the open period, so a later request that only extends ``end_date``
+    simulates just the bars after the latest earlier run; stored rows are
+    never rewritten, and only the newest STORED_RUNS_PER_KEY per key are kept.
+    A request identical to an earlier one, over the same data version, is
+    answered from the result cache or the stored run without simulating.
+    """
+    progress = progress or _noop
+    frequency = req.rebalance_frequency
+    if frequency not in FREQUENCIES:
+        raise HTTPException(status_code=400, detail=f"rebalance_frequency must be one of {sorted(FREQUENCIES)}")
+
+    try:
+        screen = Screen.from_parameters(strategy.parameters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with span("run.universe"):
+        if screen is None:
+            # 🔷 Pick top 10 companies by market cap
+            companies = (
+                db.query(models.Company)
+                .order_by(models.Company.market_cap.desc())
+                .limit(10)
+                .all()
+            )
+            panel = fundamentals = None
+        else:
+            # 🔷 Screened strategy: every company is a candidate at each rebalance
+            companies = db.query(models.Company).all()
+            panel, fundamentals = panel_cache.get(db)
+    company_ids = sorted(c.id for c in companies)
+
+    # 🔷 Start with initial capital
+    capital = req.initial_capital or 100_000
+
+    # 🔷 Same strategy, parameters, range, capital and universe over the same data: reuse the result
+    digest = result_digest(
+        "run",
+        strategy=strategy.name,
+        parameters=strategy.parameters,
+        start_date=req.start_date,
+        end_date=req.end_date,
+        initial_capital=capital,
+        rebalance_frequency=frequency,
+        company_ids=company_ids,
+        prices=data_version(),
+        fundamentals=fundamentals,
+    )
+    cached = result_cache.get(digest)
+    if cached is not None:
+        progress(1.0)
+        return {**cached, "strategy_id": strategy.id}
+    with span("run.stored_lookup"):
+        stored = _stored_digest(db, digest)
+    if stored is not None:
+        response = _response(stored, strategy.id)
+        result_cache.put(digest, response, stored.logs.get("compute_seconds", 0.0), stored=True)
+        progress(1.0)
+        return response
+    started = time.perf_counter()
+
+    key = run_key(strategy, req, company_ids, fundamentals)
+    with span("run.stored_lookup"):
+        previous = _stored_run(db, strategy, key, req.end_date)
+        # a copy: the stored run is left as it was
+        checkpoint = copy.deepcopy((previous.logs or {}).get("checkpoint")) if previous else None
+
+    # 🔷 Fetch price data as a dense date × company matrix (only bars after the checkpoint)
+    with span("run.load_prices"):
+        matrix = _load_new_bars(db, companies, req, checkpoint) if checkpoint else None
+        if matrix is None:
+            checkpoint = _new_checkpoint(capital, company_ids)
+            daily = {"dates": [], "values": []}
+            matrix = _load_new_bars(db, companies, req, checkpoint)
+            if matrix.empty:
+                raise HTTPException(status_code=400, detail="No price data in selected period")
+        else:
+            daily = copy.deepcopy(previous.equity_curve)
+    progress(0.3)
+
+    # 🔷 Simulate the new bars: equal weight, or the screen's picks, at every rebalance
+    state = PortfolioState.from_dict(checkpoint["portfolio"])
+    periods = period_ids(matrix.dates, frequency)
+    starts = state.new_periods(periods)
+    with span("run.targets"):
+        if screen is None:
+            targets = equal_weights(len(starts), len(company_ids))
+        else:
+            try:
+                targets = _screen_targets(screen, panel, state, matrix, starts, checkpoint["last_date"])
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    continues_open = len(matrix) > 0 and state.period is not None and periods[0] == state.period
+    with span("run.rebalance"):
+        step = state.advance(matrix.close, periods, targets)
+    progress(0.8)
+
+    # period-end points: the open period's entry is replaced
+    equity_curve = checkpoint["equity_curve"]
+    allocations = checkpoint["allocation_history"]
+    if continues_open:
+        equity_curve.pop()
+        allocations["dates"].pop()
+        allocations["weights"].pop()
+    for row, weights in zip(step.period_ends, step.weights):
+        label = period_label(periods[row], frequency)
+        equity_curve.append({"date": label, "capital": round(float(step.value[row]), 2)})
+        allocations["dates"].append(label)
+        allocations["weights"].append(np.round(weights, 6).tolist())
+
+    daily["dates"].extend(str(d) for d in matrix.dates)
+    daily["values"].extend(step.value.tolist())
+    checkpoint["portfolio"] = state.to_dict()
+    if len(matrix):
+        checkpoint["first_date"] = checkpoint["first_date"] or str(matrix.dates[0])
+        checkpoint["last_date"] = str(matrix.dates[-1])
+
+    # 📊 Metrics (from the daily portfolio values)
+    n_years = (pd.Timestamp(checkpoint["last_date"]) - pd.Timestamp(checkpoint["first_date"])).days / 365
+    with span("run.metrics"):
+        stats = metrics.scalar_metrics(metrics.compute(np.asarray(daily["values"]), base=capital, years=n_years))
+
+    result = models.BacktestResult(strategy_id=strategy.id, created_at=datetime.now(), digest=digest,
+                                   run_key=key_digest(key))
+    db.add(result)
+    result.start_date = req.start_date
+    result.end_date = req.end_date
+    result.equity_curve = daily
+    result.performance_metrics = {
+        "CAGR": _percent(stats["cagr"]),
+        "Sharpe": _ratio(stats["sharpe"]),
+        "Total Return": _percent(stats["total_return"]),
+        "Max Drawdown": _percent(stats["max_drawdown"]),
+        "Volatility": _percent(stats["volatility"]),
+        "Sortino": _ratio(stats["sortino"]),
+        "Calmar": _ratio(stats["calmar"]),
+        "Max Drawdown Days": stats["max_drawdown_duration"],
+        "Hit Rate": _percent(stats["hit_rate"]),
+    }
+    elapsed = time.perf_counter() - started
+    result.logs = {"trades": [], "key": key, "rebalance_frequency": frequency, "checkpoint": checkpoint,
+                   "compute_seconds": round(elapsed, 4)}
+
+    with span("run.persist"):
+        db.commit()
+        db.refresh(result)
+        prune_runs(db, result.run_key)
+    progress(1.0)
+
+    response = {
+        "message": "✅ Backtest completed",
+        "backtest_id": result.id,
+        "strategy_id": strategy.id,
+        "metrics": result.performance_metrics,
+        "equity_curve": equity_curve,
+        "allocation_history": allocations,
+    }
+    result_cache.put(digest, response, elapsed)
+    return response
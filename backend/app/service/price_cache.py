@@ -0,0 +1,207 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+from app.core import config
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def to_day(value) -> Optional[np.datetime64]:
+    if value is None or value == "":
+        return None
+    return np.datetime64(value, "D")
+
+
+class PriceSeries:
+    """One symbol's price history as contiguous, date-sorted NumPy arrays."""
+
+    __slots__ = ("dates",) + FIELDS
+
+    def __init__(self, dates, open=None, high=None, low=None, close=None, volume=None):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        n = len(self.dates)
+        nan = np.full(n, np.nan)
+        self.close = np.ascontiguousarray(close if close is not None else nan, dtype=np.float64)
+        self.open = np.ascontiguousarray(open if open is not None else self.close, dtype=np.float64)
+        self.high = np.ascontiguousarray(high if high is not None else self.close, dtype=np.float64)
+        self.low = np.ascontiguousarray(low if low is not None else self.close, dtype=np.float64)
+        self.volume = np.ascontiguousarray(volume if volume is not None else np.zeros(n), dtype=np.float64)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + sum(getattr(self, f).nbytes for f in FIELDS)
+
+    def fingerprint(self) -> str:
+        """Hash of the dates and closes; changes whenever a bar is added or revised."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(self.dates).view(np.int64).tobytes())
+        digest.update(np.ascontiguousarray(self.close).tobytes())
+        return digest.hexdigest()
+
+    def slice(self, start=None, end=None, end_inclusive: bool = True) -> "PriceSeries":
+        """Views over ``[start, end]`` (or ``[start, end)``) found by binary search."""
+        lo = 0 if start is None else np.searchsorted(self.dates, to_day(start), side="left")
+        if end is None:
+            hi = len(self.dates)
+        else:
+            hi = np.searchsorted(self.dates, to_day(end), side="right" if end_inclusive else "left")
+        out = PriceSeries.__new__(PriceSeries)
+        out.dates = self.dates[lo:hi]
+        for f in FIELDS:
+            setattr(out, f, getattr(self, f)[lo:hi])
+        return out
+
+
+Loader = Callable[[list], Dict[str, PriceSeries]]
+
+
+class PriceCache:
+    """Process-wide LRU of full-history price series keyed by (source, symbol).
+
+    ``db`` entries are dropped whenever the price version stamp written by
+    ``populate_data.py`` changes; other sources expire after ``ttl`` seconds,
+    and an empty series from them is returned but never cached.
+    """
+
+    def __init__(self, max_bytes: int, version_file: str, check_interval: float = 1.0):
+        self.max_bytes = max_bytes
+        self.version_file = version_file
+        self.check_interval = check_interval
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._version = None
+        self._version_checked = 0.0
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, symbol: str, loader: Loader, start=None, end=None, source: str = "db",
+            ttl: Optional[float] = None, end_inclusive: bool = True) -> PriceSeries:
+        return self.get_many([symbol], loader, start, end, source, ttl, end_inclusive)[symbol]
+
+    def get_many(self, symbols: Iterable[str], loader: Loader, start=None, end=None, source: str = "db",
+                 ttl: Optional[float] = None, end_inclusive: bool = True) -> Dict[str, PriceSeries]:
+        self._check_version()
+        symbols = list(dict.fromkeys(symbols))
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for symbol in symbols:
+                entry = self._entries.get((source, symbol))
+                if entry is not None and (ttl is None or now - entry[1] < ttl):
+                    self._entries.move_to_end((source, symbol))
+                    found[symbol] = entry[0]
+                    self.hits += 1
+                else:
+                    missing.append(symbol)
+                    self.misses += 1
+
+        if missing:
+            loaded = loader(missing)
+            for symbol in missing:
+                series = loaded.get(symbol)
+                if series is None:
+                    series = PriceSeries(np.empty(0, dtype="datetime64[D]"))
+                # an empty upstream answer is usually a failed call: ask again next time
+                if len(series) or ttl is None:
+                    self.put(symbol, series, source)
+                found[symbol] = series
+
+        return {s: found[s].slice(start, end, end_inclusive) for s in symbols}
+
+    def lookup(self, symbol: str, source: str = "db", ttl: Optional[float] = None) -> Optional[PriceSeries]:
+        """The cached full history, or None on a miss; for callers that load it themselves."""
+        self._check_version()
+        with self._lock:
+            entry = self._entries.get((source, symbol))
+            if entry is not None and (ttl is None or time.monotonic() - entry[1] < ttl):
+                self._entries.move_to_end((source, symbol))
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, symbol: str, series: PriceSeries, source: str = "db"):
+        with self._lock:
+            old = self._entries.pop((source, symbol), None)
+            if old is not None:
+                self.nbytes -= old[0].nbytes
+            self._entries[(source, symbol)] = (series, time.monotonic())
+            self.nbytes += series.nbytes
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def invalidate(self, symbols: Optional[Iterable[str]] = None, source: Optional[str] = None):
+        with self._lock:
+            wanted = None if symbols is None else set(symbols)
+            for key in list(self._entries):
+                if (source is None or key[0] == source) and (wanted is None or key[1] in wanted):
+                    self.nbytes -= self._entries.pop(key)[0].nbytes
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "data_version": self._version,
+            }
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._version_checked < self.check_interval:
+            return
+        self._version_checked = now
+        version = read_version_stamp(self.version_file)
+        if version != self._version:
+            if self._version is not None:
+                self.invalidate(source="db")
+            self._version = version
+
+
+def read_version_stamp(path: str) -> str:
+    try:
+        with open(path) as f:
+            return f.read().strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+
+def bump_data_version(symbols: Optional[Iterable[str]] = None) -> str:
+    """Record that new prices were written; every API process drops its db entries."""
+    version = str(time.time_ns())
+    os.makedirs(os.path.dirname(config.PRICE_VERSION_FILE), exist_ok=True)
+    tmp = f"{config.PRICE_VERSION_FILE}.{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, config.PRICE_VERSION_FILE)
+    price_cache.invalidate(symbols, source="db")
+    return version
+
+
+def data_version() -> str:
+    return read_version_stamp(config.PRICE_VERSION_FILE)
+
+
+price_cache = PriceCache(
+    max_bytes=int(config.PRICE_CACHE_MAX_MB * 1024 * 1024),
+    version_file=config.PRICE_VERSION_FILE,
+    check_interval=config.PRICE_VERSION_CHECK_INTERVAL,
+)
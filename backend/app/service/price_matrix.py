@@ -0,0 +1,172 @@
+from datetime import date
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import Float, cast, select
+from sqlalchemy.orm import Session
+
+from app.core.db import stream_chunks
+from app.core.telemetry import span
+from app.data.nifty100 import NIFTY_100_SYMBOLS
+from app.models import models
+from app.service.engine import ffill
+from app.service.price_cache import PriceSeries, price_cache
+
+
+class PriceMatrix:
+    """Dense date × company close matrix.
+
+    ``close[i, j]`` is the close of ``company_ids[j]`` on ``dates[i]``,
+    forward filled; NaN before a company's first price.
+    """
+
+    __slots__ = ("dates", "company_ids", "close")
+
+    def __init__(self, dates: np.ndarray, company_ids: np.ndarray, close: np.ndarray):
+        self.dates = dates
+        self.company_ids = company_ids
+        self.close = close
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def empty(self) -> bool:
+        return self.close.size == 0
+
+    def column(self, company_id: int) -> np.ndarray:
+        idx = np.searchsorted(self.company_ids, company_id)
+        if idx >= len(self.company_ids) or self.company_ids[idx] != company_id:
+            raise KeyError(company_id)
+        return self.close[:, idx]
+
+
+def _read_columns(db: Session, stmt):
+    date_parts, id_parts, close_parts = [], [], []
+    for chunk in stream_chunks(db, stmt):
+        d, c, v = zip(*chunk)
+        date_parts.append(np.array(d, dtype="datetime64[D]"))
+        id_parts.append(np.fromiter(c, dtype=np.int64, count=len(c)))
+        close_parts.append(np.fromiter((np.nan if x is None else x for x in v), dtype=np.float64, count=len(v)))
+    if not date_parts:
+        empty = np.empty(0)
+        return empty.astype("datetime64[D]"), empty.astype(np.int64), empty
+    return np.concatenate(date_parts), np.concatenate(id_parts), np.concatenate(close_parts)
+
+
+def load_price_matrix(
+    db: Session,
+    company_ids: Iterable[int],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    fill: bool = True,
+) -> PriceMatrix:
+    company_ids = sorted(set(int(c) for c in company_ids))
+    stmt = select(
+        models.Price.date,
+        models.Price.company_id,
+        cast(models.Price.close, Float),
+    ).where(models.Price.company_id.in_(company_ids))
+    if start_date is not None:
+        stmt = stmt.where(models.Price.date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(models.Price.date <= end_date)
+
+    dates, ids, close = _read_columns(db, stmt)
+    if dates.size == 0:
+        return PriceMatrix(dates, np.asarray(company_ids, dtype=np.int64), np.empty((0, len(company_ids))))
+
+    # 🔷 Scatter rows into the dense matrix — columns keep the requested id order
+    uniq_dates, row_idx = np.unique(dates, return_inverse=True)
+    cols = np.asarray(company_ids, dtype=np.int64)
+    col_idx = np.searchsorted(cols, ids)
+
+    matrix = np.full((len(uniq_dates), len(cols)), np.nan)
+    matrix[row_idx, col_idx] = close
+    if fill:
+        matrix = ffill(matrix)
+    return PriceMatrix(uniq_dates, cols, matrix)
+
+
+def matrix_from_series(company_ids, series_list) -> PriceMatrix:
+    """Align per-company series (e.g. from the price cache) on the union of their dates."""
+    parts = [s.dates for s in series_list if len(s)]
+    if not parts:
+        return PriceMatrix(np.empty(0, dtype="datetime64[D]"), np.asarray(company_ids, dtype=np.int64),
+                           np.empty((0, len(company_ids))))
+    dates = np.unique(np.concatenate(parts))
+    order = np.argsort(company_ids)
+    matrix = np.full((len(dates), len(company_ids)), np.nan)
+    for col, j in enumerate(order):
+        series = series_list[j]
+        matrix[np.searchsorted(dates, series.dates), col] = series.close
+    return PriceMatrix(dates, np.asarray(company_ids, dtype=np.int64)[order], ffill(matrix))
+
+
+def load_price_series(db: Session, symbols) -> dict:
+    """Full OHLCV history for each symbol, one query for all of them."""
+    stmt = (
+        select(
+            models.Company.symbol,
+            models.Price.date,
+            cast(models.Price.open, Float),
+            cast(models.Price.high, Float),
+            cast(models.Price.low, Float),
+            cast(models.Price.close, Float),
+            cast(models.Price.volume, Float),
+        )
+        .join(models.Company, models.Company.id == models.Price.company_id)
+        .where(models.Company.symbol.in_(list(symbols)))
+        .order_by(models.Company.symbol, models.Price.date)
+    )
+    columns = [[] for _ in range(7)]
+    with span("prices.query"):
+        for chunk in stream_chunks(db, stmt):
+            for col, values in zip(columns, zip(*chunk)):
+                col.extend(values)
+    if not columns[0]:
+        return {}
+
+    with span("prices.convert"):
+        sym = np.asarray(columns[0], dtype=object)
+        dates = np.array(columns[1], dtype="datetime64[D]")
+        values = [np.array(c, dtype=np.float64) for c in columns[2:]]
+        starts = np.flatnonzero(np.r_[True, sym[1:] != sym[:-1]])
+        ends = np.r_[starts[1:], len(sym)]
+        return {
+            sym[lo]: PriceSeries(dates[lo:hi], *(v[lo:hi] for v in values))
+            for lo, hi in zip(starts, ends)
+        }
+
+
+def load_cached_matrix(db: Session, companies, start_date=None, end_date=None) -> PriceMatrix:
+    """Price matrix for ``companies`` (ORM rows or (id, symbol) pairs) served from the price cache."""
+    pairs = [(c.id, c.symbol) if hasattr(c, "symbol") else tuple(c) for c in companies]
+    series = price_cache.get_many(
+        [symbol for _, symbol in pairs],
+        lambda missing: load_price_series(db, missing),
+        start_date,
+        end_date,
+    )
+    with span("prices.pivot"):
+        return matrix_from_series([cid for cid, _ in pairs], [series[symbol] for _, symbol in pairs])
+
+
+def load_universe(db: Session, symbols=None, start_date=None, end_date=None):
+    """Price matrix for a list of symbols (NIFTY 100 by default).
+
+    Returns (symbols in column order, PriceMatrix, symbols with no company row).
+    """
+    wanted = list(dict.fromkeys(symbols or NIFTY_100_SYMBOLS))
+    rows = (
+        db.query(models.Company.id, models.Company.symbol)
+        .filter(models.Company.symbol.in_(wanted))
+        .all()
+    )
+    found = {symbol: cid for cid, symbol in rows}
+    missing = [s for s in wanted if s not in found]
+    matrix = load_cached_matrix(db, [(found[s], s) for s in wanted if s in found], start_date, end_date)
+    if matrix.empty:
+        return [], matrix, wanted
+    by_id = {cid: symbol for symbol, cid in found.items()}
+    return [by_id[int(cid)] for cid in matrix.company_ids], matrix, missing
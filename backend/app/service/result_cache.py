@@ -0,0 +1,155 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.models import models
+from app.service.price_cache import data_version
+
+
+def normalize(value):
+    """Request parts in one canonical form, so ``20`` and ``20.0`` or a tuple and a list hash alike."""
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def result_digest(kind: str, **parts) -> str:
+    """Content address of a backtest: what ran, on which parameters, over which data."""
+    payload = json.dumps(normalize({"kind": kind, **parts}), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def key_digest(key: str) -> str:
+    """The indexed form of a run key (``BacktestResult.run_key``): stored runs a later run may resume from."""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ResultCache:
+    """Finished backtest responses keyed by ``result_digest``, an LRU of ``max_entries``.
+
+    A digest covers the data a run read (the price version stamp, or the
+    series' own fingerprint), so new prices make old entries unreachable;
+    the cache is also emptied when the stamp changes. Runs found in
+    BacktestResult by digest count as stored hits. ``saved_seconds`` adds up
+    the compute time that every hit skipped.
+    """
+
+    def __init__(self, max_entries: int, check_interval: float = 1.0):
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked = 0.0
+        self.hits = 0
+        self.stored_hits = 0
+        self.misses = 0
+        self.compute_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def get(self, digest: str) -> Optional[dict]:
+        """A shallow copy of the cached response (callers may pop keys, not edit values), or None."""
+        self._check_version()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            self.saved_seconds += entry[1]
+            return dict(entry[0])
+
+    def put(self, digest: str, payload: dict, seconds: float, stored: bool = False):
+        """Keep a response that took ``seconds`` to compute; ``stored`` when it was read back from the DB."""
+        with self._lock:
+            if stored:
+                self.stored_hits += 1
+                self.saved_seconds += seconds
+            else:
+                self.misses += 1
+                self.compute_seconds += seconds
+            self._entries.pop(digest, None)
+            self._entries[digest] = (dict(payload), seconds)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, digests):
+        with self._lock:
+            for digest in digests:
+                self._entries.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stored_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "stored_hits": self.stored_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.stored_hits) / lookups, 4) if lookups else 0.0,
+                "compute_seconds": round(self.compute_seconds, 3),
+                "saved_seconds": round(self.saved_seconds, 3),
+                "data_version": self._version,
+            }
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._version_checked < self.check_interval:
+            return
+        self._version_checked = now
+        version = data_version()
+        if version != self._version:
+            if self._version is not None:
+                self.clear()
+            self._version = version
+
+
+result_cache = ResultCache(
+    max_entries=config.RESULT_CACHE_SIZE,
+    check_interval=config.PRICE_VERSION_CHECK_INTERVAL,
+)
+
+
+def prune_runs(db: Session, run_key: str, keep: Optional[int] = None) -> int:
+    """Delete all but the newest ``keep`` stored runs with ``run_key`` (a key_digest); returns rows deleted.
+
+    Every extension of a run stores its whole curve, ledger and checkpoint
+    again, so without this the rows of one key grow with each request. The
+    responses of deleted runs leave the result cache too (their ids are gone).
+    """
+    keep = config.STORED_RUNS_PER_KEY if keep is None else keep
+    old = (
+        db.query(models.BacktestResult.id, models.BacktestResult.digest)
+        .filter(models.BacktestResult.run_key == run_key)
+        .order_by(models.BacktestResult.id.desc())
+        .offset(keep)
+        .all()
+    )
+    if not old:
+        return 0
+    db.query(models.BacktestResult).filter(models.BacktestResult.id.in_([i for i, _ in old])) \
+        .delete(synchronize_session=False)
+    db.commit()
+    result_cache.discard(d for _, d in old if d)
+    return len(old)
@@ -0,0 +1,205 @@
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.models import models
+from app.service.engine import ffill
+from app.service.price_cache import data_version
+
+# short names for the statement rows stored by populate_data ("{statement}_{row}")
+METRICS = {
+    "net_income": "financials_Net Income",
+    "revenue": "financials_Total Revenue",
+    "equity": "balance_sheet_Stockholders Equity",
+    "total_assets": "balance_sheet_Total Assets",
+    "total_debt": "balance_sheet_Total Debt",
+    "free_cash_flow": "cashflow_Free Cash Flow",
+}
+
+# ratios computed from the point-in-time values above, in percent
+DERIVED = {
+    "ROE": ("net_income", "equity"),
+    "ROA": ("net_income", "total_assets"),
+    "net_margin": ("net_income", "revenue"),
+    "debt_to_equity": ("total_debt", "equity"),
+}
+
+SIZING = ("equal_weight", "market_cap")
+
+
+class FundamentalsPanel:
+    """Every fundamental as a dense report date × company × metric array.
+
+    Values are carried forward, so ``values[d]`` is what was last reported
+    on or before ``dates[d]``. Lookups add ``lag_days`` so a statement only
+    counts once it could have been published.
+    """
+
+    def __init__(self, company_ids, metrics: List[str], dates, values, market_cap, lag_days: int):
+        self.company_ids = np.asarray(company_ids, dtype=np.int64)
+        self.metrics = list(metrics)
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.values = values
+        self.market_cap = np.asarray(market_cap, dtype=np.float64)
+        self.lag = np.timedelta64(lag_days, "D")
+        self._index = {m: i for i, m in enumerate(self.metrics)}
+
+    def has(self, name: str) -> bool:
+        return (name == "market_cap" or name in DERIVED
+                or METRICS.get(name, name) in self._index)
+
+    def asof(self, name: str, when, company_ids) -> np.ndarray:
+        """(len(when), len(company_ids)) point-in-time values of one metric."""
+        when = np.asarray(when, dtype="datetime64[D]")
+        cols = np.searchsorted(self.company_ids, company_ids)
+        known = (cols < len(self.company_ids)) & (self.company_ids[np.minimum(cols, len(self.company_ids) - 1)] == company_ids)
+        cols = np.where(known, cols, 0)
+
+        if name == "market_cap":
+            # only today's market cap is stored, so this one is not point-in-time
+            out = np.broadcast_to(self.market_cap[cols], (len(when), len(cols))).copy()
+        elif name in DERIVED:
+            num, den = (self.asof(m, when, company_ids) for m in DERIVED[name])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(den > 0, num / den * 100, np.nan)
+        else:
+            metric = self._index.get(METRICS.get(name, name))
+            rows = np.searchsorted(self.dates, when - self.lag, side="right") - 1
+            if metric is None or not len(self.dates):
+                out = np.full((len(when), len(cols)), np.nan)
+            else:
+                out = self.values[np.maximum(rows, 0)][:, cols, metric]
+                out[rows < 0] = np.nan
+        out[:, ~known] = np.nan
+        return out
+
+
+def load_panel(db: Session, lag_days: int = config.FUNDAMENTALS_LAG_DAYS) -> FundamentalsPanel:
+    """Pivot the fundamentals table in one query (later rows win on duplicates)."""
+    stmt = (
+        select(models.Fundamental.company_id, models.Fundamental.metric,
+               models.Fundamental.date, cast(models.Fundamental.value, Float))
+        .where(models.Fundamental.date.is_not(None))
+        .order_by(models.Fundamental.id)
+    )
+    rows = db.execute(stmt).all()
+    companies = db.execute(select(models.Company.id, models.Company.market_cap).order_by(models.Company.id)).all()
+    company_ids = np.array([c for c, _ in companies], dtype=np.int64)
+    market_cap = np.array([m or np.nan for _, m in companies], dtype=np.float64)
+    if not rows:
+        return FundamentalsPanel(company_ids, [], np.empty(0, dtype="datetime64[D]"),
+                                 np.empty((0, len(company_ids), 0)), market_cap, lag_days)
+
+    cid, metric, day, value = zip(*rows)
+    metrics, m_idx = np.unique(np.asarray(metric, dtype=object), return_inverse=True)
+    dates, d_idx = np.unique(np.asarray(day, dtype="datetime64[D]"), return_inverse=True)
+    c_idx = np.searchsorted(company_ids, np.asarray(cid, dtype=np.int64))
+    value = np.array([np.nan if v is None else v for v in value], dtype=np.float64)
+
+    values = np.full((len(dates), len(company_ids), len(metrics)), np.nan)
+    values[d_idx, c_idx, m_idx] = value
+    # carry each company's last report forward to later report dates
+    values = ffill(values.reshape(len(dates), -1)).reshape(values.shape)
+    return FundamentalsPanel(company_ids, metrics.tolist(), dates, values, market_cap, lag_days)
+
+
+class _PanelCache:
+    """The last built panel, rebuilt when prices are re-ingested or fundamentals grow."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._panel = None
+        self._signature = None
+
+    def get(self, db: Session):
+        last_id = db.execute(select(func.max(models.Fundamental.id))).scalar()
+        signature = (data_version(), last_id)
+        with self._lock:
+            if self._signature != signature:
+                self._panel = load_panel(db)
+                self._signature = signature
+            return self._panel, f"{signature[0]}:{signature[1]}"
+
+
+panel_cache = _PanelCache()
+
+
+class Screen:
+    """``Strategy.parameters`` compiled into vectorized filters and rankings.
+
+    ``{"filter": {"ROE_min": 15, "market_cap_min": 1e12}, "ranking": ["ROE DESC"],
+    "top_n": 10, "position_sizing": "equal_weight"}``; filter keys are a metric
+    name plus ``_min`` / ``_max``, rankings are ``"<metric> ASC|DESC"``
+    applied in order.
+    """
+
+    def __init__(self, filters, ranking, top_n: Optional[int], sizing: str):
+        self.filters = filters    # [(metric, is_min, bound)]
+        self.ranking = ranking    # [(metric, descending)]
+        self.top_n = top_n
+        self.sizing = sizing
+
+    @classmethod
+    def from_parameters(cls, parameters: Optional[dict]) -> Optional["Screen"]:
+        """None when the strategy does not screen (no filter and no ranking)."""
+        parameters = parameters or {}
+        if not parameters.get("filter") and not parameters.get("ranking"):
+            return None
+        filters = []
+        for key, bound in (parameters.get("filter") or {}).items():
+            name, _, side = key.rpartition("_")
+            if side not in ("min", "max") or not name:
+                raise ValueError(f"filter '{key}' must end in _min or _max")
+            filters.append((name, side == "min", float(bound)))
+        ranking = []
+        for item in parameters.get("ranking") or []:
+            name, _, direction = item.strip().partition(" ")
+            direction = direction.strip().upper() or "DESC"
+            if direction not in ("ASC", "DESC"):
+                raise ValueError(f"ranking '{item}' must be '<metric> ASC' or '<metric> DESC'")
+            ranking.append((name, direction == "DESC"))
+        top_n = parameters.get("top_n", 10 if ranking else None)
+        sizing = parameters.get("position_sizing", "equal_weight")
+        if sizing not in SIZING:
+            raise ValueError(f"position_sizing must be one of {list(SIZING)}")
+        return cls(filters, ranking, int(top_n) if top_n else None, sizing)
+
+    def metrics(self) -> List[str]:
+        return list(dict.fromkeys([m for m, _, _ in self.filters] + [m for m, _ in self.ranking]))
+
+    def weights(self, panel: FundamentalsPanel, when, company_ids, eligible) -> np.ndarray:
+        """(len(when), len(company_ids)) target weights, one row per rebalance date."""
+        unknown = [m for m in self.metrics() if not panel.has(m)]
+        if unknown:
+            raise ValueError(f"unknown metrics: {unknown}")
+        company_ids = np.asarray(company_ids, dtype=np.int64)
+        values: Dict[str, np.ndarray] = {m: panel.asof(m, when, company_ids) for m in self.metrics()}
+
+        keep = np.asarray(eligible, dtype=bool).copy()
+        for name, is_min, bound in self.filters:
+            with np.errstate(invalid="ignore"):
+                keep &= values[name] >= bound if is_min else values[name] <= bound
+
+        chosen = keep
+        if self.ranking or self.top_n:
+            # stable sorts from the last key to the first; NaN and filtered-out rank last
+            order = np.tile(np.arange(len(company_ids)), (keep.shape[0], 1))
+            for name, descending in reversed(self.ranking):
+                key = np.take_along_axis(-values[name] if descending else values[name], order, axis=1)
+                order = np.take_along_axis(order, np.argsort(np.where(np.isnan(key), np.inf, key),
+                                                             axis=1, kind="stable"), axis=1)
+            passing = np.take_along_axis(~keep, order, axis=1)
+            order = np.take_along_axis(order, np.argsort(passing, axis=1, kind="stable"), axis=1)
+            rank = np.empty_like(order)
+            np.put_along_axis(rank, order, np.arange(len(company_ids))[None, :], axis=1)
+            chosen = keep & (rank < (self.top_n or len(company_ids)))
+
+        size = chosen.astype(np.float64)
+        if self.sizing == "market_cap":
+            size *= np.nan_to_num(panel.asof("market_cap", when, company_ids))
+        total = size.sum(axis=1, keepdims=True)
+        return np.divide(size, total, out=np.zeros_like(size), where=total > 0)
@@ -0,0 +1,114 @@
+import itertools
+from typing import Optional
+
+import numpy as np
+
+from app.core import config
+from app.service import engine
+from app.service.indicators import Indicators
+
+# parameter combinations simulated per batch; bounds the bars × combos arrays
+CHUNK = 512
+
+SORT_KEYS = ("total_return", "win_rate", "max_drawdown")
+
+
+def param_values(spec) -> np.ndarray:
+    """Explicit values, or an inclusive ``start``/``stop``/``step`` range."""
+    if spec.values:
+        return np.unique(np.asarray(spec.values, dtype=np.float64))
+    step = spec.step or 1
+    count = int(np.floor((spec.stop - spec.start) / step + 1e-9)) + 1
+    if count > config.SWEEP_MAX_COMBINATIONS:
+        raise ValueError(f"A parameter range may span at most {config.SWEEP_MAX_COMBINATIONS} values")
+    return spec.start + step * np.arange(max(count, 0))
+
+
+def _windows(values, name: str) -> np.ndarray:
+    """Distinct window lengths, which must be positive."""
+    windows = np.unique(np.asarray(values, dtype=np.int64))
+    if len(windows) and windows[0] < 1:
+        raise ValueError(f"{name} values must be positive")
+    return windows
+
+
+def _check_size(n_windows: int, n_combos: int):
+    if n_windows > config.SWEEP_MAX_WINDOWS:
+        raise ValueError(f"The grid needs {n_windows} distinct windows; the limit is {config.SWEEP_MAX_WINDOWS}")
+    if n_combos > config.SWEEP_MAX_COMBINATIONS:
+        raise ValueError(f"The grid has {n_combos} combinations; the limit is {config.SWEEP_MAX_COMBINATIONS}")
+
+
+def _evaluate(close, signals) -> dict:
+    summary = engine.simulate(close, signals).summary()
+    return {k: summary[k] for k in SORT_KEYS}
+
+
+def _batched(close, n_combos, make_signals) -> dict:
+    parts = {k: [] for k in SORT_KEYS}
+    for lo in range(0, n_combos, CHUNK):
+        metrics = _evaluate(close, make_signals(slice(lo, lo + CHUNK)))
+        for k in SORT_KEYS:
+            parts[k].append(metrics[k])
+    return {k: np.concatenate(v) if v else np.empty(0) for k, v in parts.items()}
+
+
+def sma_grid(close, short_windows, long_windows, indicators: Optional[Indicators] = None) -> dict:
+    short_windows = _windows(short_windows, "short_window")
+    long_windows = _windows(long_windows, "long_window")
+    windows = np.union1d(short_windows, long_windows)
+    _check_size(len(windows), len(short_windows) * len(long_windows))
+    means = (indicators or Indicators(close)).many("sma", windows)
+
+    si, li = np.meshgrid(np.searchsorted(windows, short_windows),
+                         np.searchsorted(windows, long_windows), indexing="ij")
+    si, li = si.ravel(), li.ravel()
+    keep = windows[si] < windows[li]
+    si, li = si[keep], li[keep]
+
+    metrics = _batched(close, len(si), lambda s: engine.crossover(means[:, si[s]], means[:, li[s]]))
+    return {"short_window": windows[si], "long_window": windows[li], **metrics}
+
+
+def rsi_grid(close, periods, overbought, oversold, indicators: Optional[Indicators] = None) -> dict:
+    periods = _windows(periods, "period")
+    _check_size(len(periods), len(periods) * len(overbought) * len(oversold))
+    close = np.asarray(close, dtype=np.float64).ravel()
+    rsi = (indicators or Indicators(close)).many("rsi", periods)
+
+    combos = np.array(list(itertools.product(range(len(periods)), overbought, oversold)), dtype=np.float64)
+    if len(combos) == 0:
+        combos = np.empty((0, 3))
+    pi = combos[:, 0].astype(np.int64)
+    ob, os_ = combos[:, 1], combos[:, 2]
+
+    def signals(s):
+        values = rsi[:, pi[s]]
+        with np.errstate(invalid="ignore"):
+            return np.where(values < os_[s], 1, np.where(values > ob[s], -1, 0)).astype(np.int8)
+
+    metrics = _batched(close, len(pi), signals)
+    return {"period": periods[pi], "overbought": ob, "oversold": os_, **metrics}
+
+
+def run_sweep(close, strategy: str, grid: dict, indicators: Optional[Indicators] = None) -> dict:
+    """Metrics for every parameter combination; the SMAs / RSIs come from the indicator cache."""
+    if strategy == "sma_crossover":
+        return sma_grid(close, grid.get("short_window", [20]), grid.get("long_window", [50]), indicators)
+    if strategy in ("rsi", "rsi_strategy"):
+        return rsi_grid(close, grid.get("period", [14]), grid.get("overbought", [70]), grid.get("oversold", [30]),
+                        indicators)
+    raise ValueError(f"Strategy '{strategy}' has no parameters to sweep")
+
+
+def rank(table: dict, sort_by: str = "total_return", limit=None) -> list:
+    """The best ``limit`` rows (all of them for None), best first (for max_drawdown, the shallowest drawdown)."""
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be at least 1")
+    key = np.nan_to_num(table[sort_by], nan=-np.inf)
+    order = np.argsort(-key, kind="stable")
+    if limit is not None:
+        order = order[:limit]
+    columns = {k: np.round(v[order], 4).tolist() if v.dtype.kind == "f" else v[order].tolist()
+               for k, v in table.items()}
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
@@ -0,0 +1,218 @@
+import json
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models import models
+from app.service import metrics
+from app.service.engine import EngineState
+from app.service.ledger import empty_ledger, extend_ledger, ledger_columns, ledger_records, trade_ledger
+from app.service.market_data import aget_history
+from app.service.result_cache import key_digest, prune_runs, result_cache, result_digest
+
+EMPTY = {
+    "summary": {"total_return": 0.0, "win_rate": 0.0, "max_drawdown": 0.0},
+    "equity_curve": [],
+    "trades": [],
+}
+
+
+def run_key(symbol: str, req) -> str:
+    return json.dumps({
+        "symbol": symbol,
+        "strategy": req.strategy,
+        "params": req.params,
+        "start_date": req.start_date,
+        "commission": req.commission,
+        "slippage": req.slippage,
+    }, sort_keys=True)
+
+
+def _stored_run(db: Session, key: str, through):
+    """The latest stored run of ``key`` ending no later than ``through``: the one to resume from."""
+    return (
+        db.query(models.BacktestResult)
+        .filter(models.BacktestResult.strategy_id.is_(None))
+        .filter(models.BacktestResult.run_key == key_digest(key))
+        .filter(models.BacktestResult.end_date <= through)
+        .order_by(models.BacktestResult.end_date.desc(), models.BacktestResult.id.desc())
+        .first()
+    )
+
+
+def _stored_digest(db: Session, digest: str):
+    return (
+        db.query(models.BacktestResult)
+        .filter(models.BacktestResult.strategy_id.is_(None))
+        .filter(models.BacktestResult.digest == digest)
+        .order_by(models.BacktestResult.id.desc())
+        .first()
+    )
+
+
+def _resume_at(history, checkpoint) -> int:
+    """Index of the first bar the checkpoint has not seen, or 0 to start over.
+
+    Every bar up to the checkpointed one must still be there unchanged (by
+    the fingerprint of that prefix); otherwise — a shorter range, a partial
+    day since completed, or history adjusted for a split — recompute.
+    """
+    last = np.datetime64(checkpoint["last_date"], "D")
+    i = int(np.searchsorted(history.dates, last))
+    if i == len(history) or history.dates[i] != last:
+        return 0
+    if history.slice(None, last).fingerprint() != checkpoint.get("prices"):
+        return 0
+    return i + 1
+
+
+def _percent(x):
+    return None if x is None else round(x * 100, 2)
+
+
+def _curve(dates, values, columnar: bool):
+    if columnar:
+        return {"date": dates, "value": values}
+    return [{"date": d, "value": v} for d, v in zip(dates, values)]
+
+
+def _served(payload: dict, columnar: bool) -> dict:
+    # cached responses keep the curve as columns; the row form is built per request
+    curve = payload["equity_curve"]
+    return {**payload, "equity_curve": _curve(curve["date"], curve["value"], columnar)}
+
+
+async def load_symbol_history(symbol: str, req):
+    """The request's prices (from the shared price cache), or None when the fetch fails."""
+    try:
+        return await aget_history(symbol, req.start_date, req.end_date)
+    except Exception as e:
+        print(f"⚠️ Failed to fetch {symbol}: {e}")
+        return None
+
+
+def run_symbol_backtest(db: Session, symbol: str, req, history, columnar: bool = False) -> dict:
+    """Single-symbol backtest behind POST /backtest/{symbol}, over ``history`` from load_symbol_history.
+
+    Every run is stored as a new BacktestResult with its engine checkpoint,
+    so pushing ``end_date`` forward only simulates the bars after the latest
+    earlier run and stores them with its curve; earlier rows (and the ids
+    already handed out for them) are never rewritten, and only the newest
+    STORED_RUNS_PER_KEY of them are kept.
+    ``columnar`` returns the equity curve as ``{"date": [...], "value": [...]}``
+    for the streaming formats instead of one dict per bar. A repeat of a run
+    over the same bars (by their fingerprint) is served from the result
+    cache or the stored run.
+    """
+    print(f"🔹 Running backtest for: {symbol}")
+
+    # --- Validate Data ---
+    if history is None:
+        return {**EMPTY, "equity_curve": _curve([], [], columnar)}
+    if len(history) == 0:
+        print("⚠️ Empty or invalid data for", symbol)
+        return {**EMPTY, "equity_curve": _curve([], [], columnar)}
+
+    # --- Same request over the same bars: reuse the result ---
+    digest = result_digest(
+        "symbol",
+        symbol=symbol,
+        strategy=req.strategy,
+        params=req.params,
+        start_date=req.start_date,
+        end_date=req.end_date,
+        commission=req.commission,
+        slippage=req.slippage,
+        prices=history.fingerprint(),
+    )
+    cached = result_cache.get(digest)
+    if cached is None:
+        stored = _stored_digest(db, digest)
+        if stored is not None:
+            cached = {
+                "summary": stored.performance_metrics,
+                "equity_curve": {"date": stored.equity_curve["dates"], "value": stored.equity_curve["values"]},
+                "trades": ledger_records(stored.logs["trades"]),
+            }
+            result_cache.put(digest, cached, stored.logs.get("compute_seconds", 0.0), stored=True)
+    if cached is not None:
+        print(f"♻️ Reusing backtest for {symbol}")
+        return _served(cached, columnar)
+    started = time.perf_counter()
+
+    # --- Resume from the stored checkpoint when the range only grew ---
+    key = run_key(symbol, req)
+    previous = _stored_run(db, key, history.dates[-1].astype(object))
+    checkpoint = (previous.logs or {}).get("checkpoint") if previous else None
+    start = _resume_at(history, checkpoint) if checkpoint else 0
+    if start:
+        state = EngineState.from_dict(checkpoint["state"])
+        open_trade = checkpoint["open_trade"]
+        dates = list(previous.equity_curve["dates"])
+        values = list(previous.equity_curve["values"])
+        ledger = previous.logs["trades"]
+    else:
+        state = EngineState(req.strategy, req.params)
+        open_trade, dates, values, ledger = None, [], [], empty_ledger()
+
+    # --- STRATEGY + RETURNS (new bars only) ---
+    new_dates = history.dates[start:]
+    new_close = history.close[start:]
+    prev_signal = state.last_signal
+    step = state.advance(new_close)
+    signal = step.signal[:, 0]
+
+    # --- TRADES (ledger of long/short positions, from the signal array) ---
+    closed, open_trade = trade_ledger(
+        new_dates, new_close, signal, prev_signal, open_trade,
+        first_bar=len(dates), commission=req.commission, slippage=req.slippage,
+    )
+    ledger = extend_ledger(ledger, ledger_columns(closed))
+    trades = ledger_records(ledger)
+
+    # --- EQUITY CURVE ---
+    dates.extend(str(d) for d in new_dates.astype(object))
+    values.extend(step.equity[:, 0].tolist())
+
+    # --- METRICS ---
+    # win_rate counts bars with a strategy return, which the equity curve alone no longer shows; the
+    # checkpointed state keeps those counts across resumes
+    stats = metrics.scalar_metrics(metrics.compute(np.asarray(values, dtype=np.float64), base=state.base))
+    performance = {
+        "total_return": _percent(stats["total_return"]),
+        "win_rate": round(float(state.summary()["win_rate"]), 2),
+        "max_drawdown": _percent(stats["max_drawdown"]),
+    }
+
+    elapsed = time.perf_counter() - started
+
+    # --- Persist as a new run; the one resumed from stays as it was, the oldest of the key go ---
+    db.add(models.BacktestResult(
+        strategy_id=None,
+        start_date=history.dates[0].astype(object),
+        end_date=history.dates[-1].astype(object),
+        equity_curve={"dates": dates, "values": values},
+        performance_metrics=performance,
+        logs={
+            "key": key,
+            "symbol": symbol,
+            "trades": ledger,
+            "checkpoint": {"last_date": dates[-1], "prices": history.fingerprint(), "state": state.to_dict(),
+                           "open_trade": open_trade},
+            "compute_seconds": round(elapsed, 4),
+        },
+        created_at=datetime.now(),
+        digest=digest,
+        run_key=key_digest(key),
+    ))
+    db.commit()
+    prune_runs(db, key_digest(key))
+
+    print(f"✅ Backtest complete for {symbol} — {len(trades)} trades executed"
+          f" ({len(new_close)} new bars)")
+
+    payload = {"summary": performance, "equity_curve": {"date": dates, "value": values}, "trades": trades}
+    result_cache.put(digest, payload, elapsed)
+    return _served(payload, columnar)
@@ -0,0 +1,126 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+import httpx
+
+from app.core import config, telemetry
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+
+
+class Upstream:
+    """Shared async client for every outbound call the API makes.
+
+    One pooled ``httpx.AsyncClient`` keeps connections alive across requests,
+    each host gets at most ``per_host`` calls in flight, and concurrent calls
+    with the same key share one in-flight request instead of repeating it.
+    Blocking SDK calls (yfinance) go through ``run`` under the same limits.
+    """
+
+    def __init__(self, timeout: float, max_connections: int, per_host: int):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self._loop = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    def _bind(self):
+        # semaphores, futures and the client belong to one event loop
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._client = None
+            self._limits = {}
+            self._inflight = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        self._bind()
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                headers={"User-Agent": USER_AGENT},
+                follow_redirects=True,
+            )
+        return self._client
+
+    def _limit(self, host: str) -> asyncio.Semaphore:
+        self._bind()
+        limit = self._limits.get(host)
+        if limit is None:
+            limit = self._limits[host] = asyncio.Semaphore(self.per_host)
+        return limit
+
+    async def coalesce(self, key: Hashable, make: Callable[[], Awaitable]):
+        """Await ``make()``; concurrent callers with the same ``key`` share the one call."""
+        self._bind()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(make())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shielded: one caller going away must not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> httpx.Response:
+        key = ("GET", url, tuple(sorted((params or {}).items())))
+
+        async def fetch():
+            host = httpx.URL(url).host
+            async with self._limit(host):
+                self.requests += 1
+                with telemetry.upstream_call(host, "http"):
+                    return await self.client.get(url, params=params, headers=headers)
+
+        return await self.coalesce(key, fetch)
+
+    async def run(self, host: str, key: Hashable, fn: Callable):
+        """A blocking upstream call in a worker thread, under ``host``'s limit and coalesced on ``key``."""
+
+        async def call():
+            async with self._limit(host):
+                self.requests += 1
+                with telemetry.upstream_call(host, key[0] if isinstance(key, tuple) else "call"):
+                    return await asyncio.to_thread(fn)
+
+        return await self.coalesce(key, call)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "per_host": self.per_host,
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+upstream = Upstream(
+    timeout=config.UPSTREAM_TIMEOUT,
+    max_connections=config.UPSTREAM_MAX_CONNECTIONS,
+    per_host=config.UPSTREAM_PER_HOST,
+)
+
+
+@telemetry.collector
+def _upstream_samples():
+    stats = upstream.stats()
+    return (
+        telemetry.samples("upstream_requests_total", "counter", "Calls the shared client sent upstream.",
+                          [({}, stats["requests"])])
+        + telemetry.samples("upstream_coalesced_total", "counter", "Calls answered by joining one already in flight.",
+                            [({}, stats["coalesced"])])
+        + telemetry.samples("upstream_in_flight", "gauge", "Distinct calls in flight.", [({}, stats["in_flight"])])
+    )
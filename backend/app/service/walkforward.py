@@ -0,0 +1,188 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.models import models
+from app.service import engine, metrics
+from app.service.batch import SharedArray, attach, default_workers
+from app.service.indicators import Indicators
+from app.service.sweep import SORT_KEYS, param_values, run_sweep
+
+MODES = ("rolling", "anchored")
+
+
+def folds(n: int, train: int, test: int, mode: str = "rolling") -> List[tuple]:
+    """(train_lo, train_hi, test_lo, test_hi) bar ranges over ``n`` bars, test windows back to back.
+
+    ``rolling`` slides a ``train``-bar window forward ``test`` bars at a
+    time; ``anchored`` keeps every train window starting at bar 0 and grows
+    it instead. The last test window may be shorter.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}'; expected one of {', '.join(MODES)}")
+    if train < 2 or test < 1:
+        raise ValueError("train must be at least 2 bars and test at least 1")
+    out = []
+    for test_lo in range(train, n, test):
+        train_lo = 0 if mode == "anchored" else test_lo - train
+        out.append((train_lo, test_lo, test_lo, min(test_lo + test, n)))
+    return out
+
+
+def _param(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def evaluate_fold(close: np.ndarray, bounds: tuple, strategy: str, grid: dict, sort_by: str,
+                  symbol: str = "") -> dict:
+    """Optimize on the fold's train bars with the batched sweep, then trade the winner on its test bars."""
+    train_lo, train_hi, test_lo, test_hi = bounds
+    train = close[train_lo:train_hi]
+    table = run_sweep(train, strategy, grid, Indicators(train, symbol=symbol))
+    params = {k: v for k, v in table.items() if k not in SORT_KEYS}
+    if not len(table[sort_by]):
+        raise ValueError("The parameter grid has no valid combinations")
+    best = int(np.argmax(np.nan_to_num(table[sort_by], nan=-np.inf)))
+    chosen = {k: _param(v[best]) for k, v in params.items()}
+
+    # signals over train + test, so indicators are warm and the last train bar's signal carries into the test
+    window = close[train_lo:test_hi]
+    result = engine.run_strategy(window, strategy, chosen, indicators=Indicators(window, symbol=symbol))
+    returns = result.strategy_return[test_lo - train_lo:, 0]
+    return {
+        "bounds": bounds,
+        "params": chosen,
+        "in_sample": {k: float(table[k][best]) for k in SORT_KEYS},
+        "combinations": len(table[sort_by]),
+        "returns": returns,
+    }
+
+
+def _fold_job(spec, bounds, strategy, grid, sort_by, symbol):
+    # the close series is attached from shared memory, never pickled per fold
+    return evaluate_fold(attach(spec), bounds, strategy, grid, sort_by, symbol)
+
+
+def walk_forward(close, strategy: str, grid: dict, train: int, test: int, mode: str = "rolling",
+                 sort_by: str = "total_return", workers: Optional[int] = None, symbol: str = "") -> List[dict]:
+    """Every fold's chosen parameters and out-of-sample strategy returns, in date order.
+
+    ``workers=0`` runs the folds inline; otherwise they run on a process
+    pool (at most WALKFORWARD_MAX_WORKERS) that reads the closes from one
+    shared-memory block.
+    """
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"sort_by must be one of {', '.join(SORT_KEYS)}")
+    close = np.ascontiguousarray(close, dtype=np.float64).ravel()
+    bounds = folds(len(close), train, test, mode)
+    if not bounds:
+        raise ValueError(f"Need more than {train} bars for a {train}-bar train window")
+    workers = min(default_workers() if workers is None else workers, config.WALKFORWARD_MAX_WORKERS)
+    if workers == 0 or len(bounds) == 1:
+        return [evaluate_fold(close, b, strategy, grid, sort_by, symbol) for b in bounds]
+    with SharedArray(close) as shared, ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as pool:
+        futures = [pool.submit(_fold_job, shared.spec, b, strategy, grid, sort_by, symbol) for b in bounds]
+        return [f.result() for f in futures]
+
+
+def stitch(fold_results: List[dict], base: float = 100.0) -> np.ndarray:
+    """One equity curve from the folds' out-of-sample returns, compounded from ``base``."""
+    returns = np.concatenate([f["returns"] for f in fold_results])
+    return np.cumprod(1 + np.nan_to_num(returns), axis=0) * base
+
+
+def _percent(x):
+    return None if x is None else round(x * 100, 2)
+
+
+def run_walk_forward(db: Session, symbol: str, req, history) -> dict:
+    """Walk-forward optimization behind POST /backtest/walkforward, stored as a BacktestResult.
+
+    The stored equity curve is the stitched out-of-sample one, so
+    rolling_metrics and montecarlo work on it like on any other backtest;
+    ``logs["folds"]`` holds each fold's dates, chosen parameters and in- and
+    out-of-sample results.
+    """
+    started = time.perf_counter()
+    grid = {name: param_values(spec) for name, spec in req.params.items()}
+    fold_results = walk_forward(history.close, req.strategy, grid, req.train_days, req.test_days, req.mode,
+                                req.sort_by, req.workers, symbol.upper())
+    equity = stitch(fold_results)
+    first = fold_results[0]["bounds"][2]
+    dates = history.dates[first:first + len(equity)]
+
+    logs, value = [], 100.0
+    for i, f in enumerate(fold_results):
+        train_lo, train_hi, test_lo, test_hi = f["bounds"]
+        # each fold's test window, compounded from where the previous one ended
+        curve = np.concatenate(([value], equity[test_lo - first:test_hi - first]))
+        oos = metrics.scalar_metrics(metrics.compute(curve))
+        value = float(equity[test_hi - first - 1])
+        logs.append({
+            "fold": i + 1,
+            "train_start": str(history.dates[train_lo]),
+            "train_end": str(history.dates[train_hi - 1]),
+            "test_start": str(history.dates[test_lo]),
+            "test_end": str(history.dates[test_hi - 1]),
+            "params": f["params"],
+            "combinations": f["combinations"],
+            "in_sample": {k: round(v, 2) if np.isfinite(v) else None for k, v in f["in_sample"].items()},
+            "out_of_sample": {
+                "total_return": _percent(oos["total_return"]),
+                "max_drawdown": _percent(oos["max_drawdown"]),
+                "sharpe": oos["sharpe"],
+            },
+        })
+
+    stats = metrics.scalar_metrics(metrics.compute(np.concatenate(([100.0], equity))))
+    performance = {
+        "total_return": _percent(stats["total_return"]),
+        "cagr": _percent(stats["cagr"]),
+        "volatility": _percent(stats["volatility"]),
+        "sharpe": stats["sharpe"],
+        "sortino": stats["sortino"],
+        "max_drawdown": _percent(stats["max_drawdown"]),
+        "calmar": stats["calmar"],
+        "hit_rate": _percent(stats["hit_rate"]),
+    }
+    elapsed = time.perf_counter() - started
+
+    result = models.BacktestResult(
+        strategy_id=None,
+        start_date=dates[0].astype(object),
+        end_date=dates[-1].astype(object),
+        equity_curve={"dates": [str(d) for d in dates.astype(object)], "values": equity.tolist()},
+        performance_metrics=performance,
+        logs={
+            "kind": "walk_forward",
+            "symbol": symbol.upper(),
+            "strategy": req.strategy,
+            "grid": {k: np.asarray(v).tolist() for k, v in grid.items()},
+            "mode": req.mode,
+            "train_days": req.train_days,
+            "test_days": req.test_days,
+            "sort_by": req.sort_by,
+            "folds": logs,
+            "compute_seconds": round(elapsed, 4),
+        },
+        created_at=datetime.now(),
+    )
+    db.add(result)
+    db.commit()
+    print(f"✅ Walk-forward complete for {symbol} — {len(logs)} folds in {elapsed:.2f}s")
+
+    return {
+        "backtest_id": result.id,
+        "symbol": symbol.upper(),
+        "strategy": req.strategy,
+        "mode": req.mode,
+        "summary": performance,
+        "folds": logs,
+        "equity_curve": result.equity_curve,
+    }
@@ -0,0 +1,48 @@
+# Speedup of app.service.batch.run_batch at 1, 2, 4 and 8 worker processes.
+#
+#   cd backend && python -m benchmarks.bench_batch
+#
+# Prices are synthetic (BENCH_SYMBOLS × BENCH_DAYS) and shared with workers
+# through one shared-memory block. Scaling is bounded by os.cpu_count().
+import os
+import time
+
+import numpy as np
+
+from app.service.batch import run_batch
+
+N_SYMBOLS = int(os.getenv("BENCH_SYMBOLS", 500))
+N_DAYS = int(os.getenv("BENCH_DAYS", 5000))  # ~20 years
+WORKERS = [1, 2, 4, 8]
+
+STRATEGIES = [
+    ("sma_crossover", {"short_window": 10, "long_window": 50}),
+    ("sma_crossover", {"short_window": 20, "long_window": 100}),
+    ("sma_crossover", {"short_window": 50, "long_window": 200}),
+    ("rsi", {"period": 14}),
+    ("rsi", {"period": 21, "overbought": 75, "oversold": 25}),
+    ("buy_hold", {}),
+]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.018, (N_DAYS, N_SYMBOLS)), axis=0)
+    symbols = [f"SYM{i}" for i in range(N_SYMBOLS)]
+    jobs = N_SYMBOLS * len(STRATEGIES)
+
+    print(f"{N_SYMBOLS} symbols × {N_DAYS} bars × {len(STRATEGIES)} strategies = {jobs} backtests, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>9} {'backtests/s':>12} {'speedup':>8}")
+    baseline = None
+    for workers in WORKERS:
+        t0 = time.perf_counter()
+        rows = sum(1 for _ in run_batch(close, symbols, STRATEGIES, workers))
+        elapsed = time.perf_counter() - t0
+        assert rows == jobs
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {jobs / elapsed:>12.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
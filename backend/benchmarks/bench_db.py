@@ -0,0 +1,214 @@
+# Database layer under load, against a local Postgres: DATABASE_URL if set,
+# else a throwaway server from the pgserver package. Seeds 100 companies x
+# 10 years of daily prices plus fundamentals, then measures
+#   - CONCURRENCY threads running backtest-shaped work (stream a price
+#     matrix, simulate, store a result) while others hit /companies/, on
+#     SQLAlchemy's default pool (5 + 10 overflow) vs core.db.make_engine;
+#   - /companies/ and /fundamentals/{id} through an ORM session vs the Core
+#     read path (get_read_conn), same rows;
+#   - a full price scan buffered with .all() through the session vs
+#     load_price_matrix streaming it through the server-side cursor: time and
+#     peak Python allocations.
+#
+#   cd backend && python -m benchmarks.bench_db
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+if not os.getenv("DATABASE_URL"):
+    import pgserver
+
+    _server = pgserver.get_server(tempfile.mkdtemp(prefix="bench_db_"), cleanup_mode="delete")
+    os.environ["DATABASE_URL"] = _server.get_uri()
+
+from sqlalchemy import Float, cast, create_engine, delete, insert, select, text  # noqa: E402
+from sqlalchemy.exc import TimeoutError as PoolTimeout  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core import config  # noqa: E402
+from app.core.db import make_engine  # noqa: E402
+from app.models import models  # noqa: E402
+from app.service import engine as sim  # noqa: E402
+from app.service.ingest import _copy_prices  # noqa: E402
+from app.service.price_matrix import load_price_matrix  # noqa: E402
+
+N_COMPANIES = 100
+N_DAYS = 2520
+CONCURRENCY = 32
+BACKTESTS = 96
+REPEAT = 200
+
+
+def seed(db_engine):
+    models.Base.metadata.drop_all(db_engine)
+    models.Base.metadata.create_all(db_engine)
+    rng = np.random.default_rng(4)
+    days = np.datetime64("2014-01-01") + np.arange(N_DAYS)
+    ids = np.repeat(np.arange(1, N_COMPANIES + 1), N_DAYS)
+    close = (100 * np.cumprod(1 + rng.normal(0.0003, 0.015, (N_COMPANIES, N_DAYS)), axis=1)).ravel().round(4)
+    prices = pd.DataFrame({"company_id": ids, "date": np.tile(days, N_COMPANIES), "open": close, "high": close,
+                           "low": close, "close": close, "volume": 1000})
+    with sessionmaker(bind=db_engine)() as db:
+        db.execute(insert(models.Company), [
+            {"id": i, "symbol": f"SYM{i}.NS", "name": f"Company {i}", "market_cap": int(rng.integers(1e9, 1e12)),
+             "sector": "x"} for i in range(1, N_COMPANIES + 1)])
+        _copy_prices(db, prices)
+        db.execute(insert(models.Fundamental), [
+            {"company_id": cid, "date": date(2014 + y, 3, 31), "metric": m, "value": float(rng.normal(10, 3))}
+            for cid in range(1, N_COMPANIES + 1) for y in range(10)
+            for m in ("pe", "pb", "roe", "debt_equity", "eps", "revenue", "margin", "div")])
+        db.execute(insert(models.Strategy), [{"id": 1, "name": "sma", "parameters": {}}])
+        db.commit()
+        db.execute(text("ANALYZE"))
+
+
+def backtest(session_factory, rng):
+    """A /run-shaped request: read a price matrix, simulate, write the result."""
+    ids = rng.sample(range(1, N_COMPANIES + 1), 20)
+    with session_factory() as db:
+        matrix = load_price_matrix(db, ids)
+        equity = sim.run_strategy(matrix.close, "sma_crossover", {"short_window": 20, "long_window": 50})
+        db.add(models.BacktestResult(strategy_id=1, start_date=date(2014, 1, 1), end_date=date(2020, 12, 31),
+                                     performance_metrics={"n": int(equity.summary()["total_return"].size)},
+                                     created_at=datetime.now()))
+        db.commit()
+
+
+def list_orm(session_factory):
+    with session_factory() as db:
+        return [{c: getattr(row, c) for c in ("id", "symbol", "name", "market_cap", "sector")}
+                for row in db.query(models.Company).all()]
+
+
+def list_core(db_engine):
+    with db_engine.connect() as conn:
+        return [dict(row) for row in conn.execute(select(models.Company.__table__)).mappings()]
+
+
+def fundamentals_orm(session_factory, cid):
+    with session_factory() as db:
+        return [{c: getattr(row, c) for c in ("id", "company_id", "date", "metric", "value")}
+                for row in db.query(models.Fundamental).filter_by(company_id=cid).all()]
+
+
+def fundamentals_core(db_engine, cid):
+    table = models.Fundamental.__table__
+    with db_engine.connect() as conn:
+        return [dict(row) for row in conn.execute(select(table).where(table.c.company_id == cid)).mappings()]
+
+
+def load_run(db_engine):
+    factory = sessionmaker(bind=db_engine, autoflush=False)
+    with db_engine.begin() as conn:
+        conn.execute(delete(models.BacktestResult))
+    latencies, reads, timeouts, stop = [], [], [], threading.Event()
+
+    def one(i):
+        t0 = time.perf_counter()
+        try:
+            backtest(factory, random.Random(i))
+        except PoolTimeout:
+            timeouts.append(i)
+            return
+        latencies.append(time.perf_counter() - t0)
+
+    def reader():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                list_core(db_engine)
+            except PoolTimeout:
+                timeouts.append(None)
+                continue
+            reads.append(time.perf_counter() - t0)
+
+    readers = [threading.Thread(target=reader) for _ in range(4)]
+    for t in readers:
+        t.start()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        list(pool.map(one, range(BACKTESTS)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for t in readers:
+        t.join()
+    db_engine.dispose()
+    p95 = np.percentile(latencies, 95) if latencies else float("nan")
+    return elapsed, p95, np.percentile(reads, 95) if reads else float("nan"), len(timeouts)
+
+
+def timed(fn, *args):
+    fn(*args)
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        fn(*args)
+    return (time.perf_counter() - t0) / REPEAT
+
+
+def scan_buffered(db_engine):
+    """How the scan read before: every row fetched at once, through the ORM session."""
+    with sessionmaker(bind=db_engine)() as db:
+        stmt = select(models.Price.date, models.Price.company_id, cast(models.Price.close, Float))
+        rows = db.execute(stmt).all()
+        d, c, v = zip(*rows)
+        return np.array(d, dtype="datetime64[D]").size
+
+
+def scan_streamed(db_engine):
+    with sessionmaker(bind=db_engine)() as db:
+        return load_price_matrix(db, range(1, N_COMPANIES + 1), fill=False).close.size
+
+
+def peak(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(*args)
+    top = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, top
+
+
+def main():
+    tuned = make_engine(config.DATABASE_URL)
+    seed(tuned)
+    print(f"seeded {N_COMPANIES} companies x {N_DAYS} days on {tuned.dialect.name} "
+          f"{tuned.dialect.server_version_info}")
+
+    a, b = list_orm(sessionmaker(bind=tuned)), list_core(tuned)
+    assert a == b
+    assert fundamentals_orm(sessionmaker(bind=tuned), 7) == fundamentals_core(tuned, 7)
+    print("parity: the Core read path returns the ORM's rows\n")
+
+    print(f"{BACKTESTS} backtests on {CONCURRENCY} threads + 4 /companies/ readers")
+    print(f"{'pool':<34} {'s':>6} {'p95 backtest ms':>16} {'p95 read ms':>12} {'pool timeouts':>14}")
+    default = create_engine(config.DATABASE_URL)
+    for name, db_engine in (("default (5 + 10 overflow)", default),
+                            (f"tuned ({config.DB_POOL_SIZE} + {config.DB_MAX_OVERFLOW}, pre-ping)", tuned)):
+        elapsed, p95, read95, timeouts = load_run(db_engine)
+        print(f"{name:<34} {elapsed:>6.2f} {p95 * 1e3:>16.0f} {read95 * 1e3:>12.1f} {timeouts:>14}", flush=True)
+
+    factory = sessionmaker(bind=tuned)
+    print(f"\n{'read path':<28} {'ORM ms':>8} {'Core ms':>8}")
+    orm, core = timed(list_orm, factory), timed(list_core, tuned)
+    print(f"{'/companies/ (100 rows)':<28} {orm * 1e3:>8.2f} {core * 1e3:>8.2f}  ({orm / core:.1f}x)")
+    orm, core = timed(fundamentals_orm, factory, 7), timed(fundamentals_core, tuned, 7)
+    print(f"{'/fundamentals/7 (80 rows)':<28} {orm * 1e3:>8.2f} {core * 1e3:>8.2f}  ({orm / core:.1f}x)")
+
+    print(f"\nfull price scan ({N_COMPANIES * N_DAYS} rows)")
+    for name, fn in (("buffered .all()", scan_buffered), ("server-side cursor", scan_streamed)):
+        elapsed, top = peak(fn, tuned)
+        print(f"{name:<28} {elapsed * 1e3:>8.0f} ms  peak {top / 2**20:>6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Response encoding for /backtest/{symbol} and /prices/{symbol}: the default
+# path (a dict per bar, validated through the Pydantic response model, then
+# jsonable_encoder + json.dumps as FastAPI does) against the columnar JSON,
+# NDJSON and Arrow IPC bodies from app.service.encoding. Each format must
+# decode to the same series; time and peak Python allocations (tracemalloc)
+# are shown. A second table sizes a /run result for 100 companies over
+# 10 years of daily rebalancing: body size and encode + decode time.
+#
+#   cd backend && python -m benchmarks.bench_encoding
+import json
+import time
+import tracemalloc
+
+import numpy as np
+import pyarrow as pa
+from fastapi.encoders import jsonable_encoder
+
+from app.schemas.schemas import BacktestResponse
+from app.service.encoding import arrow_ipc, columnar_json, ndjson_lines
+
+BARS = (1250, 5000, 50000)  # 5 years, 20 years, a 10-symbol concatenation
+REPEAT = 3
+SUMMARY = {"total_return": 12.3, "win_rate": 55.0, "max_drawdown": -20.1}
+
+
+def series(n, seed=5):
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64("1990-01-01") + np.arange(n)
+    equity = 100 * np.cumprod(1 + rng.normal(0.0003, 0.01, n))
+    return np.datetime_as_string(dates, unit="D").tolist(), equity.tolist()
+
+
+def default_body(dates, values):
+    payload = {"summary": SUMMARY, "trades": [],
+               "equity_curve": [{"date": d, "value": v} for d, v in zip(dates, values)]}
+    model = BacktestResponse.model_validate(payload)
+    return json.dumps(jsonable_encoder(model))
+
+
+def columnar_body(dates, values):
+    fields = {"summary": SUMMARY, "trades": []}
+    return "".join(columnar_json(fields, "equity_curve", {"date": dates, "value": values}))
+
+
+def ndjson_body(dates, values):
+    fields = {"summary": SUMMARY, "trades": []}
+    return "".join(ndjson_lines(fields, {"date": dates, "value": values}))
+
+
+def arrow_body(dates, values):
+    fields = {"summary": SUMMARY, "trades": []}
+    return arrow_ipc(fields, {"date": dates, "value": values})
+
+
+def check_parity(dates, values):
+    expected = json.loads(default_body(dates, values))["equity_curve"]
+    columnar = json.loads(columnar_body(dates, values))["equity_curve"]
+    assert [{"date": d, "value": v} for d, v in zip(columnar["date"], columnar["value"])] == expected
+    lines = ndjson_body(dates, values).splitlines()
+    assert [json.loads(line) for line in lines[1:]] == expected
+    assert json.loads(lines[0])["summary"] == SUMMARY
+    table = pa.ipc.open_stream(arrow_body(dates, values)).read_all()
+    assert [{"date": str(d), "value": v} for d, v in zip(*table.to_pydict().values())] == expected
+    assert json.loads(table.schema.metadata[b"fields"])["summary"] == SUMMARY
+
+
+def run_result(n_days=2520, n_companies=100, seed=9):
+    """A /run response shaped like service.portfolio's: daily periods, dense weights."""
+    rng = np.random.default_rng(seed)
+    dates = np.datetime_as_string(np.datetime64("2014-01-01") + np.arange(n_days), unit="D").tolist()
+    weights = rng.dirichlet(np.ones(n_companies), n_days)
+    capital = 100_000 * np.cumprod(1 + rng.normal(0.0003, 0.01, n_days))
+    return {
+        "metrics": {"CAGR": 8.1, "Sharpe": 0.9},
+        "equity_curve": [{"date": d, "capital": round(c, 2)} for d, c in zip(dates, capital.tolist())],
+        "allocation_history": {"dates": dates, "company_ids": list(range(1, n_companies + 1)),
+                               "weights": np.round(weights, 6).tolist()},
+    }
+
+
+def run_columns(result):
+    """As the /run endpoint lays out non-JSON formats: capital plus a weight column per company."""
+    allocations = result["allocation_history"]
+    weights = np.asarray(allocations["weights"], dtype=np.float32)
+    columns = {"date": allocations["dates"], "capital": [p["capital"] for p in result["equity_curve"]]}
+    columns.update(zip((f"weight_{c}" for c in allocations["company_ids"]), np.ascontiguousarray(weights.T)))
+    return columns
+
+
+def measure(fn, *args):
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    check_parity(*series(3000))
+    print("parity: columnar, ndjson and arrow decode to the default equity curve\n")
+
+    print(f"{'bars':>7} {'format':>9} {'ms':>9} {'peak MB':>9}")
+    for n in BARS:
+        dates, values = series(n)
+        for name, fn in (("json", default_body), ("columnar", columnar_body), ("ndjson", ndjson_body),
+                         ("arrow", arrow_body)):
+            elapsed, peak = measure(fn, dates, values)
+            print(f"{n:>7} {name:>9} {elapsed * 1e3:>9.1f} {peak / 2**20:>9.2f}")
+
+    result = run_result()
+    columns = run_columns(result)
+    cases = (
+        ("json", lambda: json.dumps(result), json.loads),
+        ("arrow", lambda: arrow_ipc(result["metrics"], columns),
+         lambda body: pa.ipc.open_stream(body).read_all()),
+    )
+    print("\n/run, 100 companies x 2520 daily rebalances")
+    print(f"{'format':>9} {'MB':>7} {'encode ms':>10} {'decode ms':>10}")
+    for name, encode, decode in cases:
+        body = encode()
+        size = len(body) if isinstance(body, str) else body.size
+        enc, _ = measure(encode)
+        dec, _ = measure(decode, body)
+        print(f"{name:>9} {size / 2**20:>7.2f} {enc * 1e3:>10.1f} {dec * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Runs every strategy over a synthetic NIFTY-100 sized universe twice: once
+# symbol by symbol through the pandas functions in app.service.backtest, once
+# through the batched engine in app.service.engine, and checks they agree.
+#
+#   cd backend && python -m benchmarks.bench_engine
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.service import engine
+from app.service.backtest import buy_hold, compute_drawdown, rsi_strategy, sma_crossover
+
+N_SYMBOLS = 100
+N_DAYS = 2500  # ~10 years
+
+CASES = [
+    ("sma_crossover", {"short_window": 20, "long_window": 50}, lambda df: sma_crossover(df, 20, 50)),
+    ("rsi", {"period": 14}, lambda df: rsi_strategy(df, 14)),
+    ("buy_hold", {}, buy_hold),
+]
+
+
+def synthetic_universe(seed=42):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.018, (N_DAYS, N_SYMBOLS)), axis=0)
+    # late listings and a flat stretch (exact SMA ties) to exercise the edge cases
+    for j in range(0, N_SYMBOLS, 9):
+        close[: rng.integers(50, 600), j] = np.nan
+    close[1000:1100, 3] = close[999, 3]
+    return close
+
+
+def pandas_loop(close, fn):
+    totals, wins, drawdowns, equities, signals = [], [], [], [], []
+    for j in range(close.shape[1]):
+        df = fn(pd.DataFrame({"Close": close[:, j]}))
+        df["daily_return"] = df["Close"].pct_change()
+        df["strategy_return"] = df["signal"].shift(1) * df["daily_return"]
+        df["equity"] = (1 + df["strategy_return"].fillna(0)).cumprod() * 100
+        totals.append(df["equity"].iloc[-1] - 100)
+        wins.append((df["strategy_return"] > 0).sum() / df["strategy_return"].count() * 100)
+        drawdowns.append(compute_drawdown(df["equity"]))
+        equities.append(df["equity"].to_numpy())
+        signals.append(df["signal"].to_numpy())
+    return np.array(totals), np.array(wins), np.array(drawdowns), np.column_stack(equities), np.column_stack(signals)
+
+
+def main():
+    close = synthetic_universe()
+    print(f"{N_SYMBOLS} symbols × {N_DAYS} bars")
+    print(f"{'strategy':>14} {'pandas s':>10} {'engine s':>10} {'speedup':>8}  parity")
+    for name, params, fn in CASES:
+        t0 = time.perf_counter()
+        totals, wins, drawdowns, equity, signal = pandas_loop(close, fn)
+        t_pandas = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        result = engine.run_strategy(close, name, params)
+        summary = result.summary()
+        t_engine = time.perf_counter() - t0
+
+        assert np.array_equal(np.broadcast_to(result.signal, signal.shape), signal), name
+        assert np.allclose(result.equity, equity, rtol=1e-9), name
+        assert np.allclose(summary["total_return"], totals, rtol=1e-9), name
+        assert np.allclose(summary["win_rate"], wins, rtol=1e-12), name
+        assert np.allclose(summary["max_drawdown"], drawdowns, rtol=1e-9), name
+        print(f"{name:>14} {t_pandas:>10.3f} {t_engine:>10.4f} {t_pandas / t_engine:>7.0f}x  ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Extending a single-symbol backtest by a few bars: a full recompute with
+# engine.run_strategy against EngineState.advance over only the new bars,
+# resumed from a JSON round-tripped checkpoint as the endpoint does. That
+# every split is bit-identical to the full run is tested in
+# tests/test_engine_checkpoint.py.
+#
+#   cd backend && python -m benchmarks.bench_incremental
+import json
+import time
+
+import numpy as np
+
+from app.service import engine
+
+N_DAYS = 5000  # ~20 years
+NEW_BARS = (1, 5, 20, 250)
+REPEAT = 20
+
+CASES = [
+    ("sma_crossover", {"short_window": 20, "long_window": 50}),
+    ("rsi", {"period": 14}),
+    ("buy_hold", {}),
+]
+
+
+def synthetic_close(seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.018, N_DAYS))
+    close[:40] = np.nan                         # late listing
+    close[rng.integers(40, N_DAYS, 30)] = np.nan  # missing bars
+    close[2000:2100] = close[1999]              # flat stretch: exact SMA ties
+    return close
+
+
+def timed(fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    close = synthetic_close()
+    print(f"{N_DAYS} bars already processed; time to bring the run up to date")
+    print(f"{'strategy':>14} {'new':>5} {'full ms':>9} {'incr ms':>9} {'speedup':>8}")
+    for strategy, params in CASES:
+        for new in NEW_BARS:
+            history = close[:N_DAYS - new]
+            state = engine.EngineState(strategy, params)
+            state.advance(history)
+            checkpoint = json.dumps(state.to_dict())
+
+            def incremental():
+                engine.EngineState.from_dict(json.loads(checkpoint)).advance(close[N_DAYS - new:])
+
+            full = timed(lambda: engine.run_strategy(close, strategy, params).summary())
+            incr = timed(incremental)
+            print(f"{strategy:>14} {new:>5} {full * 1e3:>9.3f} {incr * 1e3:>9.3f} {full / incr:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
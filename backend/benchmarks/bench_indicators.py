@@ -0,0 +1,158 @@
+# The indicator layer (service/indicators.py) under a dashboard session:
+# SYMBOLS series of 20 years each. On every symbol the session runs SWEEPS
+# overlapping parameter sweeps (random SMA and RSI grids, as someone
+# narrowing in on a range would) and SINGLE one-off sma_crossover / rsi
+# backtests. Timed is the indicator stage of each request (the rolling
+# means and RSIs its signals are built from): computed from scratch with
+# the engine as before, on one shared cache, and on a cache under a small
+# memory cap; then the whole session end to end, where the simulation of
+# every grid point is the same either way. Every indicator is checked
+# against the engine's own (or pandas') computation first, and sweeps and
+# signals must come out identical with and without the cache.
+#
+#   cd backend && python -m benchmarks.bench_indicators
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.service import engine
+from app.service.indicators import IndicatorCache, Indicators
+from app.service.sweep import run_sweep
+
+SYMBOLS = 5
+N_DAYS = 5000
+SWEEPS = 30
+SINGLE = 100
+SMALL_CAP_MB = 4
+
+
+def synthetic_close(seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.018, N_DAYS))
+    close[:rng.integers(10, 300)] = np.nan       # late listing
+    close[rng.integers(300, N_DAYS, 20)] = np.nan  # missing bars
+    return close
+
+
+def check_parity(close):
+    ind = Indicators(close, cache=IndicatorCache(1 << 30))
+    for w in (5, 20, 50, 200):
+        assert np.array_equal(ind.get("sma", w), engine.rolling_mean(close, w)[:, 0], equal_nan=True)
+        assert np.array_equal(ind.get("rsi", w), engine.rsi(close, w)[:, 0], equal_nan=True)
+        ema = pd.Series(close).ewm(span=w, adjust=False, min_periods=w).mean().to_numpy()
+        assert np.array_equal(ind.get("ema", w), ema, equal_nan=True)
+        vol = pd.Series(engine.pct_change(close)[:, 0]).rolling(w).std().to_numpy()
+        assert np.allclose(ind.get("volatility", w), vol, rtol=1e-9, atol=1e-12, equal_nan=True)
+    assert np.array_equal(ind.get("returns"), engine.pct_change(close)[:, 0], equal_nan=True)
+    for strategy, params in (("sma_crossover", {"short_window": 20, "long_window": 50}), ("rsi", {"period": 14})):
+        assert np.array_equal(engine.strategy_signals(close, strategy, params, ind),
+                              engine.strategy_signals(close, strategy, params))
+    print("parity: sma, rsi, returns match the engine, ema pandas' ewm, volatility pandas' rolling std "
+          "(to 1e-9); strategy signals identical")
+
+
+def session(seed):
+    """The requests a dashboard session sends: (kind, strategy, grid or params)."""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(SWEEPS):
+        lo = rng.randrange(5, 40)
+        requests.append(("sweep", "sma_crossover", {"short_window": list(range(lo, lo + 15, rng.choice((1, 5)))),
+                                                    "long_window": list(range(lo + 20, lo + 200, 10))}))
+        lo = rng.randrange(5, 20)
+        requests.append(("sweep", "rsi", {"period": list(range(lo, lo + 10)), "overbought": [65, 70, 75],
+                                          "oversold": [25, 30, 35]}))
+    for _ in range(SINGLE):
+        if rng.random() < 0.5:
+            requests.append(("single", "sma_crossover", {"short_window": rng.choice((10, 20, 50)),
+                                                         "long_window": rng.choice((100, 150, 200))}))
+        else:
+            requests.append(("single", "rsi", {"period": rng.choice((7, 14, 21))}))
+    rng.shuffle(requests)
+    return requests
+
+
+def sweep_inputs(close, strategy, grid, ind=None):
+    if strategy == "sma_crossover":
+        windows = np.union1d(grid["short_window"], grid["long_window"])
+        return ind.many("sma", windows) if ind else engine.rolling_means(close, windows)
+    if ind:
+        return ind.many("rsi", grid["period"])
+    delta = np.concatenate(([np.nan], np.diff(close)))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gain = engine.rolling_means(np.where(delta > 0, delta, 0.0), grid["period"])
+        loss = engine.rolling_means(np.where(delta < 0, -delta, 0.0), grid["period"])
+        return 100 - (100 / (1 + gain / loss))
+
+
+def indicator_stage(series, requests, cache):
+    """Each request's indicators and signals; ``cache`` None computes them with the engine, as before."""
+    out = []
+    t0 = time.perf_counter()
+    for symbol, close in series.items():
+        for kind, strategy, spec in requests:
+            ind = Indicators(close, symbol=symbol, cache=cache) if cache is not None else None
+            if kind == "sweep":
+                out.append(sweep_inputs(close, strategy, spec, ind))
+            else:
+                out.append(engine.strategy_signals(close, strategy, spec, ind))
+    return out, time.perf_counter() - t0
+
+
+def end_to_end(series, requests, cache):
+    out = []
+    t0 = time.perf_counter()
+    for symbol, close in series.items():
+        for kind, strategy, spec in requests:
+            ind = Indicators(close, symbol=symbol, cache=cache)
+            if kind == "sweep":
+                out.append(run_sweep(close, strategy, spec, ind)["total_return"])
+            else:
+                out.append(engine.run_strategy(close, strategy, spec, indicators=ind).equity[-1])
+    return out, time.perf_counter() - t0
+
+
+def main():
+    series = {f"SYM{i}": synthetic_close(i) for i in range(SYMBOLS)}
+    check_parity(series["SYM0"])
+    requests = session(3)
+    print(f"\n{SYMBOLS} symbols x {N_DAYS} bars, {len(requests)} requests per symbol "
+          f"({2 * SWEEPS} sweeps, {SINGLE} single backtests)")
+
+    before, before_s = indicator_stage(series, requests, None)
+    shared = IndicatorCache(1 << 30)
+    after, after_s = indicator_stage(series, requests, shared)
+    stats = shared.stats()
+    again, again_s = indicator_stage(series, requests, shared)  # the next session over the same data
+    small = IndicatorCache(SMALL_CAP_MB << 20)
+    capped, capped_s = indicator_stage(series, requests, small)
+    for a, b, c in zip(before, after, capped):
+        assert np.array_equal(a, b, equal_nan=True) and np.array_equal(a, c, equal_nan=True)
+    assert all(np.array_equal(a, b, equal_nan=True) for a, b in zip(before, again))
+    print(f"{'indicator stage':<28} {'ms':>8} {'MB held':>8} {'evictions':>10}")
+    print(f"{'engine, per request (before)':<28} {before_s * 1e3:>8.0f} {'-':>8} {'-':>10}")
+    print(f"{'shared cache':<28} {after_s * 1e3:>8.0f} {stats['bytes'] / 2**20:>8.1f} {stats['evictions']:>10}"
+          f"   ({before_s / after_s:.1f}x)")
+    print(f"{'shared cache, next session':<28} {again_s * 1e3:>8.0f} {'':>8} {'':>10}   ({before_s / again_s:.1f}x)")
+    print(f"{f'cache capped at {SMALL_CAP_MB} MB':<28} {capped_s * 1e3:>8.0f} "
+          f"{small.stats()['bytes'] / 2**20:>8.1f} {small.stats()['evictions']:>10}"
+          f"   ({before_s / capped_s:.1f}x)")
+    print("identical indicators and signals on all three")
+
+    cold, cold_s = end_to_end(series, requests, IndicatorCache(0))
+    warm, warm_s = end_to_end(series, requests, shared)
+    for a, b in zip(cold, warm):
+        assert np.array_equal(a, b, equal_nan=True)
+    print(f"\nwhole session incl. simulation: {cold_s:.2f} s without reuse, {warm_s:.2f} s with; "
+          f"identical results\n")
+
+    print(f"{'indicator':<12} {'inputs':<22} {'computed':>9} {'reused':>8} {'compute ms':>11} {'avg ms':>8}")
+    for name, row in stats["indicators"].items():
+        print(f"{name:<12} {','.join(row['inputs']) or '-':<22} {row['computed']:>9} {row['reused']:>8} "
+              f"{row['compute_ms']:>11.1f} {row['avg_compute_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Rows per second for price ingestion: the old per-row SELECT-then-add loop
+# from populate_data.py against app.service.ingest.write_prices.
+#
+#   cd backend && python -m benchmarks.bench_ingest
+#
+# Set BENCH_DATABASE_URL to a scratch Postgres to measure the COPY path;
+# the default in-memory SQLite exercises the multi-row ON CONFLICT insert.
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models import models
+from app.service.ingest import write_prices
+
+N_SYMBOLS = int(os.getenv("BENCH_SYMBOLS", 20))
+N_DAYS = int(os.getenv("BENCH_DAYS", 250))
+
+
+def history(seed):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2023-01-02", periods=N_DAYS, name="Date")
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, N_DAYS))
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": rng.integers(1, 10**6, N_DAYS)}, index=index)
+
+
+def legacy(db, company_id, hist):
+    count = 0
+    for date, row in hist.iterrows():
+        existing_price = db.query(models.Price).filter_by(
+            company_id=company_id, date=date.date()).first()
+        if not existing_price:
+            db.add(models.Price(
+                company_id=company_id,
+                date=date.date(),
+                open=float(row["Open"]),
+                high=float(row["High"]),
+                low=float(row["Low"]),
+                close=float(row["Close"]),
+                volume=int(row["Volume"])
+            ))
+            count += 1
+    db.commit()
+    return count
+
+
+def bulk(db, company_id, hist):
+    count = write_prices(db, company_id, hist)
+    db.commit()
+    return count
+
+
+def run(writer, url, frames):
+    engine = create_engine(url)
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.execute(insert(models.Company), [
+        {"id": i + 1, "symbol": f"SYM{i}", "name": f"SYM{i}", "market_cap": 0} for i in range(N_SYMBOLS)
+    ])
+    db.commit()
+
+    t0 = time.perf_counter()
+    written = sum(writer(db, i + 1, frame) for i, frame in enumerate(frames))
+    elapsed = time.perf_counter() - t0
+    # second pass: everything already stored, nothing may be written twice
+    t1 = time.perf_counter()
+    rewritten = sum(writer(db, i + 1, frame) for i, frame in enumerate(frames))
+    recheck = time.perf_counter() - t1
+    stored = db.execute(select(func.count()).select_from(models.Price)).scalar()
+    db.close()
+    engine.dispose()
+    assert written == stored == N_SYMBOLS * N_DAYS and rewritten == 0
+    return written / elapsed, recheck
+
+
+def main():
+    url = os.getenv("BENCH_DATABASE_URL", "sqlite://")
+    frames = [history(i) for i in range(N_SYMBOLS)]
+    print(f"{N_SYMBOLS} symbols × {N_DAYS} rows on {url.split(':')[0]}")
+    print(f"{'path':>8} {'rows/s':>10} {'re-run s':>9}")
+    old_rate, old_recheck = run(legacy, url, frames)
+    print(f"{'row':>8} {old_rate:>10.0f} {old_recheck:>9.3f}")
+    new_rate, new_recheck = run(bulk, url, frames)
+    print(f"{'bulk':>8} {new_rate:>10.0f} {new_recheck:>9.3f}")
+    print(f"speedup {new_rate / old_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
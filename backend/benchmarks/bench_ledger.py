@@ -0,0 +1,99 @@
+# Trade extraction for /backtest/{symbol}: the per-change Python loop it used
+# to run against ledger.trade_ledger on a high-turnover minute-bar series.
+# Long trades must match the loop's entry/exit prices; the ledger also has
+# to give the same trades when the bars arrive in several batches.
+#
+#   cd backend && python -m benchmarks.bench_ledger
+import time
+
+import numpy as np
+
+from app.service import engine
+from app.service.ledger import ledger_columns, trade_ledger
+
+N_BARS = 1_000_000  # ~10 years of 375-minute NSE sessions is ~930k bars
+REPEAT = 3
+
+
+def minute_series(seed=11):
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64("2015-01-01T09:15") + np.arange(N_BARS).astype("timedelta64[m]")
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.0008, N_BARS))
+    close[rng.integers(0, N_BARS, 500)] = np.nan
+    return dates, close
+
+
+def loop_trades(dates, close, signal):
+    """The previous implementation: one dict per signal change, every segment a trade."""
+    trades, open_trade = [], None
+    previous = np.concatenate(([np.nan], signal[:-1]))
+    for i in np.flatnonzero(signal != previous):
+        point = {"date": str(dates[i]), "close": float(close[i])}
+        if open_trade is not None:
+            trades.append({
+                "entry_date": open_trade["date"],
+                "exit_date": point["date"],
+                "entry_price": round(open_trade["close"], 2),
+                "exit_price": round(point["close"], 2),
+                "return_pct": round((point["close"] / open_trade["close"] - 1) * 100, 2),
+                "signal": open_trade["signal"],
+            })
+        open_trade = {**point, "signal": int(signal[i])}
+    return trades
+
+
+def ledger_trades(dates, close, signal):
+    ledger, _ = trade_ledger(dates, close, signal, commission=0.0005, slippage=0.0002)
+    return ledger_columns(ledger)
+
+
+def batched(dates, close, signal, cuts):
+    parts, open_trade, prev = [], None, None
+    for lo, hi in zip([0] + cuts, cuts + [len(dates)]):
+        ledger, open_trade = trade_ledger(dates[lo:hi], close[lo:hi], signal[lo:hi], prev, open_trade,
+                                          first_bar=lo, commission=0.0005, slippage=0.0002)
+        parts.append(ledger)
+        prev = int(signal[hi - 1])
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def timed(fn, *args):
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def main():
+    dates, close = minute_series()
+    signal = engine.rsi_signals(close, 5, 55, 45)[:, 0]
+
+    old, old_s = timed(loop_trades, dates, close, signal)
+    new, new_s = timed(ledger_trades, dates, close, signal)
+    _, arrays_s = timed(trade_ledger, dates, close, signal)
+
+    # no NaN closes at entries/exits in the comparison: the loop did not fill them
+    longs = [(t["entry_price"], t["exit_price"]) for t in old if t["signal"] == 1]
+    mine = [(e, x) for s, e, x in zip(new["side"], new["entry_price"], new["exit_price"]) if s == "long"]
+    ok = [a == b for a, b in zip(longs, mine) if not np.isnan(a).any() and not np.isnan(b).any()]
+    assert len(longs) == len(mine) and all(ok)
+
+    full, _ = trade_ledger(dates, close, signal, commission=0.0005, slippage=0.0002)
+    cuts = sorted(np.random.default_rng(0).integers(1, N_BARS, 7).tolist())
+    split = batched(dates, close, signal, cuts)
+    for k in full:
+        assert np.array_equal(full[k], split[k], equal_nan=True), k
+
+    n_long = sum(s == "long" for s in new["side"])
+    print(f"{N_BARS} minute bars: {len(new['side'])} trades ({n_long} long), "
+          f"the old loop counted {len(old)} incl. flat stretches")
+    print("parity: long trades match the loop; 8 batches match one pass")
+    print(f"loop                  {old_s * 1e3:9.1f} ms")
+    print(f"ledger arrays         {arrays_s * 1e3:9.1f} ms  ({old_s / arrays_s:.1f}x)")
+    print(f"ledger + JSON columns {new_s * 1e3:9.1f} ms  ({old_s / new_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
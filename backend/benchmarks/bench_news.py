@@ -0,0 +1,127 @@
+# /news/{symbol}: parsing a saved Google News results page (fixtures/) with
+# the full-page BeautifulSoup parse it used to do against news.parse_news,
+# which only parses the div.dbsr cards; both must give the same articles.
+# The page is also padded with inline scripts to the size Google serves.
+# Then news.NewsCache under a dashboard's load, with a fetch that serves the
+# fixture after LATENCY seconds: 200 concurrent misses for one symbol, and
+# requests arriving across TTL boundaries (a fake clock), where stale
+# entries are served at once while one background refresh runs.
+#
+#   cd backend && python -m benchmarks.bench_news
+import asyncio
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from app.service.news import NewsCache, parse_news
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "google_news.html")
+PADDING_KB = 700  # a live results page is mostly script
+LATENCY = 0.3
+CLIENTS = 200
+REPEAT = 5
+
+
+def full_parse(html):
+    """The previous implementation: every tag on the page through html.parser."""
+    soup = BeautifulSoup(html, "html.parser")
+    articles = []
+    for item in soup.select("div.dbsr")[:10]:
+        time_el = item.select_one("span.WG9SHc span")
+        articles.append({
+            "title": item.select_one("div.JheGif.nDgy9d").get_text(strip=True),
+            "link": item.a["href"],
+            "source": item.select_one("div.CEMjEf.NUnG9d").get_text(strip=True),
+            "time": time_el.get_text(strip=True) if time_el else "Unknown",
+        })
+    return articles
+
+
+def padded(html):
+    line = '<script nonce="q1">(function(){var a=[%s];window._p=(window._p||0)+a.length;})();</script>\n'
+    script = line % ",".join(str(i) for i in range(400))
+    return html.replace("<!--SCRIPTS-->", script * (PADDING_KB * 1024 // len(script)))
+
+
+def timed(fn, *args):
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def cache_load(page):
+    calls = {"n": 0}
+
+    async def fetch(symbol):
+        calls["n"] += 1
+        await asyncio.sleep(LATENCY)
+        return page
+
+    # 200 dashboards open at once on a cold cache
+    cache = NewsCache(ttl=300, stale_ttl=3600, max_entries=100, fetch=fetch)
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(cache.get("RELIANCE.NS") for _ in range(CLIENTS)))
+    cold = time.perf_counter() - t0
+    assert all(r == results[0] for r in results) and len(results[0]) == 10
+    print(f"\n{CLIENTS} concurrent misses, fetch latency {LATENCY * 1e3:.0f} ms: "
+          f"{cold * 1e3:.0f} ms, {calls['n']} scrape (was {CLIENTS})")
+
+    # one request per symbol every 10 s for 2 hours, 5 symbols, TTL 5 min
+    clock = Clock()
+    calls["n"] = 0
+    cache = NewsCache(ttl=300, stale_ttl=3600, max_entries=100, fetch=fetch, clock=clock)
+    waits = {"fresh": [], "stale": [], "miss": []}
+    for step in range(720):
+        clock.now = step * 10.0
+        for symbol in ("RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "ITC.NS"):
+            before = (cache.hits, cache.stale_hits)
+            t0 = time.perf_counter()
+            await cache.get(symbol)
+            elapsed = time.perf_counter() - t0
+            kind = ("fresh" if cache.hits > before[0] else "stale" if cache.stale_hits > before[1] else "miss")
+            waits[kind].append(elapsed)
+        # 10 s is plenty for the refreshes started this step to land
+        while cache.stats()["refreshing"]:
+            await asyncio.sleep(0.01)
+    stats = cache.stats()
+    print(f"2 h of dashboard polling, 5 symbols every 10 s (ttl 300 s): {calls['n']} scrapes for "
+          f"{720 * 5} requests, hit rate {stats['hit_rate']:.3f}, {stats['refreshes']} background refreshes")
+    for kind, values in waits.items():
+        if values:
+            print(f"  {kind:<5} {len(values):>5} requests, mean wait {sum(values) / len(values) * 1e3:8.3f} ms")
+    print(f"  avg fetch+parse {stats['avg_fetch_ms']} ms")
+
+
+def main():
+    with open(FIXTURE) as f:
+        fixture = f.read()
+    page = padded(fixture)
+
+    for html in (fixture, page):
+        expected = full_parse(html)
+        assert parse_news(html) == expected and len(expected) == 10
+    print(f"parity: parse_news matches the full-page parse on the fixture and the {len(page) >> 10} KB page")
+
+    print(f"\n{'page':>10} {'full parse ms':>14} {'cards only ms':>14}")
+    for html in (fixture, page):
+        _, old_s = timed(full_parse, html)
+        _, new_s = timed(parse_news, html)
+        print(f"{len(html) >> 10:>8} KB {old_s * 1e3:>14.2f} {new_s * 1e3:>14.2f}  ({old_s / new_s:.1f}x)")
+
+    asyncio.run(cache_load(page))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Compares the /run price loading path: ORM rows → dicts → DataFrame.pivot
+# against the columnar loader in app.service.price_matrix.
+#
+#   cd backend && python -m benchmarks.bench_price_matrix
+#
+# Uses BENCH_DATABASE_URL when set (e.g. a scratch Postgres), otherwise an
+# in-memory SQLite database filled with synthetic prices.
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models import models
+from app.service.price_matrix import load_price_matrix
+
+DAYS = int(os.getenv("BENCH_DAYS", 1250))  # ~5 years of trading days
+SYMBOL_COUNTS = [10, 100, 500]
+REPEAT = 3
+
+
+def seed(db, n_symbols, days):
+    db.execute(insert(models.Company), [
+        {"id": i + 1, "symbol": f"SYM{i}", "name": f"SYM{i}", "market_cap": 0, "sector": "Unknown"}
+        for i in range(n_symbols)
+    ])
+    rng = np.random.default_rng(7)
+    start = date(2019, 1, 1)
+    dates = [start + timedelta(days=d) for d in range(days)]
+    for cid in range(1, n_symbols + 1):
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, days))
+        db.execute(insert(models.Price), [
+            {"company_id": cid, "date": d, "open": c, "high": c, "low": c, "close": c, "volume": 0}
+            for d, c in zip(dates, close.tolist())
+        ])
+    db.commit()
+    return dates[0], dates[-1]
+
+
+def legacy(db, company_ids, start, end):
+    prices = (
+        db.query(models.Price)
+        .filter(models.Price.company_id.in_(company_ids))
+        .filter(models.Price.date >= start)
+        .filter(models.Price.date <= end)
+        .all()
+    )
+    df = pd.DataFrame([
+        {'date': p.date, 'company_id': p.company_id, 'close': float(p.close)}
+        for p in prices
+    ])
+    df_pivot = df.pivot(index='date', columns='company_id', values='close').sort_index()
+    df_pivot.index = pd.to_datetime(df_pivot.index)
+    df_pivot.ffill(inplace=True)
+    return df_pivot
+
+
+def columnar(db, company_ids, start, end):
+    return load_price_matrix(db, company_ids, start, end)
+
+
+def best_of(fn, *args):
+    times = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        times.append(time.perf_counter() - t0)
+    return min(times), out
+
+
+def main():
+    url = os.getenv("BENCH_DATABASE_URL", "sqlite://")
+    print(f"{'symbols':>8} {'rows':>10} {'legacy s':>10} {'columnar s':>11} {'speedup':>8}")
+    for n in SYMBOL_COUNTS:
+        engine = create_engine(url)
+        models.Base.metadata.drop_all(engine)
+        models.Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        start, end = seed(db, n, DAYS)
+        ids = list(range(1, n + 1))
+
+        t_old, df = best_of(legacy, db, ids, start, end)
+        db.expunge_all()
+        t_new, matrix = best_of(columnar, db, ids, start, end)
+        assert np.allclose(df.to_numpy(), matrix.close, equal_nan=True)
+
+        print(f"{n:>8} {n * DAYS:>10} {t_old:>10.3f} {t_new:>11.3f} {t_old / t_new:>7.1f}x")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
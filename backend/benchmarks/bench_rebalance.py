@@ -0,0 +1,84 @@
+# Drifting-weight portfolio simulation from app.service.rebalance over a
+# 500 asset × 20 year universe for every rebalance calendar. Checks that
+# batched processing (as /run resumes from a checkpoint) matches one pass,
+# and that quarterly equity matches the old per-quarter groupby loop.
+#
+#   cd backend && python -m benchmarks.bench_rebalance
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.service.rebalance import FREQUENCIES, PortfolioState, equal_weights, period_ids
+
+N_ASSETS = 500
+N_DAYS = 5040  # ~20 years
+REPEAT = 5
+
+
+def synthetic_universe(seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.018, (N_DAYS, N_ASSETS)), axis=0)
+    for j in range(0, N_ASSETS, 7):
+        close[: rng.integers(10, 2000), j] = np.nan  # late listings
+    close[rng.integers(0, N_DAYS, 300), rng.integers(0, N_ASSETS, 300)] = np.nan
+    dates = pd.bdate_range("2005-01-03", periods=N_DAYS).to_numpy().astype("datetime64[D]")
+    return dates, close
+
+
+def simulate(close, periods, cuts=()):
+    state, values = PortfolioState(close.shape[1], 100_000), []
+    prev = 0
+    for cut in list(cuts) + [len(close)]:
+        state = PortfolioState.from_dict(json.loads(json.dumps(state.to_dict())))
+        batch = periods[prev:cut]
+        targets = equal_weights(len(state.new_periods(batch)), close.shape[1])
+        step = state.advance(close[prev:cut], batch, targets)
+        values.append(step.value)
+        prev = cut
+    return np.concatenate(values)
+
+
+def groupby_loop(dates, close):
+    """The quarterly /run loop this engine replaced."""
+    df = pd.DataFrame(close, index=pd.to_datetime(dates)).ffill()
+    returns = df.pct_change().fillna(0)
+    weights = pd.Series(1 / close.shape[1], index=df.columns)
+    equity, out = 100_000, []
+    for _, period in returns.groupby(pd.Grouper(freq="Q-DEC")):
+        equity *= 1 + weights.dot(((period + 1).prod() - 1).fillna(0))
+        out.append(equity)
+    return np.array(out)
+
+
+def main():
+    dates, close = synthetic_universe()
+    rng = np.random.default_rng(0)
+
+    print(f"{N_ASSETS} assets × {N_DAYS} days")
+    print(f"{'calendar':>10} {'periods':>8} {'ms':>8}")
+    for frequency in FREQUENCIES:
+        periods = period_ids(dates, frequency)
+        best = float("inf")
+        for _ in range(REPEAT):
+            t0 = time.perf_counter()
+            full = simulate(close, periods)
+            best = min(best, time.perf_counter() - t0)
+        for _ in range(5):
+            cuts = np.sort(rng.integers(0, N_DAYS + 1, rng.integers(1, 5)))
+            assert np.array_equal(simulate(close, periods, cuts), full), frequency
+        print(f"{frequency:>10} {len(np.unique(periods)):>8} {best * 1e3:>8.1f}")
+    print("batched runs identical to one pass")
+
+    periods = period_ids(dates, "quarterly")
+    ends = np.flatnonzero(np.diff(periods, append=periods[-1] + 1))
+    t0 = time.perf_counter()
+    old = groupby_loop(dates, close)
+    elapsed = time.perf_counter() - t0
+    drift = np.max(np.abs(simulate(close, periods)[ends] / old - 1))
+    print(f"groupby loop (quarterly): {elapsed * 1e3:.1f} ms, max relative difference {drift:.1e}")
+
+
+if __name__ == "__main__":
+    main()
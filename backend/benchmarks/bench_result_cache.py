@@ -0,0 +1,171 @@
+# Repeated backtest requests against the result cache, on a SQLite file
+# seeded with 100 companies x 10 years of business days. For /run (top 10,
+# monthly rebalance) and /backtest/{symbol} (sma_crossover on one series):
+#   - the first request, which simulates and stores a BacktestResult;
+#   - the same request again before: still simulated (the price matrix
+#     already cached), the stored row rewritten in place;
+#   - the same request from the in-memory cache, and from the stored row by
+#     digest after the memory cache is dropped (another worker, a restart);
+#   - after new prices are ingested (bump_data_version, or a new bar in the
+#     series), which must simulate again.
+# Cached answers must equal the computed ones. Then a dashboard's mix of 500
+# requests over 25 distinct configurations, for hit ratio and saved compute.
+#
+#   cd backend && python -m benchmarks.bench_result_cache
+import os
+import random
+import tempfile
+import time
+from datetime import date
+
+_tmp = tempfile.mkdtemp(prefix="bench_result_cache_")
+os.environ.setdefault("CACHE_DIR", _tmp)
+os.environ.setdefault("PRICE_VERSION_FILE", os.path.join(_tmp, "price_version"))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'bench.db')}")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from sqlalchemy import func, insert, select, update  # noqa: E402
+
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.models import models  # noqa: E402
+from app.schemas.schemas import BacktestRequest, BacktestRunRequest  # noqa: E402
+from app.service import portfolio, symbol_backtest  # noqa: E402
+from app.service.price_cache import PriceSeries, bump_data_version  # noqa: E402
+from app.service.result_cache import result_cache  # noqa: E402
+
+N_COMPANIES = 100
+DAYS = pd.bdate_range("2015-01-01", "2024-12-31").date
+REQUESTS = 500
+CONFIGS = 25
+REPEAT = 5
+
+
+def seed():
+    models.Base.metadata.create_all(engine)
+    rng = np.random.default_rng(3)
+    with SessionLocal() as db:
+        db.execute(insert(models.Company), [
+            {"id": i, "symbol": f"SYM{i}.NS", "name": f"Company {i}", "market_cap": int(rng.integers(1e9, 1e12)),
+             "sector": "x"} for i in range(1, N_COMPANIES + 1)])
+        rows = []
+        for cid in range(1, N_COMPANIES + 1):
+            close = (100 * np.cumprod(1 + rng.normal(0.0003, 0.015, len(DAYS)))).round(4).tolist()
+            rows.extend({"company_id": cid, "date": d, "open": c, "high": c, "low": c, "close": c, "volume": 1000}
+                        for d, c in zip(DAYS, close))
+        db.execute(insert(models.Price), rows)
+        db.add(models.Strategy(id=1, name="top10_equal_weight", parameters={}))
+        db.commit()
+
+
+def timed(fn, repeat=REPEAT):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def run_once(req):
+    with SessionLocal() as db:
+        return portfolio.run_portfolio_backtest(db, db.get(models.Strategy, 1), req)
+
+
+def symbol_once(req, history):
+    with SessionLocal() as db:
+        return symbol_backtest.run_symbol_backtest(db, "SYM1.NS", req, history)
+
+
+def result_rows():
+    with SessionLocal() as db:
+        return db.execute(select(func.count(models.BacktestResult.id))).scalar()
+
+
+def same(a, b) -> bool:
+    return {k: v for k, v in a.items() if k != "backtest_id"} == {k: v for k, v in b.items() if k != "backtest_id"}
+
+
+def compare(label, run):
+    """First run, forced recomputes (the old behaviour), memory hits, stored hits, after new data."""
+    first, first_s = timed(run, repeat=1)
+
+    def recompute():
+        result_cache.clear()
+        with SessionLocal() as db:
+            # without a digest the stored row is only a checkpoint to resume from
+            db.execute(update(models.BacktestResult).values(digest=None))
+            db.commit()
+        t0 = time.perf_counter()
+        out = run()
+        return out, time.perf_counter() - t0
+
+    recomputed = min((recompute() for _ in range(REPEAT)), key=lambda x: x[1])
+    # each recompute is stored as a run of its own, under a new backtest_id
+    assert same(recomputed[0], first)
+    rows = result_rows()
+    hit, hit_s = timed(run)
+    assert same(hit, first)
+
+    def stored():
+        result_cache.clear()
+        return run()
+
+    from_db, stored_s = timed(stored)
+    assert same(from_db, first) and result_rows() == rows
+    print(f"{label:<22} {first_s * 1e3:>9.1f} {recomputed[1] * 1e3:>11.1f} {hit_s * 1e3:>9.3f} "
+          f"{stored_s * 1e3:>10.1f}   ({recomputed[1] / hit_s:,.0f}x from memory)")
+    return first
+
+
+def main():
+    seed()
+    print(f"seeded {N_COMPANIES} companies x {len(DAYS)} business days")
+    print(f"\n{'request':<22} {'first ms':>9} {'repeat ms':>11} {'memory ms':>9} {'stored ms':>10}")
+    print(f"{'':<22} {'':>9} {'(before)':>11} {'(now)':>9} {'(now)':>10}")
+
+    run_req = BacktestRunRequest(strategy_id=1, start_date=date(2015, 1, 1), end_date=date(2024, 12, 31),
+                                 initial_capital=100_000, rebalance_frequency="monthly")
+    before = compare("/run top 10 monthly", lambda: run_once(run_req))
+
+    rng = np.random.default_rng(5)
+    dates = np.array(DAYS, dtype="datetime64[D]")
+    history = PriceSeries(dates, close=100 * np.cumprod(1 + rng.normal(0.0003, 0.015, len(dates))))
+    sym_req = BacktestRequest(strategy="sma_crossover", params={"short_window": 20, "long_window": 50})
+    compare("/backtest/{symbol} sma", lambda: symbol_once(sym_req, history))
+
+    # 🔷 New data must be simulated again
+    with SessionLocal() as db:
+        db.execute(insert(models.Price), [{"company_id": cid, "date": date(2025, 1, 1), "open": 1, "high": 1,
+                                           "low": 1, "close": 1, "volume": 0} for cid in range(1, N_COMPANIES + 1)])
+        db.commit()
+    bump_data_version()
+    misses = result_cache.stats()["misses"]
+    again = run_once(run_req)
+    assert result_cache.stats()["misses"] == misses + 1 and again["equity_curve"] == before["equity_curve"]
+    grown = PriceSeries(np.append(dates, np.datetime64("2025-01-01")), close=np.append(history.close, 1.0))
+    symbol_once(sym_req, grown)
+    assert result_cache.stats()["misses"] == misses + 2
+    print("\nnew prices (bump_data_version, or a new bar in the series) are simulated again")
+
+    # 🔷 A dashboard session: a skewed mix over a handful of configurations
+    result_cache.clear()
+    start = result_cache.stats()
+    pick = random.Random(11)
+    configs = [BacktestRequest(strategy="sma_crossover", params={"short_window": s, "long_window": s * 4})
+               for s in range(5, 5 + CONFIGS)]
+    t0 = time.perf_counter()
+    for _ in range(REQUESTS):
+        symbol_once(configs[min(int(pick.paretovariate(1.2)) - 1, CONFIGS - 1)], history)
+    elapsed = time.perf_counter() - t0
+    stats = {k: v - start[k] for k, v in result_cache.stats().items() if isinstance(v, (int, float))}
+    lookups = stats["hits"] + stats["stored_hits"] + stats["misses"]
+    stats["hit_rate"] = (stats["hits"] + stats["stored_hits"]) / lookups
+    print(f"\n{REQUESTS} /backtest/{{symbol}} requests over {CONFIGS} configurations: {elapsed:.2f} s, "
+          f"hit rate {stats['hit_rate']:.3f} ({stats['hits']} memory, {stats['stored_hits']} stored, "
+          f"{stats['misses']} computed)")
+    print(f"compute {stats['compute_seconds']:.2f} s, saved {stats['saved_seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# Price-table schema under the queries the app runs, at 100 and 2,000
+# symbols with 20 years of business days each (~0.5M and ~10.4M rows), on a
+# local Postgres (DATABASE_URL, else a throwaway pgserver instance). Each
+# size is loaded once and measured at three migration steps:
+#   0001  the original schema (primary key on id only)
+#   0002  unique (company_id, date) INCLUDE (close)
+#   0003  the same, range-partitioned by year (PRICES_PARTITIONED)
+# Queries: load_price_matrix for 20 symbols over one year and over all 20
+# years (a backtest's read), a single (company_id, date) lookup (ingestion's
+# existence check) and the latest date per company that incremental
+# ingestion starts from: a GROUP BY over prices on 0001, where there is no
+# index to probe, else ingest.last_price_dates. Each step must return the
+# same matrix and latest dates.
+#
+#   cd backend && python -m benchmarks.bench_schema
+import io
+import os
+import random
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+
+if not os.getenv("DATABASE_URL"):
+    import pgserver
+
+    _server = pgserver.get_server(tempfile.mkdtemp(prefix="bench_schema_"), cleanup_mode="delete")
+    os.environ["DATABASE_URL"] = _server.get_uri()
+
+from alembic import command  # noqa: E402
+from sqlalchemy import func, insert, select, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core import config  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.create_table import alembic_config, migrate  # noqa: E402
+from app.models import models  # noqa: E402
+from app.service.ingest import last_price_dates  # noqa: E402
+from app.service.price_matrix import load_price_matrix  # noqa: E402
+
+SIZES = (100, 2000)
+DAYS = np.arange(np.datetime64("2005-01-03"), np.datetime64("2025-01-01"))
+DAYS = DAYS[np.is_busday(DAYS)]
+LOAD_BATCH = 100  # companies per COPY
+PICK = 20
+REPEAT = 5
+
+
+def reset():
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE; CREATE SCHEMA public"))
+
+
+def load(n_companies):
+    rng = np.random.default_rng(n_companies)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Company), [
+            {"id": i, "symbol": f"SYM{i}.NS", "name": f"Company {i}", "market_cap": i} for i in
+            range(1, n_companies + 1)])
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        days = np.datetime_as_string(DAYS)
+        for lo in range(1, n_companies + 1, LOAD_BATCH):
+            ids = np.arange(lo, min(lo + LOAD_BATCH, n_companies + 1))
+            close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.015, (len(ids), len(DAYS))), axis=1)
+            buf = io.StringIO()
+            for cid, row in zip(ids.tolist(), np.round(close, 4).tolist()):
+                buf.write("".join(f"{cid},{d},{c},{c},{c},{c},1000\n" for d, c in zip(days, row)))
+            buf.seek(0)
+            cursor.copy_expert("COPY prices (company_id, date, open, high, low, close, volume) "
+                               "FROM STDIN WITH (FORMAT csv)", buf)
+        raw.commit()
+    finally:
+        raw.close()
+    vacuum()
+
+
+def vacuum():
+    # fresh loads: set visibility so index-only scans do not fall back to the heap
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE prices"))
+
+
+def best(fn, repeat=REPEAT):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, min(times)
+
+
+def grouped_last_dates(db):
+    """What ingestion ran before: one GROUP BY over the whole table."""
+    stmt = select(models.Price.company_id, func.max(models.Price.date)).group_by(models.Price.company_id)
+    return dict(db.execute(stmt).all())
+
+
+def measure(n_companies, indexed):
+    rng = random.Random(7)
+    picks = rng.sample(range(1, n_companies + 1), PICK)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        year, year_s = best(lambda: load_price_matrix(db, picks, date(2019, 1, 1), date(2019, 12, 31)))
+        full, full_s = best(lambda: load_price_matrix(db, picks))
+        lookups = [(rng.randint(1, n_companies), str(DAYS[rng.randrange(len(DAYS))])) for _ in range(REPEAT)]
+        stmt = text("SELECT 1 FROM prices WHERE company_id = :c AND date = :d")
+        found, point_s = best(lambda: [db.execute(stmt, {"c": c, "d": d}).scalar() for c, d in lookups], repeat=1)
+        assert found == [1] * len(lookups)
+        point_s /= len(lookups)
+        last, last_s = best(lambda: (last_price_dates if indexed else grouped_last_dates)(db), repeat=2)
+        assert len(last) == n_companies and set(last.values()) == {DAYS[-1].astype(object)}
+    return (year, full), (year_s, full_s, point_s, last_s)
+
+
+def main():
+    print(f"{'symbols':>8} {'rows':>11} {'schema':<22} {'1y x 20 ms':>11} {'20y x 20 ms':>12} "
+          f"{'lookup ms':>10} {'last dates ms':>14}")
+    for n_companies in SIZES:
+        reset()
+        config.PRICES_PARTITIONED = False
+        migrate(revision="0001")
+        t0 = time.perf_counter()
+        load(n_companies)
+        load_s = time.perf_counter() - t0
+        rows = n_companies * len(DAYS)
+
+        results = {}
+        for step, label in (("0001", "0001 id only"), ("0002", "0002 covering unique"),
+                            ("0003", "0003 partitioned")):
+            t0 = time.perf_counter()
+            if step == "0003":
+                config.PRICES_PARTITIONED = True
+            if step != "0001":
+                migrate(revision=step)
+                vacuum()
+            migrate_s = time.perf_counter() - t0
+            matrices, (year_s, full_s, point_s, last_s) = measure(n_companies, step != "0001")
+            results[step] = matrices
+            print(f"{n_companies:>8} {rows:>11,} {label:<22} {year_s * 1e3:>11.1f} {full_s * 1e3:>12.1f} "
+                  f"{point_s * 1e3:>10.2f} {last_s * 1e3:>14.0f}"
+                  + ("" if step == "0001" else f"   (migration {migrate_s:.0f} s)"), flush=True)
+        for step in ("0002", "0003"):
+            for a, b in zip(results["0001"], results[step]):
+                assert np.array_equal(a.dates, b.dates) and np.array_equal(a.close, b.close, equal_nan=True)
+        print(f"{'':>8} load {load_s:.0f} s; every schema returns the same matrices", flush=True)
+
+        with engine.begin() as conn:
+            command.downgrade(alembic_config(conn), "base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Screening a universe at every rebalance: a per-date loop that queries the
+# EAV fundamentals table and pivots it in pandas, against one FundamentalsPanel
+# build plus Screen.weights over all rebalance dates at once. Both must pick
+# the same companies.
+#
+#   cd backend && python -m benchmarks.bench_screening
+#
+# Uses BENCH_DATABASE_URL when set, otherwise an in-memory SQLite database.
+import os
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models import models
+from app.service.screening import METRICS, Screen, load_panel
+
+N_COMPANIES = 100
+N_QUARTERS = 40
+LAG_DAYS = 45
+PARAMETERS = {"filter": {"ROE_min": 15, "net_margin_min": 5}, "ranking": ["ROE DESC"], "top_n": 10}
+
+
+def seed(db):
+    rng = np.random.default_rng(3)
+    db.execute(insert(models.Company), [
+        {"id": i + 1, "symbol": f"SYM{i}", "name": f"SYM{i}", "market_cap": float(rng.uniform(1e9, 1e12)),
+         "sector": "Unknown"}
+        for i in range(N_COMPANIES)
+    ])
+    quarter_ends = pd.date_range("2014-03-31", periods=N_QUARTERS, freq="QE").date
+    rows = []
+    for cid in range(1, N_COMPANIES + 1):
+        listed = rng.integers(0, N_QUARTERS // 2)  # late filers have no early statements
+        for day in quarter_ends[listed:]:
+            equity = rng.uniform(1e9, 5e9)
+            revenue = rng.uniform(1e9, 8e9)
+            for name, value in (("equity", equity), ("revenue", revenue),
+                                ("net_income", rng.uniform(-0.1, 0.35) * equity)):
+                rows.append({"company_id": cid, "metric": METRICS[name], "date": day, "value": value})
+    db.execute(insert(models.Fundamental), rows)
+    db.commit()
+
+
+def rebalance_dates():
+    return np.array(pd.date_range("2015-01-01", periods=N_QUARTERS - 4, freq="QS").date, dtype="datetime64[D]")
+
+
+def per_date(db, when):
+    """One query and pivot per rebalance date, as a naive screen would."""
+    picks = []
+    for day in when:
+        cutoff = (day - np.timedelta64(LAG_DAYS, "D")).astype(date)
+        q = db.query(models.Fundamental).filter(models.Fundamental.date <= cutoff)
+        df = pd.DataFrame([{"company_id": f.company_id, "metric": f.metric, "date": f.date,
+                            "value": float(f.value)} for f in q.all()])
+        latest = df.sort_values("date").groupby(["company_id", "metric"]).last()["value"].unstack()
+        roe = latest[METRICS["net_income"]] / latest[METRICS["equity"]] * 100
+        margin = latest[METRICS["net_income"]] / latest[METRICS["revenue"]] * 100
+        roe = roe[(latest[METRICS["equity"]] > 0) & (roe >= 15) & (margin >= 5)]
+        picks.append(set(roe.sort_values(ascending=False, kind="stable").index[:10].tolist()))
+    return picks
+
+
+def vectorized(db, when, company_ids):
+    panel = load_panel(db, lag_days=LAG_DAYS)
+    weights = Screen.from_parameters(PARAMETERS).weights(panel, when, company_ids,
+                                                         np.ones((len(when), len(company_ids)), bool))
+    return [set(company_ids[row > 0].tolist()) for row in weights]
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    engine = create_engine(os.getenv("BENCH_DATABASE_URL", "sqlite://"))
+    models.Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    seed(db)
+
+    when = rebalance_dates()
+    company_ids = np.arange(1, N_COMPANIES + 1)
+    slow, slow_s = timed(lambda: per_date(db, when))
+    fast, fast_s = timed(lambda: vectorized(db, when, company_ids))
+    assert slow == fast, [i for i, (a, b) in enumerate(zip(slow, fast)) if a != b]
+
+    print(f"{N_COMPANIES} companies × {len(when)} rebalances: identical picks")
+    print(f"per-date query + pivot {slow_s * 1e3:9.1f} ms")
+    print(f"panel + vectorized     {fast_s * 1e3:9.1f} ms  ({slow_s / fast_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# What the instrumentation (core/telemetry.py and the middleware in main.py)
+# costs, and what it shows. The cost of one span and one histogram
+# observation; a trivial route served REQUESTS times by an app without the
+# middleware and by one with it; then /run on a SQLite file seeded with 100
+# companies x 10 years, profiled with X-Profile: 1, to print its stage
+# breakdown (Server-Timing) next to the /metrics lines it produced.
+#
+#   cd backend && python -m benchmarks.bench_telemetry
+import os
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="bench_telemetry_")
+os.environ.setdefault("CACHE_DIR", _tmp)
+os.environ.setdefault("PRICE_VERSION_FILE", os.path.join(_tmp, "price_version"))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'bench.db')}")
+os.environ.setdefault("REQUEST_PROFILING", "1")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core import telemetry  # noqa: E402
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.main import InstrumentMiddleware, app  # noqa: E402
+from app.models import models  # noqa: E402
+from app.service.result_cache import result_cache  # noqa: E402
+
+N_COMPANIES = 100
+DAYS = pd.bdate_range("2015-01-01", "2024-12-31").date
+CALLS = 200_000
+REQUESTS = 2000
+
+
+def seed():
+    models.Base.metadata.create_all(engine)
+    rng = np.random.default_rng(3)
+    with SessionLocal() as db:
+        db.execute(insert(models.Company), [
+            {"id": i, "symbol": f"SYM{i}.NS", "name": f"Company {i}", "market_cap": int(rng.integers(1e9, 1e12)),
+             "sector": "x"} for i in range(1, N_COMPANIES + 1)])
+        rows = []
+        for cid in range(1, N_COMPANIES + 1):
+            close = (100 * np.cumprod(1 + rng.normal(0.0003, 0.015, len(DAYS)))).round(4).tolist()
+            rows.extend({"company_id": cid, "date": d, "open": c, "high": c, "low": c, "close": c, "volume": 1000}
+                        for d, c in zip(DAYS, close))
+        db.execute(insert(models.Price), rows)
+        db.add(models.Strategy(id=1, name="top10_equal_weight", parameters={}))
+        db.commit()
+
+
+def per_call(fn, n=CALLS):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def tiny_app(instrumented: bool) -> FastAPI:
+    tiny = FastAPI()
+
+    @tiny.get("/ping/{n}")
+    def ping(n: int):
+        return {"n": n}
+
+    if instrumented:
+        tiny.add_middleware(InstrumentMiddleware)
+    return tiny
+
+
+def per_request(client):
+    t0 = time.perf_counter()
+    for i in range(REQUESTS):
+        client.get(f"/ping/{i}")
+    return (time.perf_counter() - t0) / REQUESTS * 1e6
+
+
+def main():
+    def one_span():
+        with telemetry.span("bench"):
+            pass
+
+    print(f"span enter/exit + observe:  {per_call(one_span):.2f} µs")
+    print(f"histogram observe:          {per_call(lambda: telemetry.STAGES.observe(0.01, stage='bench')):.2f} µs")
+
+    plain, instrumented = TestClient(tiny_app(False)), TestClient(tiny_app(True))
+    per_request(plain)  # warm up
+    before, after = per_request(plain), per_request(instrumented)
+    print(f"GET /ping/{{n}} x {REQUESTS}:     {before:.0f} µs/request bare, {after:.0f} µs with the middleware "
+          f"(+{after - before:.0f} µs; TestClient round trip included)")
+
+    seed()
+    client = TestClient(app)
+    body = {"strategy_id": 1, "start_date": "2015-01-01", "end_date": "2024-12-31", "initial_capital": 100000,
+            "rebalance_frequency": "monthly"}
+    print(f"\nPOST /run, {N_COMPANIES} companies x {len(DAYS)} days, X-Profile: 1")
+    for label in ("first", "from result cache"):
+        response = client.post("/run", json=body, headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        print(f"  {label}:")
+        for part in response.headers["Server-Timing"].split(", "):
+            name, dur = part.split(";")[:2]
+            print(f"    {name:<20} {float(dur[4:]):>9.2f} ms")
+    result_cache.clear()
+
+    lines = client.get("/metrics").text.splitlines()
+    print(f"\n/metrics: {len(lines)} lines, e.g.")
+    for line in lines:
+        if ('route="/run"' in line and "_count" in line) or line.startswith(("stage_duration_seconds_sum{stage=\"run.",
+                                                                               "db_pool_")):
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# Outbound calls under load: 200 concurrent clients hitting a price endpoint
+# whose upstream (a local stub of the Yahoo chart API, LATENCY seconds per
+# call) is reached either the old way -- a sync handler doing a blocking
+# requests.get, so every call holds one of the threadpool's 40 workers -- or
+# through market_data.aget_history on the shared async client. Both must
+# return the same bars. Distinct symbols show the concurrency gain (and what
+# the per-host limit costs); one hot symbol shows coalescing: the async path
+# makes a single upstream call for all 200 clients. "sync ms" is how long a
+# plain sync endpoint (the DB-backed ones) takes when called mid-load: with
+# blocking upstream calls it queues behind them for a threadpool worker.
+#
+#   cd backend && python -m benchmarks.bench_upstream
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+STORE = tempfile.mkdtemp(prefix="bench_upstream_")
+os.environ["MARKET_STORE_DIR"] = STORE
+os.environ["CACHE_DIR"] = STORE
+
+CLIENTS = 200
+LATENCY = 0.25
+N_DAYS = 250
+hits = {"count": 0}
+
+
+def chart_payload(seed=3):
+    rng = np.random.default_rng(seed)
+    days = np.datetime64("2014-01-01") + np.arange(N_DAYS)
+    stamps = (days.astype("datetime64[s]").astype(np.int64) + 3 * 3600).tolist()
+    close = np.round(100 * np.cumprod(1 + rng.normal(0.0003, 0.01, N_DAYS)), 4).tolist()
+    quote = {"open": close, "high": close, "low": close, "close": close, "volume": [1000] * N_DAYS}
+    return json.dumps({"chart": {"result": [{"meta": {"gmtoffset": 0}, "timestamp": stamps,
+                                             "indicators": {"quote": [quote]}}], "error": None}}).encode()
+
+
+BODY = chart_payload()
+
+
+class Stub(BaseHTTPRequestHandler):
+    def do_GET(self):
+        hits["count"] += 1
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+
+server = Server(("127.0.0.1", 0), Stub)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["YAHOO_CHART_URL"] = f"http://127.0.0.1:{server.server_port}/chart"
+
+import httpx  # noqa: E402
+import requests  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.core import config  # noqa: E402
+from app.service.market_data import aget_history, series_from_chart  # noqa: E402
+from app.service.upstream import upstream  # noqa: E402
+
+app = FastAPI()
+
+
+@app.get("/old/{symbol}")
+def old_prices(symbol: str):
+    """The previous shape: a blocking upstream call inside a sync handler."""
+    r = requests.get(f"{config.YAHOO_CHART_URL}/{symbol}", timeout=30)
+    return {"count": len(series_from_chart(r.json()))}
+
+
+@app.get("/ping")
+def ping():
+    return {}
+
+
+@app.get("/new/{symbol}")
+async def new_prices(symbol: str):
+    return {"count": len(await aget_history(symbol))}
+
+
+async def load(path, symbols):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        hits["count"] = 0
+        t0 = time.perf_counter()
+        pending = asyncio.gather(*(client.get(f"/{path}/{s}") for s in symbols))
+        await asyncio.sleep(LATENCY / 5)
+        t1 = time.perf_counter()
+        await client.get("/ping")
+        ping = time.perf_counter() - t1
+        responses = await pending
+        elapsed = time.perf_counter() - t0
+    counts = {r.json()["count"] for r in responses}
+    assert all(r.status_code == 200 for r in responses) and counts == {N_DAYS}, counts
+    return elapsed, ping, hits["count"]
+
+
+async def main():
+    expected = series_from_chart(json.loads(BODY))
+    got = await aget_history("PARITY")
+    assert np.array_equal(got.dates, expected.dates)
+    assert np.array_equal(got.close, expected.close, equal_nan=True)
+    print("parity: the async path stores and serves the same bars as the chart payload\n")
+
+    print(f"{CLIENTS} concurrent clients, upstream latency {LATENCY * 1e3:.0f} ms")
+    print(f"{'case':<40} {'s':>6} {'req/s':>7} {'sync ms':>8} {'upstream calls':>15}")
+    cases = [("sync handler, distinct symbols", "old", "A", None),
+             ("async, distinct, 8 per host", "new", "B", 8),
+             (f"async, distinct, {config.UPSTREAM_PER_HOST} per host (default)", "new", "C",
+              config.UPSTREAM_PER_HOST),
+             ("sync handler, one symbol", "old", None, None),
+             ("async, one symbol, 8 per host", "new", None, 8),
+             ("async, one symbol (default)", "new", None, config.UPSTREAM_PER_HOST)]
+    for name, path, prefix, per_host in cases:
+        if per_host:
+            upstream.per_host = per_host
+            upstream._limits = {}
+        symbols = [f"{prefix}{i}" for i in range(CLIENTS)] if prefix else [f"HOT{per_host}"] * CLIENTS
+        elapsed, ping, calls = await load(path, symbols)
+        print(f"{name:<40} {elapsed:>6.2f} {CLIENTS / elapsed:>7.0f} {ping * 1e3:>8.0f} {calls:>15}")
+    await upstream.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# before any app module reads its configuration: scratch caches and a SQLite database
+_tmp = tempfile.mkdtemp(prefix="backend_tests_")
+os.environ.setdefault("CACHE_DIR", _tmp)
+os.environ.setdefault("PRICE_VERSION_FILE", os.path.join(_tmp, "price_version"))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'tests.db')}")
+os.environ.setdefault("MARKET_DATA_OFFLINE", "0")
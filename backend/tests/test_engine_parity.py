@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.service import engine
+from app.service.backtest import buy_hold, compute_drawdown, rsi_strategy, sma_crossover
+
+N_SYMBOLS = 12
+N_DAYS = 800
+
+CASES = [
+    ("sma_crossover", {"short_window": 20, "long_window": 50}, lambda df: sma_crossover(df, 20, 50)),
+    ("sma_crossover", {"short_window": 5, "long_window": 6}, lambda df: sma_crossover(df, 5, 6)),
+    ("rsi", {"period": 14}, lambda df: rsi_strategy(df, 14)),
+    ("rsi", {"period": 7, "overbought": 60, "oversold": 40}, lambda df: rsi_strategy(df, 7, 60, 40)),
+    ("buy_hold", {}, buy_hold),
+]
+
+
+@pytest.fixture(scope="module")
+def close():
+    rng = np.random.default_rng(42)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.018, (N_DAYS, N_SYMBOLS)), axis=0)
+    # late listings, missing bars and a flat stretch (exact SMA ties)
+    for j in range(0, N_SYMBOLS, 4):
+        close[: rng.integers(20, 200), j] = np.nan
+    close[rng.integers(200, N_DAYS, 10), 1] = np.nan
+    close[300:360, 3] = close[299, 3]
+    return close
+
+
+def pandas_run(close, fn):
+    """The per-symbol pandas backtest the engine replaced, one column at a time."""
+    out = {"signal": [], "equity": [], "total_return": [], "win_rate": [], "max_drawdown": []}
+    for j in range(close.shape[1]):
+        df = fn(pd.DataFrame({"Close": close[:, j]}))
+        df["daily_return"] = df["Close"].pct_change()
+        df["strategy_return"] = df["signal"].shift(1) * df["daily_return"]
+        df["equity"] = (1 + df["strategy_return"].fillna(0)).cumprod() * 100
+        out["signal"].append(df["signal"].to_numpy())
+        out["equity"].append(df["equity"].to_numpy())
+        out["total_return"].append(df["equity"].iloc[-1] - 100)
+        out["win_rate"].append((df["strategy_return"] > 0).sum() / df["strategy_return"].count() * 100)
+        out["max_drawdown"].append(compute_drawdown(df["equity"]))
+    return {k: np.column_stack(v) if k in ("signal", "equity") else np.array(v) for k, v in out.items()}
+
+
+@pytest.mark.parametrize("strategy,params,fn", CASES, ids=[f"{c[0]}-{i}" for i, c in enumerate(CASES)])
+def test_engine_matches_pandas_strategies(close, strategy, params, fn):
+    expected = pandas_run(close, fn)
+    result = engine.run_strategy(close, strategy, params)
+    summary = result.summary()
+
+    assert np.array_equal(np.broadcast_to(result.signal, expected["signal"].shape), expected["signal"])
+    assert np.allclose(result.equity, expected["equity"], rtol=1e-9)
+    for k in ("total_return", "win_rate", "max_drawdown"):
+        assert np.allclose(summary[k], expected[k], rtol=1e-9), k
+
+
+def test_one_symbol_matches_its_column(close):
+    params = {"short_window": 20, "long_window": 50}
+    batch = engine.run_strategy(close, "sma_crossover", params)
+    single = engine.run_strategy(close[:, 2], "sma_crossover", params)
+    assert np.array_equal(single.equity[:, 0], batch.equity[:, 2], equal_nan=True)
@@ -0,0 +1,68 @@
+import time
+
+import pandas as pd
+import pytest
+
+from app.service.fetcher import FakeSource, FetchSource, SymbolData, TokenBucket, fetch_concurrently
+
+SYMBOLS = [f"SYM{i}.NS" for i in range(12)]
+
+
+def serially(source, symbols, start_for=None):
+    start_for = start_for or {}
+    return {s: source.fetch(s, start_for.get(s), lambda fn: fn()) for s in symbols}
+
+
+def test_concurrent_fetch_matches_one_at_a_time():
+    source = FakeSource(days=300, end="2024-12-31")
+    start_for = {"SYM3.NS": "2024-10-01"}
+    got = {d.symbol: d for d in fetch_concurrently(SYMBOLS + SYMBOLS[:3], source, start_for, workers=4, rate=0,
+                                                   retries=0, backoff=0, buffer=2)}
+    assert sorted(got) == sorted(SYMBOLS)  # each symbol once
+    for symbol, expected in serially(source, SYMBOLS, start_for).items():
+        data = got[symbol]
+        assert data.error is None and data.info == expected.info
+        pd.testing.assert_frame_equal(data.history, expected.history)
+        assert data.statements.keys() == expected.statements.keys()
+        for name, frame in expected.statements.items():
+            pd.testing.assert_frame_equal(data.statements[name], frame)
+    assert got["SYM3.NS"].history.index[0] >= pd.Timestamp("2024-10-01")
+
+
+class Flaky(FetchSource):
+    """Fails the first ``failures`` calls per symbol."""
+
+    name = "flaky"
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = {}
+
+    def fetch(self, symbol, start, call):
+        def request():
+            self.calls[symbol] = self.calls.get(symbol, 0) + 1
+            if self.calls[symbol] <= self.failures:
+                raise ConnectionError("upstream down")
+            return {"longName": symbol}
+        return SymbolData(symbol, info=call(request))
+
+
+@pytest.mark.parametrize("failures,retries,error", [(2, 2, None), (3, 2, "upstream down")])
+def test_retries_then_reports_the_error(failures, retries, error):
+    source = Flaky(failures)
+    (data,) = fetch_concurrently(["ABC.NS"], source, workers=1, rate=0, retries=retries, backoff=0)
+    assert data.error == error
+    assert source.calls["ABC.NS"] == min(failures, retries) + 1
+
+
+def test_fetch_source_is_abstract():
+    with pytest.raises(TypeError):
+        FetchSource()
+
+
+def test_token_bucket_paces_calls():
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - started >= 5 / 50 * 0.9
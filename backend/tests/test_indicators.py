@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.service import engine
+from app.service.indicators import IndicatorCache, Indicators
+
+N_DAYS = 1500
+WINDOWS = (5, 20, 50, 200)
+
+
+@pytest.fixture(scope="module")
+def close():
+    rng = np.random.default_rng(21)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.018, N_DAYS))
+    close[:60] = np.nan                           # late listing
+    close[rng.integers(60, N_DAYS, 20)] = np.nan  # missing bars
+    return close
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_indicators_match_the_engine_and_pandas(close, window):
+    ind = Indicators(close, cache=IndicatorCache(1 << 30))
+    assert np.array_equal(ind.get("sma", window), engine.rolling_mean(close, window)[:, 0], equal_nan=True)
+    assert np.array_equal(ind.get("rsi", window), engine.rsi(close, window)[:, 0], equal_nan=True)
+    ema = pd.Series(close).ewm(span=window, adjust=False, min_periods=window).mean().to_numpy()
+    assert np.array_equal(ind.get("ema", window), ema, equal_nan=True)
+    vol = pd.Series(engine.pct_change(close)[:, 0]).rolling(window).std().to_numpy()
+    np.testing.assert_allclose(ind.get("volatility", window), vol, rtol=1e-9, atol=1e-12, equal_nan=True)
+    assert np.array_equal(ind.get("returns"), engine.pct_change(close)[:, 0], equal_nan=True)
+
+
+@pytest.mark.parametrize("strategy,params", [("sma_crossover", {"short_window": 20, "long_window": 50}),
+                                             ("rsi", {"period": 14})])
+def test_cached_signals_are_identical(close, strategy, params):
+    ind = Indicators(close, cache=IndicatorCache(1 << 30))
+    assert np.array_equal(engine.strategy_signals(close, strategy, params, ind),
+                          engine.strategy_signals(close, strategy, params))
+
+
+def test_shared_inputs_are_computed_once_and_reused(close):
+    cache = IndicatorCache(1 << 30)
+    Indicators(close, cache=cache).many("rsi", [7, 14])
+    again = Indicators(close, cache=cache)
+    first = again.get("rsi", 14)
+    usage = cache.stats()["indicators"]
+    assert usage["rsi"]["computed"] == 2 and usage["rsi"]["reused"] == 1
+    assert usage["delta"]["computed"] == 1
+    assert not first.flags.writeable
+    # a revised series gets its own arrays
+    revised = close.copy()
+    revised[-1] *= 1.01
+    assert not np.array_equal(Indicators(revised, cache=cache).get("rsi", 14), first, equal_nan=True)
+
+
+def test_memory_cap_evicts_oldest(close):
+    cache = IndicatorCache(max_bytes=3 * close.nbytes)
+    ind = Indicators(close, cache=cache)
+    ind.many("sma", [5, 10, 20, 40])
+    stats = cache.stats()
+    assert stats["bytes"] <= 3 * close.nbytes and stats["evictions"] >= 1
+    assert np.array_equal(ind.get("sma", 5), engine.rolling_mean(close, 5)[:, 0], equal_nan=True)
+
+
+def test_unknown_indicator():
+    with pytest.raises(ValueError, match="Unknown indicator"):
+        Indicators(np.ones(10)).get("macd", 12)
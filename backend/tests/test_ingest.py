@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.models import models
+from app.service.ingest import write_fundamentals, write_prices
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(models.Company(id=1, symbol="ABC.NS", name="ABC"))
+        session.commit()
+        yield session
+
+
+def count(db, model):
+    return db.execute(select(func.count()).select_from(model)).scalar()
+
+
+def statements(columns):
+    dates = pd.to_datetime(columns)
+    income = pd.DataFrame(np.arange(2.0 * len(dates)).reshape(2, -1), index=["Revenue", "Net Income"], columns=dates)
+    return {"income_statement": income, "balance_sheet": None}
+
+
+def test_prices_already_stored_are_skipped(db):
+    index = pd.bdate_range("2024-01-01", periods=30)
+    hist = pd.DataFrame({"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": np.linspace(100, 110, 30), "Volume": 10},
+                        index=index)
+    assert write_prices(db, 1, hist.iloc[:20]) == 20
+    assert write_prices(db, 1, hist) == 10
+    assert count(db, models.Price) == 30
+
+
+def test_rerun_fundamentals_add_only_new_periods(db):
+    assert write_fundamentals(db, 1, statements(["2023-12-31", "2024-03-31"])) == 4
+    assert write_fundamentals(db, 1, statements(["2023-12-31", "2024-03-31"])) == 0
+    assert write_fundamentals(db, 1, statements(["2023-12-31", "2024-03-31", "2024-06-30"])) == 2
+    assert count(db, models.Fundamental) == 6
+    metrics = set(db.execute(select(models.Fundamental.metric)).scalars())
+    assert metrics == {"income_statement_Revenue", "income_statement_Net Income"}
+
+
+def test_repeated_line_item_is_stored_once(db):
+    df = pd.DataFrame([[1.0], [2.0]], index=["Revenue", "Revenue"], columns=pd.to_datetime(["2024-03-31"]))
+    assert write_fundamentals(db, 1, {"income_statement": df}) == 1
+    assert float(db.execute(select(models.Fundamental.value)).scalar()) == 2.0
@@ -0,0 +1,91 @@
+import threading
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models import models
+from app.schemas.schemas import BacktestRunRequest
+from app.service import jobs
+from app.service.jobs import DONE, FAILED, RUNNING, JobQueue, QueueFull
+from app.service.result_cache import result_cache
+
+DAYS = pd.bdate_range("2020-01-01", "2021-12-31").date
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    models.Base.metadata.create_all(engine)
+    rng = np.random.default_rng(2)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.execute(insert(models.Company), [{"id": i, "symbol": f"SYM{i}.NS", "name": f"Company {i}",
+                                             "market_cap": 10 ** 9 * i, "sector": "x"} for i in range(1, 13)])
+        rows = []
+        for cid in range(1, 13):
+            close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.015, len(DAYS)))
+            rows.extend({"company_id": cid, "date": d, "open": c, "high": c, "low": c, "close": c, "volume": 1}
+                        for d, c in zip(DAYS, close.tolist()))
+        db.execute(insert(models.Price), rows)
+        db.add(models.Strategy(id=1, name="top10_equal_weight", parameters={}))
+        db.commit()
+    result_cache.clear()
+    yield factory
+    result_cache.clear()
+
+
+def request(strategy_id=1, frequency="monthly"):
+    return BacktestRunRequest(strategy_id=strategy_id, start_date=date(2020, 1, 1), end_date=date(2021, 12, 31),
+                              rebalance_frequency=frequency)
+
+
+def wait(job, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while job.active:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return job
+
+
+def test_job_runs_the_backtest_and_stores_it(session_factory):
+    queue = JobQueue(max_workers=1, max_queue=4, history=10, session_factory=session_factory)
+    job = wait(queue.submit(request()))
+    assert job.status == DONE and job.progress == 1.0
+    with session_factory() as db:
+        result = db.get(models.BacktestResult, job.backtest_id)
+        assert result.strategy_id == 1 and result.end_date == DAYS[-1]
+    assert queue.get(job.id) is job
+
+
+def test_unknown_strategy_fails_with_its_error(session_factory):
+    queue = JobQueue(max_workers=1, max_queue=4, history=10, session_factory=session_factory)
+    job = wait(queue.submit(request(strategy_id=99)))
+    assert job.status == FAILED and job.error == "Strategy not found"
+
+
+def test_identical_requests_share_a_job_and_the_queue_is_bounded(session_factory, monkeypatch):
+    release = threading.Event()
+
+    def blocked(db, strategy, req, progress):
+        release.wait(10)
+        return {"backtest_id": 1}
+
+    monkeypatch.setattr(jobs, "run_portfolio_backtest", blocked)
+    queue = JobQueue(max_workers=1, max_queue=1, history=10, session_factory=session_factory)
+    running = queue.submit(request(frequency="monthly"))
+    while running.status != RUNNING:
+        time.sleep(0.01)
+    assert queue.submit(request(frequency="monthly")) is running
+    queued = queue.submit(request(frequency="weekly"))  # waits behind the running one
+    with pytest.raises(QueueFull):
+        queue.submit(request(frequency="daily"))
+    release.set()
+    assert wait(running).status == DONE and wait(queued).status == DONE
+    again = queue.submit(request(frequency="monthly"))
+    assert again is not running  # finished jobs are not reused
+    wait(again)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from app.service import engine
+from app.service.ledger import ledger_columns, ledger_records, trade_ledger
+
+N_BARS = 5000
+COSTS = {"commission": 0.0005, "slippage": 0.0002}
+
+
+@pytest.fixture(scope="module")
+def series():
+    rng = np.random.default_rng(11)
+    dates = np.datetime64("2015-01-01") + np.arange(N_BARS)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, N_BARS))
+    signal = engine.rsi_signals(close, 5, 55, 45)[:, 0]
+    return dates, close, signal
+
+
+def loop_trades(dates, close, signal):
+    """One trade per run of a non-zero signal, walked bar by bar."""
+    trades, open_trade = [], None
+    for i in range(len(signal)):
+        before = signal[i - 1] if i else 0
+        if signal[i] == before:
+            continue
+        if open_trade is not None:
+            trades.append((open_trade[0], open_trade[1], dates[i], round(open_trade[2], 2), round(close[i], 2)))
+        open_trade = (int(signal[i]), dates[i], close[i]) if signal[i] else None
+    return trades
+
+
+def test_matches_a_bar_by_bar_loop(series):
+    dates, close, signal = series
+    ledger, _ = trade_ledger(dates, close, signal)
+    got = list(zip(ledger["side"].tolist(), ledger["entry_date"], ledger["exit_date"],
+                   ledger["entry_price"].tolist(), ledger["exit_price"].tolist()))
+    assert len(got) > 100
+    assert got == loop_trades(dates, close, signal)
+
+
+@pytest.mark.parametrize("cuts", [[1], [2500], [17, 18, 900, 4999], list(range(250, N_BARS, 250))])
+def test_batches_give_the_same_trades(series, cuts):
+    dates, close, signal = series
+    whole, whole_open = trade_ledger(dates, close, signal, **COSTS)
+    parts, open_trade, prev = [], None, None
+    for lo, hi in zip([0] + cuts, cuts + [N_BARS]):
+        ledger, open_trade = trade_ledger(dates[lo:hi], close[lo:hi], signal[lo:hi], prev, open_trade,
+                                          first_bar=lo, **COSTS)
+        parts.append(ledger)
+        prev = int(signal[hi - 1])
+    for k, v in whole.items():
+        np.testing.assert_array_equal(np.concatenate([p[k] for p in parts]), v)
+    assert open_trade == whole_open
+
+
+def test_long_flat_short_with_costs():
+    dates = np.datetime64("2024-01-01") + np.arange(6)
+    close = np.array([100.0, 110.0, 121.0, 121.0, 100.0, 90.0])
+    signal = np.array([1, 1, 0, -1, -1, 0])
+    ledger, open_trade = trade_ledger(dates, close, signal, commission=0.001, slippage=0.0)
+    (long, short) = ledger_records(ledger_columns(ledger))
+    assert open_trade is None
+    assert long["side"] == "long" and long["entry_date"] == "2024-01-01" and long["exit_date"] == "2024-01-03"
+    assert long["return_pct"] == 21.0 and long["net_return_pct"] == 20.8 and long["holding_bars"] == 2
+    assert short["side"] == "short" and short["entry_price"] == 121.0 and short["exit_price"] == 90.0
+    assert short["return_pct"] == 25.62 and short["cost_pct"] == 0.2
+
+
+def test_position_still_open_at_the_end():
+    dates = np.datetime64("2024-01-01") + np.arange(4)
+    ledger, open_trade = trade_ledger(dates, [10.0, 11.0, 12.0, 13.0], [0, 0, 1, 1])
+    assert len(ledger["side"]) == 0
+    assert open_trade == {"side": 1, "date": "2024-01-03", "close": 12.0, "bar": 2}
@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+from app.service import market_data
+from app.service.market_store import MarketStore
+from app.service.price_cache import price_cache
+
+DAYS = np.datetime64("2020-01-01") + np.arange(10)
+
+
+def chart(days=DAYS) -> dict:
+    stamps = days.astype("datetime64[s]").astype(np.int64).tolist()
+    close = (100 + np.arange(len(days), dtype=float)).tolist()
+    quote = {"open": close, "high": close, "low": close, "close": close, "volume": [1000] * len(days)}
+    return {"chart": {"result": [{"meta": {"gmtoffset": 0}, "timestamp": stamps,
+                                  "indicators": {"quote": [quote]}}], "error": None}}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = MarketStore(str(tmp_path))
+    monkeypatch.setattr(market_data, "market_store", store)
+    price_cache.invalidate(source="yf")
+    yield store
+    price_cache.invalidate(source="yf")
+
+
+def answer(monkeypatch, payloads):
+    """The chart API answering 200 with each of ``payloads`` in turn."""
+    payloads = iter(payloads)
+
+    async def get(url, params=None, headers=None):
+        return httpx.Response(200, json=next(payloads), request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(market_data.upstream, "get", get)
+
+
+@pytest.mark.parametrize("payload", [{}, {"chart": {"result": [], "error": None}}, chart(DAYS[:0])])
+def test_empty_chart_payload_marks_nothing_fetched(store, monkeypatch, payload):
+    answer(monkeypatch, [payload, chart()])
+    assert len(asyncio.run(market_data.aget_history("ABC"))) == 0
+    assert store.coverage("ABC") is None
+
+    # nothing was cached either: the next request fetches again
+    series = asyncio.run(market_data.aget_history("ABC"))
+    assert np.array_equal(series.dates, DAYS)
+    assert store.coverage("ABC") == (None, DAYS[-1].astype(object))
+
+
+def test_failed_download_is_not_cached(store, monkeypatch):
+    frames = iter([market_data.pd.DataFrame(), None])
+    calls = []
+
+    def download(symbol, **kwargs):
+        calls.append(kwargs)
+        frame = next(frames)
+        if frame is None:
+            close = 100 + np.arange(len(DAYS), dtype=float)
+            frame = market_data.pd.DataFrame({"Close": close}, index=market_data.pd.DatetimeIndex(DAYS))
+        return frame
+
+    monkeypatch.setattr(market_data.yf, "download", download)
+    assert len(market_data.get_history("ABC")) == 0
+    assert len(market_data.get_history("ABC")) == len(DAYS)
+    assert len(calls) == 2
+    # and a real answer is cached
+    assert len(market_data.get_history("ABC")) == len(DAYS)
+    assert len(calls) == 2
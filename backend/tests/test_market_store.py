@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.service.market_store import MarketStore
+from app.service.price_cache import PriceSeries
+
+DAYS = np.datetime64("2020-01-01") + np.arange(30)
+
+
+def history(start=None, end=None) -> PriceSeries:
+    return PriceSeries(DAYS, close=np.arange(len(DAYS), dtype=float) + 100).slice(start, end, end_inclusive=False)
+
+
+def empty() -> PriceSeries:
+    return PriceSeries(np.empty(0, dtype="datetime64[D]"))
+
+
+class Upstream:
+    """A fetch that fails (an empty series, as yfinance returns) the first ``failures`` times."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+
+    def __call__(self, symbol, start, end):
+        self.calls.append((start, end))
+        if self.failures:
+            self.failures -= 1
+            return empty()
+        return history(start, end)
+
+
+def test_failed_fetch_marks_nothing_covered(tmp_path):
+    store = MarketStore(str(tmp_path))
+    fetch = Upstream(failures=1)
+    store.ensure("ABC", None, None, fetch)
+    assert store.coverage("ABC") is None
+    assert store.missing("ABC", None, None) == [(None, None)]
+
+
+def test_fetch_fails_then_succeeds(tmp_path):
+    store = MarketStore(str(tmp_path))
+    fetch = Upstream(failures=1)
+    store.ensure("ABC", None, None, fetch)
+    store.ensure("ABC", None, None, fetch)
+    # the retry asks for the full history again, not only for what came after the failure
+    assert fetch.calls == [(None, None), (None, None)]
+    stored = store.read("ABC")
+    assert np.array_equal(stored.dates, DAYS)
+    assert np.array_equal(stored.close, history().close)
+    assert store.coverage("ABC") == (None, DAYS[-1].astype(object))
+
+
+def test_coverage_stops_at_last_date_received(tmp_path):
+    store = MarketStore(str(tmp_path))
+    store.ensure("ABC", None, None, Upstream())
+    fetch = Upstream(failures=1)
+    store.ensure("ABC", None, None, fetch)
+    # the tail gap starts after the last stored bar and stays open after a failed refresh
+    after = DAYS[-1].astype(object) + timedelta(days=1)
+    assert fetch.calls == [(after, None)]
+    assert store.missing("ABC", None, None) == [(after, None)]
+
+
+def test_failed_head_gap_leaves_start_alone(tmp_path):
+    store = MarketStore(str(tmp_path))
+    store.ensure("ABC", "2020-01-10", None, Upstream())
+    assert store.coverage("ABC") == (date(2020, 1, 10), DAYS[-1].astype(object))
+    store.ensure("ABC", "2020-01-01", None, Upstream(failures=1))
+    assert store.coverage("ABC")[0] == date(2020, 1, 10)
+    store.ensure("ABC", "2020-01-01", None, Upstream())
+    assert store.coverage("ABC")[0] == date(2020, 1, 1)
+    assert np.array_equal(store.read("ABC").dates, DAYS)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.service import metrics
+
+CURVES = 20
+N_DAYS = 1000
+PPY = metrics.PERIODS_PER_YEAR
+
+
+@pytest.fixture(scope="module")
+def curves():
+    rng = np.random.default_rng(7)
+    equity = 1e5 * np.cumprod(1 + rng.normal(0.0004, 0.012, (N_DAYS, CURVES)), axis=0)
+    equity[rng.integers(1, N_DAYS, 15)] = np.nan  # missing bars
+    bench = 100 * np.cumprod(1 + rng.normal(0.0003, 0.01, N_DAYS))
+    weights = rng.integers(-1, 2, (N_DAYS, CURVES)).astype(float)
+    return equity, bench, weights
+
+
+def pandas_summary(equity, bench, weights):
+    """Each curve's metrics computed on its own with pandas."""
+    b = pd.Series(bench).ffill().pct_change(fill_method=None)
+    out = {k: [] for k in ("total_return", "cagr", "volatility", "sharpe", "sortino", "max_drawdown",
+                           "max_drawdown_duration", "calmar", "hit_rate", "beta", "turnover")}
+    for j in range(equity.shape[1]):
+        e = pd.Series(equity[:, j])
+        r = e.pct_change(fill_method=None)
+        valid = r.dropna()
+        first, last = e.dropna().iloc[0], e.dropna().iloc[-1]
+        cagr = (last / first) ** (PPY / len(valid)) - 1
+        dd = e / e.cummax() - 1
+        under = (e < e.cummax()).astype(int)
+        runs = under.groupby((under == 0).cumsum()).cumsum()
+        out["total_return"].append(last / first - 1)
+        out["cagr"].append(cagr)
+        out["volatility"].append(valid.std() * np.sqrt(PPY))
+        out["sharpe"].append(valid.mean() / valid.std() * np.sqrt(PPY))
+        out["sortino"].append(valid.mean() / np.sqrt((valid.clip(upper=0) ** 2).mean()) * np.sqrt(PPY))
+        out["max_drawdown"].append(dd.min())
+        out["max_drawdown_duration"].append(runs.max())
+        out["calmar"].append(cagr / -dd.min())
+        out["hit_rate"].append((valid > 0).mean())
+        out["beta"].append(r.cov(b) / b[r.notna()].var())
+        out["turnover"].append(pd.Series(weights[:, j]).diff().abs().mean() * PPY)
+    return {k: np.array(v, dtype=float) for k, v in out.items()}
+
+
+def test_summary_matches_pandas_per_curve(curves):
+    equity, bench, weights = curves
+    got = metrics.compute(equity, benchmark=bench, weights=weights)
+    for k, v in pandas_summary(equity, bench, weights).items():
+        np.testing.assert_allclose(got[k], v, rtol=1e-9, atol=1e-12, err_msg=k)
+
+
+@pytest.mark.parametrize("window", metrics.ROLLING_WINDOWS)
+def test_rolling_matches_pandas(curves, window):
+    _, bench, _ = curves
+    clean = 1e5 * np.cumprod(1 + np.random.default_rng(8).normal(0.0004, 0.012, (N_DAYS, 3)), axis=0)
+    got = metrics.rolling(clean, window, benchmark=bench)
+    b = pd.Series(bench).pct_change(fill_method=None)
+    for j in range(clean.shape[1]):
+        e = pd.Series(clean[:, j])
+        r = e.pct_change(fill_method=None)
+        mean, std = r.rolling(window).mean(), r.rolling(window).std()
+        downside = r.rolling(window).apply(lambda x: np.sqrt((np.minimum(x, 0) ** 2).mean()), raw=True)
+        expected = {
+            "return": e / e.shift(window) - 1,
+            "volatility": std * np.sqrt(PPY),
+            "sharpe": mean / std * np.sqrt(PPY),
+            "sortino": mean / downside * np.sqrt(PPY),
+            "beta": r.rolling(window).cov(b) / b.rolling(window).var(),
+        }
+        for k, v in expected.items():
+            np.testing.assert_allclose(got[k][:, j], v.to_numpy(), rtol=1e-9, atol=1e-12, equal_nan=True,
+                                       err_msg=k)
+
+
+def test_base_and_years_override_the_curve():
+    equity = np.array([110.0, 121.0, 99.0, 132.0])
+    out = {k: v[0] for k, v in metrics.compute(equity, base=100.0, years=2.0).items()}
+    assert out["total_return"] == pytest.approx(0.32)
+    assert out["cagr"] == pytest.approx(1.32 ** 0.5 - 1)
+    assert out["max_drawdown"] == pytest.approx(99 / 121 - 1)
+    assert out["max_drawdown_duration"] == 1
+
+
+def test_align_takes_the_last_value_on_or_before():
+    dates = np.array(["2024-01-01", "2024-01-03", "2024-01-05"], dtype="datetime64[D]")
+    got = metrics.align(dates, np.array(["2024-01-02", "2024-01-04"], dtype="datetime64[D]"), [1.0, 2.0])
+    np.testing.assert_array_equal(got, [np.nan, 1.0, 2.0])
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from app.core import config
+from app.service import metrics
+from app.service.montecarlo import distribution, resample, run_montecarlo, simulate
+
+N_DAYS = 500
+PATHS = 200
+SEED = 42
+
+
+@pytest.fixture(scope="module")
+def returns():
+    rng = np.random.default_rng(1)
+    equity = 1e5 * np.cumprod(1 + rng.normal(0.0005, 0.011, N_DAYS))
+    equity[rng.integers(1, N_DAYS, 10)] = np.nan  # missing bars
+    return metrics.returns(equity)[:, 0]
+
+
+def per_path(returns, idx):
+    """Compound each path and walk its drawdown one bar at a time."""
+    out = []
+    for path in idx:
+        value, peak, worst = 1.0, 1.0, 0.0
+        for r in returns[path]:
+            value *= 1 + r
+            peak = max(peak, value)
+            worst = min(worst, value / peak - 1)
+        out.append((value ** (metrics.PERIODS_PER_YEAR / len(path)) - 1, worst, value))
+    return np.array(out)
+
+
+@pytest.mark.parametrize("method", ["iid", "block"])
+def test_matches_a_per_path_loop_on_the_same_draws(returns, method):
+    r = returns[~np.isnan(returns)]
+    idx = resample(np.random.default_rng(SEED), len(r), PATHS, len(r), method, 20)
+    slow = per_path(r, idx)
+    fast = simulate(r, PATHS, len(r), method, 20, SEED)
+    np.testing.assert_allclose(fast["cagr"], slow[:, 0], rtol=1e-9)
+    np.testing.assert_allclose(fast["max_drawdown"], slow[:, 1], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(fast["terminal"], slow[:, 2], rtol=1e-9)
+
+
+def test_block_draws_are_consecutive_runs():
+    idx = resample(np.random.default_rng(SEED), 50, 4, 45, "block", 10)
+    assert idx.shape == (4, 45)
+    runs = idx.reshape(4, -1, 5)[:, ::2]  # first half of each 10-bar block
+    assert ((np.diff(runs, axis=-1) % 50) == 1).all()
+
+
+def test_same_seed_same_answer_inline_or_pooled(returns):
+    kw = {"paths": PATHS, "method": "block", "seed": SEED, "chunk_paths": 64}
+    inline = run_montecarlo(returns, 1e5, **kw)
+    assert run_montecarlo(returns, 1e5, **kw) == inline
+    assert run_montecarlo(returns, 1e5, workers=2, **kw) == inline
+    assert run_montecarlo(returns, 1e5, **{**kw, "seed": SEED + 1}) != inline
+    assert inline["horizon"] == np.isfinite(returns).sum() and inline["seed"] == SEED
+    assert set(inline["distributions"]) == {"cagr", "max_drawdown", "terminal_value"}
+    assert 0 <= inline["probability_of_loss"] <= 1
+
+
+def test_fresh_seed_is_returned(returns):
+    out = run_montecarlo(returns, paths=10)
+    assert out == run_montecarlo(returns, paths=10, seed=out["seed"])
+
+
+@pytest.mark.parametrize("kwargs,match", [
+    ({"method": "stationary"}, "Unknown method"),
+    ({"paths": 0}, "paths"),
+    ({"horizon": 1}, "horizon"),
+    ({"horizon": config.MONTECARLO_MAX_HORIZON + 1}, "horizon"),
+])
+def test_bad_requests_are_rejected(returns, kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        run_montecarlo(returns, **kwargs)
+
+
+def test_too_few_returns():
+    with pytest.raises(ValueError, match="at least two"):
+        run_montecarlo([0.01, np.nan])
+
+
+def test_distribution_skips_non_finite():
+    out = distribution(np.array([1.0, 2.0, 3.0, np.nan, np.inf]))
+    assert out["mean"] == 2.0 and out["percentiles"]["p50"] == 2.0
+    assert distribution(np.array([np.nan])) == {"mean": None, "std": None, "percentiles": {}}
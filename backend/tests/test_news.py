@@ -0,0 +1,67 @@
+import asyncio
+import os
+
+from app.service.news import NewsCache
+
+PAGE = open(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", "google_news.html"),
+            encoding="utf-8").read()
+CONSENT = "<html><body><form action='https://consent.google.com/save'>Before you continue</form></body></html>"
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Pages:
+    def __init__(self, *pages):
+        self.pages = list(pages)
+        self.calls = 0
+
+    async def __call__(self, symbol):
+        self.calls += 1
+        return self.pages.pop(0)
+
+
+def cache(fetch, clock):
+    return NewsCache(ttl=300, stale_ttl=3600, max_entries=100, empty_ttl=30, fetch=fetch, clock=clock)
+
+
+async def settle(news):
+    # the background refresh parses in a worker thread
+    while news._refreshing:
+        await asyncio.sleep(0.01)
+
+
+def test_empty_page_is_cached_briefly():
+    async def run():
+        clock, fetch = Clock(), Pages(CONSENT, PAGE)
+        news = cache(fetch, clock)
+        assert await news.get("ABC") == []
+        clock.now = 10
+        assert await news.get("ABC") == []
+        assert fetch.calls == 1
+        # past empty_ttl, with no stale period: the next request fetches again
+        clock.now = 31
+        assert len(await news.get("ABC")) == 10
+        assert fetch.calls == 2
+
+    asyncio.run(run())
+
+
+def test_empty_refresh_keeps_serving_articles():
+    async def run():
+        clock, fetch = Clock(), Pages(PAGE, CONSENT, PAGE)
+        news = cache(fetch, clock)
+        articles = await news.get("ABC")
+        clock.now = 400  # stale: served, and one refresh gets the consent page
+        assert await news.get("ABC") == articles
+        await settle(news)
+        assert news.refresh_failures == 1
+        assert await news.get("ABC") == articles
+        await settle(news)
+        assert fetch.calls == 3 and news.refreshes == 1
+
+    asyncio.run(run())
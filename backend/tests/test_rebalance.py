@@ -0,0 +1,38 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.service.rebalance import PortfolioState, equal_weights
+
+N_DAYS, N_ASSETS = 600, 12
+
+
+@pytest.fixture(scope="module")
+def close():
+    rng = np.random.default_rng(5)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.018, (N_DAYS, N_ASSETS)), axis=0)
+    close[:30, 3] = np.nan                                             # late listing
+    close[rng.integers(0, N_DAYS, 40), rng.integers(0, N_ASSETS, 40)] = np.nan
+    return close
+
+
+def simulate(close, periods, cuts=()):
+    """Advance over ``close`` in pieces, round-tripping the state through JSON between them."""
+    state, values, prev = PortfolioState(close.shape[1], 100_000), [], 0
+    for cut in list(cuts) + [len(close)]:
+        state = PortfolioState.from_dict(json.loads(json.dumps(state.to_dict())))
+        batch = periods[prev:cut]
+        step = state.advance(close[prev:cut], batch, equal_weights(len(state.new_periods(batch)), close.shape[1]))
+        values.append(step.value)
+        prev = cut
+    return np.concatenate(values)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batches_cut_inside_a_period_match_one_pass(close, seed):
+    # monthly periods; every cut lands mid-month, so each batch continues the open period first
+    periods = np.arange(N_DAYS) // 21
+    cuts = sorted(np.random.default_rng(seed).choice(np.flatnonzero(periods[1:] == periods[:-1]) + 1, 4,
+                                                     replace=False))
+    assert np.array_equal(simulate(close, periods, cuts), simulate(close, periods))
@@ -0,0 +1,69 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models import models
+from app.service import result_cache as rc
+from app.service.price_cache import bump_data_version
+from app.service.result_cache import ResultCache, key_digest, prune_runs, result_digest
+
+
+def test_digest_ignores_representation_not_content():
+    a = result_digest("run", window=20, ids=(1, 2), start=date(2024, 1, 1), params={"k": np.int64(3)})
+    b = result_digest("run", ids=[1, 2], window=20.0, start="2024-01-01", params={"k": 3})
+    assert a == b
+    assert result_digest("run", window=21, ids=[1, 2], start="2024-01-01", params={"k": 3}) != a
+    assert result_digest("symbol", window=20, ids=[1, 2], start="2024-01-01", params={"k": 3}) != a
+
+
+def test_lru_eviction_and_hit_accounting():
+    cache = ResultCache(max_entries=2, check_interval=3600)
+    cache.put("a", {"x": 1}, 0.5)
+    cache.put("b", {"x": 2}, 1.0)
+    assert cache.get("a") == {"x": 1}     # a is now the most recent
+    cache.put("c", {"x": 3}, 2.0)          # evicts b
+    assert cache.get("b") is None and cache.get("c") == {"x": 3}
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (2, 2, 3)
+    assert stats["saved_seconds"] == 2.5 and stats["compute_seconds"] == 3.5
+
+    cache.get("a")["x"] = 99               # callers get a copy
+    assert cache.get("a") == {"x": 1}
+    cache.discard(["a", "missing"])
+    assert cache.get("a") is None
+
+
+def test_new_prices_empty_the_cache():
+    cache = ResultCache(max_entries=8, check_interval=0)
+    cache.get("warm")                      # records the current version
+    cache.put("a", {"x": 1}, 0.1)
+    assert cache.get("a") is not None
+    bump_data_version()
+    assert cache.get("a") is None
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'runs.db'}")
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_prune_keeps_the_newest_runs_and_forgets_their_responses(db, monkeypatch):
+    cache = ResultCache(max_entries=8, check_interval=3600)
+    monkeypatch.setattr(rc, "result_cache", cache)
+    key, other = key_digest("k"), key_digest("other")
+    for i in range(5):
+        db.add(models.BacktestResult(run_key=key, digest=f"d{i}"))
+        cache.put(f"d{i}", {"backtest_id": i + 1}, 0.1)
+    db.add(models.BacktestResult(run_key=other, digest="o"))
+    db.commit()
+
+    assert prune_runs(db, key, keep=2) == 3
+    assert [r.digest for r in db.query(models.BacktestResult).order_by(models.BacktestResult.id)] == ["d3", "d4", "o"]
+    assert [cache.get(f"d{i}") is not None for i in range(5)] == [False, False, False, True, True]
+    assert prune_runs(db, key, keep=2) == 0
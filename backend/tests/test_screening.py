@@ -0,0 +1,102 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.models import models
+from app.service.screening import METRICS, Screen, load_panel
+
+N_COMPANIES = 30
+N_QUARTERS = 16
+LAG_DAYS = 45
+PARAMETERS = {"filter": {"ROE_min": 15, "net_margin_min": 5}, "ranking": ["ROE DESC"], "top_n": 5}
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('screening') / 'screening.db'}")
+    models.Base.metadata.create_all(engine)
+    rng = np.random.default_rng(3)
+    with Session(engine) as session:
+        session.execute(insert(models.Company), [
+            {"id": i, "symbol": f"SYM{i}", "name": f"SYM{i}", "market_cap": int(rng.integers(10**9, 10**12)),
+             "sector": "x"} for i in range(1, N_COMPANIES + 1)])
+        quarter_ends = pd.date_range("2016-03-31", periods=N_QUARTERS, freq="QE").date
+        rows = []
+        for cid in range(1, N_COMPANIES + 1):
+            for day in quarter_ends[rng.integers(0, N_QUARTERS // 2):]:  # late filers
+                equity, revenue = rng.uniform(1e9, 5e9), rng.uniform(1e9, 8e9)
+                for name, value in (("equity", equity), ("revenue", revenue),
+                                    ("net_income", rng.uniform(-0.1, 0.35) * equity)):
+                    rows.append({"company_id": cid, "metric": METRICS[name], "date": day, "value": value})
+        session.execute(insert(models.Fundamental), rows)
+        session.commit()
+        yield session
+
+
+def when():
+    return np.array(pd.date_range("2017-01-01", periods=N_QUARTERS - 4, freq="QS").date, dtype="datetime64[D]")
+
+
+def per_date(db, dates):
+    """One query and pandas pivot per rebalance date, as a naive screen would."""
+    picks = []
+    for day in dates:
+        cutoff = (day - np.timedelta64(LAG_DAYS, "D")).astype(date)
+        q = db.query(models.Fundamental).filter(models.Fundamental.date <= cutoff)
+        df = pd.DataFrame([{"company_id": f.company_id, "metric": f.metric, "date": f.date,
+                            "value": float(f.value)} for f in q.all()])
+        latest = df.sort_values("date").groupby(["company_id", "metric"]).last()["value"].unstack()
+        roe = latest[METRICS["net_income"]] / latest[METRICS["equity"]] * 100
+        margin = latest[METRICS["net_income"]] / latest[METRICS["revenue"]] * 100
+        roe = roe[(latest[METRICS["equity"]] > 0) & (roe >= 15) & (margin >= 5)]
+        picks.append(set(roe.sort_values(ascending=False, kind="stable").index[:5].tolist()))
+    return picks
+
+
+def test_panel_screen_matches_per_date_queries(db):
+    dates, company_ids = when(), np.arange(1, N_COMPANIES + 1)
+    weights = Screen.from_parameters(PARAMETERS).weights(load_panel(db, lag_days=LAG_DAYS), dates, company_ids,
+                                                         np.ones((len(dates), N_COMPANIES), bool))
+    picks = per_date(db, dates)
+    assert sum(map(len, picks)) > len(dates)
+    assert [set(company_ids[row > 0].tolist()) for row in weights] == picks
+    np.testing.assert_allclose(weights[weights.sum(axis=1) > 0].sum(axis=1), 1.0)
+
+
+def test_market_cap_sizing_and_eligibility(db):
+    dates, company_ids = when(), np.arange(1, N_COMPANIES + 1)
+    panel = load_panel(db, lag_days=LAG_DAYS)
+    eligible = np.ones((len(dates), N_COMPANIES), bool)
+    eligible[:, 0] = False
+    weights = Screen.from_parameters({**PARAMETERS, "position_sizing": "market_cap"}).weights(
+        panel, dates, company_ids, eligible)
+    assert (weights[:, 0] == 0).all()
+    for row in weights[weights.sum(axis=1) > 0]:
+        held = row > 0
+        cap = panel.market_cap[held]
+        np.testing.assert_allclose(row[held], cap / cap.sum())
+
+
+@pytest.mark.parametrize("parameters", [
+    {"filter": {"ROE": 15}},
+    {"ranking": ["ROE SIDEWAYS"]},
+    {"ranking": ["ROE DESC"], "position_sizing": "random"},
+])
+def test_bad_parameters_are_rejected(parameters):
+    with pytest.raises(ValueError):
+        Screen.from_parameters(parameters)
+
+
+def test_unknown_metric_is_rejected(db):
+    panel = load_panel(db, lag_days=LAG_DAYS)
+    screen = Screen.from_parameters({"ranking": ["PE ASC"]})
+    with pytest.raises(ValueError, match="unknown metrics"):
+        screen.weights(panel, when(), np.arange(1, 4), np.ones((len(when()), 3), bool))
+
+
+def test_non_screening_strategy_has_no_screen():
+    assert Screen.from_parameters({}) is None and Screen.from_parameters(None) is None
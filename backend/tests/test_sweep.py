@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.core import config
+from app.schemas.schemas import SweepRequest
+from app.service import engine
+from app.service.sweep import SORT_KEYS, rank, run_sweep
+
+N_DAYS = 900
+
+
+@pytest.fixture(scope="module")
+def close():
+    rng = np.random.default_rng(9)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.017, N_DAYS))
+    close[:30] = np.nan                           # late listing
+    close[rng.integers(30, N_DAYS, 15)] = np.nan  # missing bars
+    return close
+
+
+def one_at_a_time(close, strategy, table, names):
+    """Each row of the sweep table backtested on its own."""
+    rows = zip(*(table[n] for n in names))
+    return [engine.run_strategy(close, strategy, {n: v.item() for n, v in zip(names, row)}).summary()
+            for row in rows]
+
+
+@pytest.mark.parametrize("strategy,grid,names", [
+    ("sma_crossover", {"short_window": [5, 10, 20, 40], "long_window": [20, 50, 100]},
+     ("short_window", "long_window")),
+    ("rsi", {"period": [7, 14], "overbought": [65, 70], "oversold": [30, 35]},
+     ("period", "overbought", "oversold")),
+])
+def test_grid_matches_single_backtests(close, strategy, grid, names):
+    table = run_sweep(close, strategy, grid)
+    expected = one_at_a_time(close, strategy, table, names)
+    assert len(expected) == len(table["total_return"]) > 0
+    for k in SORT_KEYS:
+        np.testing.assert_allclose(table[k], [float(e[k][0]) for e in expected], rtol=1e-12, equal_nan=True)
+    if strategy == "sma_crossover":
+        assert (table["short_window"] < table["long_window"]).all()
+
+
+def test_rank_orders_best_first_and_limits(close):
+    table = run_sweep(close, "sma_crossover", {"short_window": [5, 10, 20], "long_window": [30, 60]})
+    rows = rank(table, "total_return", limit=4)
+    assert len(rows) == 4
+    returns = [r["total_return"] for r in rows]
+    assert returns == sorted(returns, reverse=True)
+    assert len(rank(table, "total_return", limit=None)) == 6
+    with pytest.raises(ValueError):
+        rank(table, "total_return", limit=-1)
+
+
+@pytest.mark.parametrize("limit", [0, -5, config.SWEEP_MAX_COMBINATIONS + 1])
+def test_request_rejects_out_of_range_limit(limit):
+    with pytest.raises(ValidationError):
+        SweepRequest(symbol="ABC", strategy="rsi", params={}, limit=limit)
+
+
+def test_grid_rejects_bad_windows(close):
+    with pytest.raises(ValueError):
+        run_sweep(close, "sma_crossover", {"short_window": [0, 5], "long_window": [20]})
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.models import models
+from app.schemas.schemas import BacktestRequest
+from app.service.price_cache import PriceSeries
+from app.service.result_cache import result_cache
+from app.service.symbol_backtest import run_symbol_backtest
+
+DAYS = np.datetime64("2015-01-01") + np.arange(1500)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'runs.db'}")
+    models.Base.metadata.create_all(engine)
+    result_cache.clear()
+    with Session(engine) as session:
+        yield session
+    result_cache.clear()
+
+
+def history(n=len(DAYS)) -> PriceSeries:
+    rng = np.random.default_rng(11)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.015, len(DAYS)))
+    return PriceSeries(DAYS, close=close).slice(None, DAYS[n - 1])
+
+
+def request(end) -> BacktestRequest:
+    return BacktestRequest(strategy="sma_crossover", params={"short_window": 10, "long_window": 40},
+                           end_date=str(end), commission=0.001)
+
+
+def stored(db):
+    return db.query(models.BacktestResult).order_by(models.BacktestResult.id).all()
+
+
+def test_extending_end_date_adds_a_run_and_leaves_the_earlier_one(db):
+    first = run_symbol_backtest(db, "ABC", request(DAYS[999]), history(1000))
+    (row,) = stored(db)
+    first_id, first_curve = row.id, list(row.equity_curve["values"])
+
+    resumed = run_symbol_backtest(db, "ABC", request(DAYS[-1]), history())
+    rows = stored(db)
+    assert len(rows) == 2
+    earlier = db.get(models.BacktestResult, first_id)
+    assert earlier.end_date == DAYS[999].astype(object)
+    assert earlier.equity_curve["values"] == first_curve
+    assert rows[1].end_date == DAYS[-1].astype(object)
+    assert resumed["equity_curve"][:1000] == first["equity_curve"]
+
+    # the resumed run matches one computed from scratch, bar for bar
+    result_cache.clear()
+    db.query(models.BacktestResult).delete()
+    db.commit()
+    full = run_symbol_backtest(db, "ABC", request(DAYS[-1]), history())
+    assert full == resumed
+
+
+def test_a_shorter_range_does_not_resume_from_a_longer_run(db):
+    run_symbol_backtest(db, "ABC", request(DAYS[-1]), history())
+    short = run_symbol_backtest(db, "ABC", request(DAYS[499]), history(500))
+    assert len(short["equity_curve"]) == 500
+    assert [r.end_date for r in stored(db)] == [DAYS[-1].astype(object), DAYS[499].astype(object)]
+
+
+def test_only_the_newest_runs_of_a_key_are_kept(db, monkeypatch):
+    monkeypatch.setattr(config, "STORED_RUNS_PER_KEY", 2)
+    for n in (600, 800, 1000, 1200):
+        run_symbol_backtest(db, "ABC", request(DAYS[n - 1]), history(n))
+    assert [r.end_date for r in stored(db)] == [DAYS[999].astype(object), DAYS[1199].astype(object)]
+
+    # still resumes from the newest kept run
+    last = run_symbol_backtest(db, "ABC", request(DAYS[-1]), history())
+    result_cache.clear()
+    db.query(models.BacktestResult).delete()
+    db.commit()
+    assert run_symbol_backtest(db, "ABC", request(DAYS[-1]), history()) == last
+
+
+def test_revised_history_before_the_checkpoint_is_recomputed(db, capsys):
+    run_symbol_backtest(db, "ABC", request(DAYS[999]), history(1000))
+    run_symbol_backtest(db, "ABC", request(DAYS[1199]), history(1200))
+    assert "(200 new bars)" in capsys.readouterr().out
+
+    # a split adjustment rescales earlier closes; the checkpointed close itself is unchanged
+    revised = history()
+    revised.close = revised.close.copy()
+    revised.close[:500] /= 2
+    resumed = run_symbol_backtest(db, "ABC", request(DAYS[-1]), revised)
+    assert f"({len(DAYS)} new bars)" in capsys.readouterr().out
+
+    result_cache.clear()
+    db.query(models.BacktestResult).delete()
+    db.commit()
+    assert run_symbol_backtest(db, "ABC", request(DAYS[-1]), revised) == resumed
@@ -0,0 +1,37 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import config, telemetry
+from app.main import InstrumentMiddleware
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(config, "REQUEST_PROFILING", True)
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        with telemetry.span("ping.work"):
+            return {"ok": True}
+
+    app.add_middleware(InstrumentMiddleware)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("headers,params", [({"X-Profile": "1"}, {}), ({"X-Profile": "true"}, {}),
+                                            ({}, {"profile": "yes"})])
+def test_profile_requested(client, headers, params):
+    timing = client.get("/ping", headers=headers, params=params).headers["Server-Timing"]
+    assert timing.startswith("ping.work;dur=") and "total;dur=" in timing
+
+
+@pytest.mark.parametrize("headers,params", [({}, {}), ({"X-Profile": "0"}, {}), ({}, {"profile": "false"})])
+def test_profile_not_requested(client, headers, params):
+    assert "Server-Timing" not in client.get("/ping", headers=headers, params=params).headers
+
+
+def test_profiling_disabled(client, monkeypatch):
+    monkeypatch.setattr(config, "REQUEST_PROFILING", False)
+    assert "Server-Timing" not in client.get("/ping", headers={"X-Profile": "1"}).headers
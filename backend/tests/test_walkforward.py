@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from app.core import config
+from app.service import engine
+from app.service.walkforward import folds, stitch, walk_forward
+
+N_DAYS = 1200
+TRAIN, TEST = 252, 126
+GRID = {"short_window": np.arange(5, 30, 5), "long_window": np.arange(40, 120, 20)}
+
+
+@pytest.fixture(scope="module")
+def close():
+    rng = np.random.default_rng(4)
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.016, N_DAYS))
+    close[rng.integers(1, N_DAYS, 10)] = np.nan  # missing bars
+    return close
+
+
+def one_at_a_time(close, mode="rolling"):
+    """Every grid point backtested on its own, fold after fold."""
+    out = []
+    combos = [(s, l) for s in GRID["short_window"] for l in GRID["long_window"] if s < l]
+    for train_lo, train_hi, test_lo, test_hi in folds(len(close), TRAIN, TEST, mode):
+        train = close[train_lo:train_hi]
+        scores = [engine.run_strategy(train, "sma_crossover", {"short_window": int(s), "long_window": int(l)})
+                  .summary()["total_return"][0] for s, l in combos]
+        s, l = combos[int(np.argmax(np.nan_to_num(scores, nan=-np.inf)))]
+        params = {"short_window": int(s), "long_window": int(l)}
+        window = close[train_lo:test_hi]
+        returns = engine.run_strategy(window, "sma_crossover", params).strategy_return[test_lo - train_lo:, 0]
+        out.append({"params": params, "returns": returns})
+    return out
+
+
+@pytest.mark.parametrize("mode", ["rolling", "anchored"])
+def test_matches_one_combination_at_a_time(close, mode):
+    ref = one_at_a_time(close, mode)
+    got = walk_forward(close, "sma_crossover", GRID, TRAIN, TEST, mode, workers=0)
+    assert [f["params"] for f in got] == [f["params"] for f in ref]
+    assert np.array_equal(stitch(got), stitch(ref))
+    assert len(stitch(got)) == N_DAYS - TRAIN
+
+
+def test_process_pool_gives_the_same_folds(close, monkeypatch):
+    monkeypatch.setattr(config, "WALKFORWARD_MAX_WORKERS", 2)
+    inline = walk_forward(close, "sma_crossover", GRID, TRAIN, TEST, workers=0)
+    pooled = walk_forward(close, "sma_crossover", GRID, TRAIN, TEST, workers=2)
+    assert [f["params"] for f in pooled] == [f["params"] for f in inline]
+    assert np.array_equal(stitch(pooled), stitch(inline))
+
+
+def test_rolling_and_anchored_folds():
+    assert folds(10, 4, 3) == [(0, 4, 4, 7), (3, 7, 7, 10)]
+    assert folds(11, 4, 3, "anchored") == [(0, 4, 4, 7), (0, 7, 7, 10), (0, 10, 10, 11)]
+    assert folds(4, 4, 3) == []
+
+
+@pytest.mark.parametrize("args,match", [
+    ((10, 4, 3, "expanding"), "Unknown mode"),
+    ((10, 1, 3), "train"),
+    ((10, 4, 0), "train"),
+])
+def test_bad_windows_are_rejected(args, match):
+    with pytest.raises(ValueError, match=match):
+        folds(*args)
+
+
+def test_too_short_a_series(close):
+    with pytest.raises(ValueError, match="Need more than"):
+        walk_forward(close[:TRAIN], "sma_crossover", GRID, TRAIN, TEST, workers=0)
+    with pytest.raises(ValueError, match="sort_by"):
+        walk_forward(close, "sma_crossover", GRID, TRAIN, TEST, sort_by="alpha", workers=0)
@@ -5,19 +5,21 @@ import { Bar } from "react-chartjs-2";
 ChartJS.register(CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend);
 
 interface AllocationChartProps {
+  // dense periods × companies matrix of end-of-period weights
   allocationHistory: {
-    date: string;
-    allocations: Record<string, number>;
-  }[];
+    dates: string[];
+    company_ids: number[];
+    weights: number[][];
+  };
 }
 
 const AllocationChart: React.FC<AllocationChartProps> = ({ allocationHistory }) => {
-  const dates = allocationHistory.map((d) => d.date);
-  const companyIds = Object.keys(allocationHistory[0]?.allocations || {});
+  const dates = allocationHistory.dates;
+  const companyIds = allocationHistory.company_ids;
 
-  const datasets = companyIds.map((id) => ({
+  const datasets = companyIds.map((id, col) => ({
     label: `Company ${id}`,
-    data: allocationHistory.map((d) => d.allocations[id]),
+    data: allocationHistory.weights.map((row) => +(row[col] * 100).toFixed(2)),
   }));
 
   const data = {
@@ -30,10 +32,14 @@ const AllocationChart: React.FC<AllocationChartProps> = ({ allocationHistory })
 
   const options = {
     responsive: true,
+    scales: {
+      x: { stacked: true },
+      y: { stacked: true, max: 100, title: { display: true, text: "Weight (%)" } },
+    },
     plugins: {
       title: {
         display: true,
-        text: "Quarterly Allocation per Company",
+        text: "Allocation per Company",
       },
     },
   };
@@ -28,11 +28,10 @@ export default function DownloadAnalytics({ result }: { result: any }) {
     });
 
     // 📈 Allocation History
-    csv += "\nAllocation History\nDate,CompanyID,Allocation\n";
-    result.allocation_history.forEach((a: any) => {
-      Object.entries(a.allocations).forEach(([companyId, value]) => {
-        csv += `${a.date},${companyId},${value}\n`;
-      });
+    const allocations = result.allocation_history;
+    csv += `\nAllocation History\nDate,${allocations.company_ids.join(",")}\n`;
+    allocations.dates.forEach((date: string, i: number) => {
+      csv += `${date},${allocations.weights[i].join(",")}\n`;
     });
 
     const blob = new Blob([csv], { type: "text/csv" });